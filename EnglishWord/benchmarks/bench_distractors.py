@@ -0,0 +1,86 @@
+"""뜻 맞추기 퀴즈의 오답 보기 생성 비용 측정 (문제 1개당)
+
+실제 단어장(challenge)을 배수로 늘린 단어 목록에서
+- 기존 방식: 문제마다 전체 단어를 훑어 같은 품사 목록을 만들고 random.sample
+- 색인 방식: DistractorIndex를 한 번 만든 뒤 문제마다 choices()
+의 문제당 시간을 비교한다. 색인 방식은 단어 수가 늘어도 문제당 시간이 일정해야 한다.
+
+사용법:
+    python benchmarks/bench_distractors.py --scales 1 4 16 64 --questions 300
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.chdir(BASE_DIR)  # load_words는 현재 폴더의 CSV를 읽음
+
+from english_word_quiz import load_words
+from quiz_engine import DistractorIndex
+
+
+def legacy_choices(words, word):
+    """이전 meaning_quiz_game의 오답 보기 생성 (비교용)"""
+    correct_meaning = word['korean_meaning']
+    word_pos = word['part_of_speech']
+    if ',' in word_pos:
+        pos_list = [pos.strip() for pos in word_pos.split(',')]
+        same_pos_words = [w for w in words if w['korean_meaning'] != correct_meaning and any(pos in w['part_of_speech'] for pos in pos_list)]
+    else:
+        same_pos_words = [w for w in words if w['korean_meaning'] != correct_meaning and w['part_of_speech'] == word_pos]
+    if len(same_pos_words) >= 9:
+        return random.sample([w['korean_meaning'] for w in same_pos_words], 9)
+    other_words = [w for w in words if w['korean_meaning'] != correct_meaning]
+    return random.sample([w['korean_meaning'] for w in other_words], 9)
+
+
+def scale_words(words, scale):
+    """단어/뜻에 번호를 붙여 scale배로 늘린 목록"""
+    if scale == 1:
+        return words
+    return [
+        {**word, 'entry': f"{word['entry']}{i}", 'korean_meaning': f"{word['korean_meaning']}{i}"}
+        for i in range(scale)
+        for word in words
+    ]
+
+
+def per_question_us(make_choices, questions):
+    start = time.perf_counter()
+    for word in questions:
+        make_choices(word)
+    return (time.perf_counter() - start) / len(questions) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--difficulty", default="challenge")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--questions", type=int, default=300)
+    args = parser.parse_args()
+
+    base = load_words(args.difficulty)
+    if not base:
+        return
+    # 단어장 캐시는 읽을 때마다 디코딩하므로, 두 방식 모두 같은 dict 목록으로 비교
+    base = [dict(word) for word in base]
+    print(f"{'words':>8} {'legacy us/q':>12} {'index us/q':>11} {'build ms':>9}")
+    for scale in args.scales:
+        words = scale_words(base, scale)
+        rng = random.Random(0)
+        questions = [rng.choice(words) for _ in range(args.questions)]
+
+        start = time.perf_counter()
+        index = DistractorIndex(words)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        legacy = per_question_us(lambda word: legacy_choices(words, word), questions[:max(10, args.questions // scale)])
+        indexed = per_question_us(index.choices, questions)
+        print(f"{len(words):>8} {legacy:>12.1f} {indexed:>11.1f} {build_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
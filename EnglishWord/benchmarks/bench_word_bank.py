@@ -0,0 +1,134 @@
+"""단어장 로딩 시간과 메모리: CSV 파싱 vs 컴파일된 캐시(mmap)
+
+방식마다 새 프로세스에서 다섯 난이도를 모두 한 번씩 고른 것처럼 불러와
+- 첫 난이도를 고르기까지 걸린 시간 / 다섯 개 모두 불러오는 시간
+- 모든 단어의 뜻을 한 번씩 읽은 뒤 파이썬 힙(tracemalloc)과 프로세스 RSS 증가량
+을 측정한다 (tracemalloc이 시간을 늘리므로 시간과 메모리는 따로 실행).
+
+    csv   예전 load_words: 고를 때마다 csv.DictReader로 파싱해 dict 목록 생성
+    cold  캐시 파일이 없을 때: 컴파일 후 mmap으로 열기
+    warm  캐시 파일이 있을 때: mmap으로 열기만 함
+
+사용법:
+    python benchmarks/bench_word_bank.py --repeat 5
+"""
+import argparse
+import csv
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from word_bank import DIFFICULTIES, compile_bank, csv_path, open_word_bank
+
+MODES = ('csv', 'cold', 'warm')
+
+
+def legacy_load_words(difficulty):
+    """이전 load_words (비교용)"""
+    words = []
+    with open(csv_path(difficulty), 'r', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            words.append({
+                'entry': row['entry'],
+                'part_of_speech': row['part_of_speech'],
+                'korean_meaning': row['korean_meaning'],
+                'example_sentence': row['example_sentence']
+            })
+    return words
+
+
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return 0
+
+
+def load_all(mode, cache_path):
+    loaded = []
+    for difficulty in DIFFICULTIES:
+        if mode == 'csv':
+            loaded.append(legacy_load_words(difficulty))
+        else:
+            loaded.append(open_word_bank(cache_path).words(difficulty))
+    return loaded
+
+
+def run_mode(mode, cache_path, measure):
+    """새 프로세스에서 실행: 측정 결과를 JSON 한 줄로 출력"""
+    if mode == 'cold' and os.path.exists(cache_path):
+        os.remove(cache_path)
+    if mode == 'warm' and not os.path.exists(cache_path):
+        compile_bank(cache_path)
+
+    if measure == 'time':
+        start = time.perf_counter()
+        if mode == 'csv':
+            legacy_load_words(DIFFICULTIES[0])
+        else:
+            open_word_bank(cache_path).words(DIFFICULTIES[0])
+        first = time.perf_counter() - start
+        load_all(mode, cache_path)
+        total = time.perf_counter() - start
+        print(json.dumps({'first_ms': first * 1000, 'total_ms': total * 1000}))
+        return
+
+    rss_before = rss_bytes()
+    tracemalloc.start()
+    loaded = load_all(mode, cache_path)
+    # 퀴즈가 실제로 읽는 필드를 한 번씩 건드려 페이지를 불러옴
+    for words in loaded:
+        for word in words:
+            word['korean_meaning']
+    heap = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(json.dumps({
+        'heap_kb': heap / 1024,
+        'rss_kb': (rss_bytes() - rss_before) / 1024,
+        'words': sum(len(words) for words in loaded)
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--cache", help=argparse.SUPPRESS)
+    parser.add_argument("--measure", choices=("time", "memory"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.cache, args.measure)
+        return
+
+    cache_path = os.path.join(tempfile.mkdtemp(prefix="bench_word_bank_"), "word_bank.bin")
+    print(f"{'mode':<6} {'first ms':>9} {'all ms':>8} {'heap KB':>9} {'RSS KB':>8} {'words':>6}")
+    for mode in MODES:
+        runs = []
+        for _ in range(args.repeat):
+            run = {}
+            for measure in ("time", "memory"):
+                output = subprocess.run(
+                    [sys.executable, __file__, "--mode", mode, "--cache", cache_path, "--measure", measure],
+                    capture_output=True, text=True, check=True
+                ).stdout
+                run.update(json.loads(output))
+            runs.append(run)
+        median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        print(
+            f"{mode:<6} {median['first_ms']:>9.2f} {median['total_ms']:>8.2f} "
+            f"{median['heap_kb']:>9.0f} {median['rss_kb']:>8.0f} {median['words']:>6.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""퀴즈 API 부하 테스트 (로컬 uvicorn에 동시 학습자 N명)
+
+학습자마다 퀴즈 세션을 만들고 문제를 받아 답을 제출하는 과정을 --questions번 반복한다.
+모든 요청의 지연 시간으로 초당 요청 수와 p50/p95/p99를 출력하고,
+서버를 직접 띄운 경우에는 테스트 전후 서버 프로세스의 RSS도 출력한다.
+
+사용법:
+    python benchmarks/load_test_quiz.py --learners 1000 --questions 20
+    python benchmarks/load_test_quiz.py --url http://127.0.0.1:8000 --learners 200 --mode word
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def start_server(port):
+    """저장소 루트의 main:app을 uvicorn으로 띄우고 응답할 때까지 기다림"""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_DIR
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            httpx.get(url + "/", timeout=1)
+            return server, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn 서버가 시작되지 않았습니다.")
+
+
+async def learner(client, slots, args, latencies, errors):
+    async def request(method, path, **kwargs):
+        # 연결 수만큼만 동시에 보내서, 클라이언트 쪽 대기 시간이 지연 시간에 섞이지 않게 함
+        async with slots:
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors.append(response.status_code)
+            return None
+        return response.json()
+
+    data = await request("POST", "/quiz/sessions", json={"difficulty": args.difficulty, "mode": args.mode})
+    if data is None:
+        return
+    session_id = data["session_id"]
+    for _ in range(args.questions):
+        if data["question"] is None:
+            break
+        # 정답률 절반 정도가 되도록 무작위로 답함
+        answer = str(random.randint(1, 10)) if args.mode == "meaning" else random.choice(["answer", ""])
+        data = await request("POST", f"/quiz/sessions/{session_id}/answer", json={"answer": answer})
+        if data is None:
+            return
+    await request("DELETE", f"/quiz/sessions/{session_id}")
+
+
+async def run(args, url):
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    slots = asyncio.Semaphore(args.connections)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(learner(client, slots, args, latencies, errors) for _ in range(args.learners)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="이미 떠 있는 서버 주소 (없으면 uvicorn을 직접 띄움)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--learners", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--connections", type=int, default=100, help="동시 HTTP 연결 수")
+    parser.add_argument("--difficulty", default="challenge")
+    parser.add_argument("--mode", choices=("word", "meaning"), default="meaning")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_server(args.port)
+    try:
+        rss_before = rss_mb(server.pid) if server else None
+        latencies, errors, elapsed = asyncio.run(run(args, url))
+        rss_after = rss_mb(server.pid) if server else None
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    print(f"learners={args.learners} questions={args.questions} connections={args.connections} mode={args.mode}")
+    print(f"requests={len(latencies)} errors={len(errors)} seconds={elapsed:.2f}")
+    print(f"req/s={len(latencies) / elapsed:.0f}")
+    print(
+        f"latency ms: p50={percentile(latencies, 0.50) * 1000:.2f} "
+        f"p95={percentile(latencies, 0.95) * 1000:.2f} p99={percentile(latencies, 0.99) * 1000:.2f}"
+    )
+    if rss_before is not None and rss_after is not None:
+        print(f"server RSS MB: before={rss_before:.1f} after={rss_after:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,12 @@
 Import-Csv -Path ".\oxford_C1_words.csv" | Select-Object -ExpandProperty entry > ".\entry_list.txt"
 oxford_C1_words.csv 파일의 entry 컬럼값을 추출해서 entry_list.txt 파일에 저장
 """
-import csv
-import random
 import os
 
+from quiz_engine import MEANING_QUIZ, WORD_QUIZ, QuizSession
+from study_scheduler import ProgressStore
+from word_bank import csv_path, open_word_bank
+
 # ANSI 색상 코드
 class Colors:
     GREEN = '\033[92m'  # 연두색
@@ -20,50 +22,72 @@ class Colors:
 
 
 def load_words(difficulty):
-    """선택한 난이도에 맞는 CSV 파일을 로드"""
-    if difficulty == 'challenge':
-        filename = "oxford_challenge_words.csv"
-    elif difficulty == 'A1_to_B1':
-        filename = "oxford_A1_to_B1_words.csv"
+    """선택한 난이도의 단어 목록 (CSV를 컴파일한 단어장 캐시를 mmap으로 열어 공유)"""
+    words = open_word_bank().words(difficulty)
+    if words is None:
+        print(f"오류: {os.path.basename(csv_path(difficulty))} 파일을 찾을 수 없습니다.")
+    return words
+
+
+def start_message(session):
+    """이번 퀴즈에 낼 단어 수 (복습일이 안 된 단어는 제외)"""
+    scheduler = session.scheduler
+    message = f"총 {scheduler.total}개의 단어가 준비되어 있습니다."
+    if scheduler.scheduled:
+        message += f" (아직 복습할 때가 안 된 {scheduler.scheduled}개 제외)"
+    return message
+
+
+def print_result(result):
+    """채점 결과와 진행 상황 표시"""
+    if result['correct']:
+        print(f"\n{Colors.GREEN}✓ 정답입니다! 🎉{Colors.END}")
     else:
-        filename = f"oxford_{difficulty}_words.csv"
+        if result['correct'] is False:
+            print(f"\n{Colors.RED}✗ 오답입니다.{Colors.END}")
+        print(f"정답: {result['answer']}")
+    print(f"예문: {result['example_sentence']}")
     
-    if not os.path.exists(filename):
-        print(f"오류: {filename} 파일을 찾을 수 없습니다.")
-        return None
+    # 진행 상황 표시
+    print(f"남은 단어: {result['remaining']}개")
+    print("-" * 60)
+
+
+def print_summary(session):
+    """최종 결과 표시"""
+    summary = session.summary()
+    print("\n" + "="*60)
+    print("퀴즈 종료!")
+    print(f"정답 개수: {summary['correct_count']}")
+    print(f"오답 개수: {summary['incorrect_count']}")
+    if summary['accuracy'] is not None:
+        print(f"정답률: {summary['accuracy']:.1f}%")
     
-    words = []
-    with open(filename, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            words.append({
-                'entry': row['entry'],
-                'part_of_speech': row['part_of_speech'],
-                'korean_meaning': row['korean_meaning'],
-                'example_sentence': row['example_sentence']
-            })
+    if summary['completed']:
+        print("\n🎊 축하합니다! 모든 단어를 맞추셨습니다! 🎊")
     
-    return words
+    print("="*60 + "\n")
 
 
-def quiz_game(words):
+def quiz_game(words, store=None):
     """단어 퀴즈 게임 진행 (한국어 뜻 보고 영어 단어 맞추기)"""
-    remaining_words = words.copy()
-    correct_count = 0
-    incorrect_count = 0
+    # 출제 순서/채점/점수는 퀴즈 엔진이 맡고, 여기서는 입출력만 처리
+    session = QuizSession(words, WORD_QUIZ, store=store)
     
     print("\n" + "="*60)
     print("영어 단어 퀴즈를 시작합니다! (한국어 뜻 → 영어 단어)")
-    print(f"총 {len(words)}개의 단어가 준비되어 있습니다.")
+    print(start_message(session))
     print("종료하려면 'quit' 또는 'q'를 입력하세요.")
     print("="*60 + "\n")
     
-    while remaining_words:
-        # 랜덤으로 단어 선택
-        word = random.choice(remaining_words)
+    while True:
+        # 복습할 때가 된 단어를 먼저, 없으면 새 단어를 랜덤으로 선택
+        question = session.question()
+        if question is None:
+            break
         
-        print(f"[문제 {len(words) - len(remaining_words) + 1}/{len(words)}]")
-        print(f"한국어 뜻: {word['korean_meaning']} ({word['part_of_speech']})")
+        print(f"[문제 {question['number']}/{question['total']}]")
+        print(f"한국어 뜻: {question['meaning']} ({question['part_of_speech']})")
         
         # 사용자 답변 입력
         user_answer = input("\n영어 단어를 입력하세요: ").strip().lower()
@@ -73,95 +97,33 @@ def quiz_game(words):
             print("\n퀴즈를 종료합니다.")
             break
         
-        # 정답 확인
-        correct_answer = word['entry'].lower()
-        
-        if user_answer == correct_answer:
-            print(f"\n{Colors.GREEN}✓ 정답입니다! 🎉{Colors.END}")
-            correct_count += 1
-            print(f"예문: {word['example_sentence']}")
-            # 정답인 경우 목록에서 제거
-            remaining_words.remove(word)
-        else:
-            print(f"\n{Colors.RED}✗ 오답입니다.{Colors.END}")
-            incorrect_count += 1
-            print(f"정답: {word['entry']}")
-            print(f"예문: {word['example_sentence']}")
-            # 오답인 경우 목록에 유지 (이미 remaining_words에 남아있음)
-        
-        # 진행 상황 표시
-        print(f"남은 단어: {len(remaining_words)}개")
-        print("-" * 60)
-    
-    # 최종 결과 표시
-    print("\n" + "="*60)
-    print("퀴즈 종료!")
-    print(f"정답 개수: {correct_count}")
-    print(f"오답 개수: {incorrect_count}")
-    if correct_count + incorrect_count > 0:
-        accuracy = (correct_count / (correct_count + incorrect_count)) * 100
-        print(f"정답률: {accuracy:.1f}%")
-    
-    if not remaining_words:
-        print("\n🎊 축하합니다! 모든 단어를 맞추셨습니다! 🎊")
+        # 정답 확인 (틀린 단어는 몇 문제 뒤에 다시 출제)
+        print_result(session.answer(user_answer))
     
-    print("="*60 + "\n")
+    print_summary(session)
 
 
-def meaning_quiz_game(words):
+def meaning_quiz_game(words, store=None):
     """뜻 맞추기 퀴즈 게임 진행 (영어 단어 보고 한국어 뜻 맞추기)"""
-    remaining_words = words.copy()
-    correct_count = 0
-    incorrect_count = 0
+    # 오답 보기 색인은 퀴즈 시작 시 한 번만 만듦
+    session = QuizSession(words, MEANING_QUIZ, store=store)
     
     print("\n" + "="*60)
     print("영어 단어 퀴즈를 시작합니다! (영어 단어 → 한국어 뜻)")
-    print(f"총 {len(words)}개의 단어가 준비되어 있습니다.")
+    print(start_message(session))
     print("종료하려면 'quit' 또는 'q'를 입력하세요.")
     print("="*60 + "\n")
     
-    while remaining_words:
-        # 랜덤으로 단어 선택
-        word = random.choice(remaining_words)
-        
-        print(f"[문제 {len(words) - len(remaining_words) + 1}/{len(words)}]  {word['entry']}\n")
-        # print(f"{word['entry']}\n")
-        
-        # 10지선다 객관식 보기 생성
-        correct_meaning = word['korean_meaning']
-        wrong_choices = []
-        
-        # 같은 품사를 가진 다른 단어들의 뜻을 랜덤으로 선택하여 오답 보기 생성
-        # 품사가 콤마로 구분된 경우 처리
-        word_pos = word['part_of_speech']
-        if ',' in word_pos:
-            # 콤마로 구분된 품사들 중 하나라도 포함된 단어들 찾기
-            pos_list = [pos.strip() for pos in word_pos.split(',')]
-            same_pos_words = [w for w in words if w['korean_meaning'] != correct_meaning and any(pos in w['part_of_speech'] for pos in pos_list)]
-        else:
-            # 단일 품사인 경우
-            same_pos_words = [w for w in words if w['korean_meaning'] != correct_meaning and w['part_of_speech'] == word_pos]
-        
-        if len(same_pos_words) >= 9:
-            wrong_choices = random.sample([w['korean_meaning'] for w in same_pos_words], 9)
-        else:
-            # 같은 품사 단어가 부족한 경우, 다른 품사 단어로 보충
-            other_words = [w for w in words if w['korean_meaning'] != correct_meaning]
-            if len(other_words) >= 9:
-                wrong_choices = random.sample([w['korean_meaning'] for w in other_words], 9)
-            else:
-                # 단어가 부족한 경우 중복 허용
-                wrong_choices = [random.choice([w['korean_meaning'] for w in other_words]) for _ in range(9)]
-        
-        # 정답과 오답을 섞어서 보기 생성
-        all_choices = [correct_meaning] + wrong_choices
-        random.shuffle(all_choices)
+    while True:
+        # 10지선다 객관식 보기 (같은 품사 단어들의 뜻으로 오답 보기 생성)
+        question = session.question()
+        if question is None:
+            break
         
-        # 정답의 위치 찾기
-        correct_index = all_choices.index(correct_meaning) + 1
+        print(f"[문제 {question['number']}/{question['total']}]  {question['entry']}\n")
         
         # 보기 출력 (가로로 5개씩 2줄)
-        # print("\n다음 중 올바른 뜻을 선택하세요:")
+        all_choices = question['choices']
         print()
         for row in range(2):
             choices_in_row = []
@@ -180,56 +142,15 @@ def meaning_quiz_game(words):
             print("\n퀴즈를 종료합니다.")
             break
         
-        # 아무것도 입력하지 않은 경우 처리
-        if not user_answer:
-            print(f"정답: {correct_meaning}")
-            print(f"예문: {word['example_sentence']}")
-            # 입력하지 않은 경우 목록에 유지 (다시 출제됨)
-            print(f"남은 단어: {len(remaining_words)}개")
-            print("-" * 60)
-            continue
-        
-        # 답변 유효성 검사
+        # 정답 확인 (아무것도 입력하지 않으면 정답만 보여주고 뒤로 미룸)
         try:
-            user_choice = int(user_answer)
-            if user_choice < 1 or user_choice > 10:
-                print("\n잘못된 입력입니다. 1-10 중에서 선택해주세요.")
-                continue
-        except ValueError:
-            print("\n잘못된 입력입니다. 숫자를 입력해주세요.")
+            result = session.answer(user_answer)
+        except ValueError as e:
+            print(f"\n{e}")
             continue
-        
-        # 정답 확인
-        if user_choice == correct_index:
-            print(f"\n{Colors.GREEN}✓ 정답입니다! 🎉{Colors.END}")
-            correct_count += 1
-            print(f"예문: {word['example_sentence']}")
-            # 정답인 경우 목록에서 제거
-            remaining_words.remove(word)
-        else:
-            print(f"\n{Colors.RED}✗ 오답입니다.{Colors.END}")
-            incorrect_count += 1
-            print(f"정답: {correct_meaning}")
-            print(f"예문: {word['example_sentence']}")
-            # 오답인 경우 목록에 유지 (이미 remaining_words에 남아있음)
-        
-        # 진행 상황 표시
-        print(f"남은 단어: {len(remaining_words)}개")
-        print("-" * 60)
-    
-    # 최종 결과 표시
-    print("\n" + "="*60)
-    print("퀴즈 종료!")
-    print(f"정답 개수: {correct_count}")
-    print(f"오답 개수: {incorrect_count}")
-    if correct_count + incorrect_count > 0:
-        accuracy = (correct_count / (correct_count + incorrect_count)) * 100
-        print(f"정답률: {accuracy:.1f}%")
-    
-    if not remaining_words:
-        print("\n🎊 축하합니다! 모든 단어를 맞추셨습니다! 🎊")
+        print_result(result)
     
-    print("="*60 + "\n")
+    print_summary(session)
 
 
 def main():
@@ -238,6 +159,9 @@ def main():
     print("영어 단어 학습 프로그램")
     print("="*60)
     
+    # 단어별 학습 기록 (여러 번 실행해도 이어서 복습)
+    store = ProgressStore()
+    
     while True:
         print("\n난이도를 선택하세요:")
         print("1. A1_to_B1 (초중급)")
@@ -261,6 +185,7 @@ def main():
             difficulty = 'challenge'
         elif choice == '6':
             print("\n프로그램을 종료합니다. 공부하느라 수고하셨습니다!")
+            store.close()
             break
         else:
             print("\n잘못된 입력입니다. 1-6 중에서 선택해주세요.")
@@ -283,14 +208,14 @@ def main():
                 # 퀴즈 시작 확인
                 start = input("\n퀴즈를 시작하시겠습니까? (y/n): ").strip().lower()
                 if start == 'y':
-                    quiz_game(words)
+                    quiz_game(words, store)
                 else:
                     print("난이도 선택으로 돌아갑니다.")
             elif quiz_type == '2':
                 # 퀴즈 시작 확인
                 start = input("\n퀴즈를 시작하시겠습니까? (y/n): ").strip().lower()
                 if start == 'y':
-                    meaning_quiz_game(words)
+                    meaning_quiz_game(words, store)
                 else:
                     print("난이도 선택으로 돌아갑니다.")
             else:
@@ -0,0 +1,373 @@
+"""영어 단어 퀴즈 엔진 (입출력과 무관한 출제/채점/진행 상태)
+
+터미널 퀴즈(english_word_quiz.py)와 API 서버(../main.py)가 함께 쓴다.
+- 단어 목록과 오답 보기 색인은 난이도마다 한 번만 만들어 모든 학습자가 읽기 전용으로 공유
+- 학습자마다 드는 것은 QuizSession(출제 순서, 현재 보기, 점수)뿐이고,
+  API 서버에서는 QuizSessionStore가 세션 ID로 보관한다
+  (워커 프로세스가 여럿이면 SharedQuizSessionStore가 SQLite에 보관해서 어느 워커로 가도 이어서 진행)
+"""
+import os
+import pickle
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from study_scheduler import QuizScheduler
+from word_bank import open_word_bank
+
+# 퀴즈 종류: 한국어 뜻 → 영어 단어 | 영어 단어 → 한국어 뜻(10지선다)
+WORD_QUIZ, MEANING_QUIZ = 'word', 'meaning'
+QUIZ_MODES = (WORD_QUIZ, MEANING_QUIZ)
+CHOICE_COUNT = 10
+
+QUIZ_SESSION_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz_sessions.db")
+
+
+def split_pos(part_of_speech):
+    """'n., v.' / 'n.;v.' / 'det./pron.'처럼 여러 품사가 붙은 값을 품사 목록으로 분리"""
+    return [pos.strip() for pos in re.split(r'[,;/]', part_of_speech) if pos.strip()]
+
+
+def sample_excluding(pool, excluded, count):
+    """pool에서 excluded를 뺀 서로 다른 값 count개 (pool이 충분히 크면 전체를 훑지 않고 뽑음)"""
+    if len(pool) < 2 * (count + 1):
+        return random.sample([value for value in pool if value != excluded], count)
+    # 뽑을 개수의 2배 이상 후보가 있으므로 한 번 뽑을 때 성공 확률이 1/2 이상 → 단어 수와 무관
+    picked = []
+    seen = {excluded}
+    while len(picked) < count:
+        value = pool[random.randrange(len(pool))]
+        if value not in seen:
+            seen.add(value)
+            picked.append(value)
+    return picked
+
+
+class DistractorIndex:
+    """뜻 맞추기 퀴즈의 오답 보기 색인 (load_words 후 한 번만 생성)
+
+    품사 값마다 품사가 하나라도 겹치는 단어들의 뜻을 중복 없이 모아두므로,
+    문제마다 전체 단어 목록을 훑지 않고 상수 시간에 보기를 뽑는다.
+    """
+
+    def __init__(self, words):
+        meanings_by_pos = {}
+        all_meanings = {}
+        for word in words:
+            meaning = word['korean_meaning']
+            all_meanings[meaning] = None
+            for pos in split_pos(word['part_of_speech']):
+                meanings_by_pos.setdefault(pos, {})[meaning] = None
+        self.all_meanings = list(all_meanings)
+
+        # 품사 값('n., v.' 등)의 종류는 몇십 개뿐이라 값마다 후보 뜻 목록을 미리 합쳐둠
+        self.pools = {}
+        for part_of_speech in {word['part_of_speech'] for word in words}:
+            merged = {}
+            for pos in split_pos(part_of_speech):
+                merged.update(meanings_by_pos[pos])
+            self.pools[part_of_speech] = list(merged)
+
+    def choices(self, word, count=9):
+        """정답과 다른 오답 뜻 count개 (같은 품사 우선, 부족하면 전체 단어에서)"""
+        correct_meaning = word['korean_meaning']
+        pool = self.pools.get(word['part_of_speech'], [])
+        # 후보 목록에는 정답 뜻도 들어 있으므로 하나를 빼고 셈
+        if len(pool) - 1 < count:
+            # 같은 품사 단어가 부족한 경우, 다른 품사 단어로 보충
+            pool = self.all_meanings
+        if len(pool) - 1 < count:
+            # 단어가 부족한 경우 중복 허용
+            others = [meaning for meaning in pool if meaning != correct_meaning]
+            return [random.choice(others) for _ in range(count)] if others else []
+        return sample_excluding(pool, correct_meaning, count)
+
+
+def make_choices(word, distractors):
+    """(10지선다 보기 목록, 정답 번호(1부터))"""
+    correct_meaning = word['korean_meaning']
+    choices = [correct_meaning] + distractors.choices(word, CHOICE_COUNT - 1)
+    random.shuffle(choices)
+    return choices, choices.index(correct_meaning) + 1
+
+
+def parse_choice(answer):
+    """입력한 보기 번호 (범위를 벗어나거나 숫자가 아니면 ValueError)"""
+    try:
+        choice = int(answer)
+    except ValueError:
+        raise ValueError("잘못된 입력입니다. 숫자를 입력해주세요.") from None
+    if choice < 1 or choice > CHOICE_COUNT:
+        raise ValueError(f"잘못된 입력입니다. 1-{CHOICE_COUNT} 중에서 선택해주세요.")
+    return choice
+
+
+class WordBankView:
+    """난이도별 단어 목록 + 오답 보기 색인 (처음 요청될 때 한 번 만들고 공유)"""
+
+    def __init__(self, bank=None):
+        self.bank = bank or open_word_bank()
+        self._distractors = {}
+
+    def words(self, difficulty):
+        return self.bank.words(difficulty)
+
+    def distractors(self, difficulty):
+        if difficulty not in self._distractors:
+            self._distractors[difficulty] = DistractorIndex(self.words(difficulty))
+        return self._distractors[difficulty]
+
+
+class QuizSession:
+    """학습자 한 명의 퀴즈 진행 상태"""
+
+    __slots__ = (
+        'words', 'mode', 'difficulty', 'scheduler', 'distractors',
+        'choices', 'correct_choice', 'correct_count', 'incorrect_count'
+    )
+
+    def __init__(self, words, mode, difficulty=None, store=None, distractors=None):
+        if mode not in QUIZ_MODES:
+            raise ValueError(f"퀴즈 종류는 {', '.join(QUIZ_MODES)} 중 하나입니다.")
+        self.words = words
+        self.mode = mode
+        self.difficulty = difficulty
+        # 복습할 단어 → 틀린 단어 → 새 단어 순으로 출제하고, 단어별 기록은 store에 저장
+        self.scheduler = QuizScheduler(words, mode, store)
+        if mode == MEANING_QUIZ and distractors is None:
+            distractors = DistractorIndex(words)
+        self.distractors = distractors
+        self.choices = None         # 지금 문제의 보기 (뜻 맞추기)
+        self.correct_choice = None  # 지금 문제의 정답 번호
+        self.correct_count = 0
+        self.incorrect_count = 0
+
+    @property
+    def word(self):
+        """지금 문제의 단어 (남은 단어가 없으면 None)"""
+        index = self.scheduler.next()
+        return None if index is None else self.words[index]
+
+    def question(self):
+        """지금 문제 (같은 문제를 다시 물으면 같은 보기), 모두 끝났으면 None"""
+        word = self.word
+        if word is None:
+            return None
+        question = {
+            'number': self.scheduler.completed + 1,
+            'total': self.scheduler.total,
+            'remaining': self.scheduler.remaining,
+        }
+        if self.mode == WORD_QUIZ:
+            question['meaning'] = word['korean_meaning']
+            question['part_of_speech'] = word['part_of_speech']
+        else:
+            if self.choices is None:
+                self.choices, self.correct_choice = make_choices(word, self.distractors)
+            question['entry'] = word['entry']
+            question['choices'] = self.choices
+        return question
+
+    def answer(self, answer):
+        """답을 채점하고 결과를 돌려줌
+
+        뜻 맞추기에서 빈 답은 채점하지 않고 정답만 보여준 뒤 뒤로 미룬다.
+        보기 번호가 잘못되면 ValueError (문제는 그대로 유지)
+        """
+        word = self.word
+        if word is None:
+            raise ValueError("남은 문제가 없습니다.")
+        answer = answer.strip()
+        if self.mode == WORD_QUIZ:
+            correct = answer.lower() == word['entry'].lower()
+            correct_answer = word['entry']
+        else:
+            correct_answer = word['korean_meaning']
+            if not answer:
+                correct = None
+            else:
+                correct = parse_choice(answer) == self.correct_choice
+
+        if correct is None:
+            self.scheduler.skip()
+        else:
+            self.scheduler.answer(correct)
+            if correct:
+                self.correct_count += 1
+            else:
+                self.incorrect_count += 1
+        self.choices = self.correct_choice = None
+        return {
+            'correct': correct,
+            'answer': correct_answer,
+            'example_sentence': word['example_sentence'],
+            'remaining': self.scheduler.remaining,
+            'done': not self.scheduler.remaining,
+        }
+
+    def state(self):
+        """단어 목록/오답 보기 색인을 뺀 진행 상태"""
+        return {
+            'mode': self.mode,
+            'difficulty': self.difficulty,
+            'choices': self.choices,
+            'correct_choice': self.correct_choice,
+            'correct_count': self.correct_count,
+            'incorrect_count': self.incorrect_count,
+            'scheduler': self.scheduler.state(),
+        }
+
+    @classmethod
+    def restore(cls, state, words, distractors=None):
+        """state()로 저장한 진행 상태를 공유 단어 목록/오답 보기 색인에 다시 붙임"""
+        session = cls.__new__(cls)
+        session.words = words
+        session.distractors = distractors
+        for name in ('mode', 'difficulty', 'choices', 'correct_choice', 'correct_count', 'incorrect_count'):
+            setattr(session, name, state[name])
+        session.scheduler = QuizScheduler.restore(words, state['scheduler'])
+        return session
+
+    def summary(self):
+        answered = self.correct_count + self.incorrect_count
+        return {
+            'correct_count': self.correct_count,
+            'incorrect_count': self.incorrect_count,
+            'accuracy': self.correct_count / answered * 100 if answered else None,
+            'completed': bool(self.scheduler.total) and not self.scheduler.remaining,
+        }
+
+
+class QuizSessionStore:
+    """학습자별 퀴즈 진행 상태 (메모리, 오래 안 쓴 것부터 정리)
+
+    OrderedDict를 마지막 사용 순서로 유지하므로 만료/초과 정리는 앞에서부터 꺼내기만 하면 된다.
+    """
+
+    def __init__(self, max_sessions=100000, ttl_seconds=3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()  # session_id → (QuizSession, 마지막 사용 시각)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def add(self, session):
+        session_id = uuid.uuid4().hex
+        self._sessions[session_id] = (session, time.monotonic())
+        self._evict()
+        return session_id
+
+    def get(self, session_id):
+        """세션 (없거나 만료되었으면 None)"""
+        self._evict()
+        item = self._sessions.get(session_id)
+        if item is None:
+            return None
+        self._sessions[session_id] = (item[0], time.monotonic())
+        self._sessions.move_to_end(session_id)
+        return item[0]
+
+    def save(self, session_id, session):
+        """메모리의 세션은 제자리에서 바뀌므로 할 일 없음 (SharedQuizSessionStore와 같은 인터페이스)"""
+
+    def remove(self, session_id):
+        item = self._sessions.pop(session_id, None)
+        return item[0] if item else None
+
+    def _evict(self):
+        expires = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            session_id, (_, last_used) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and last_used > expires:
+                break
+            del self._sessions[session_id]
+
+
+QUIZ_SESSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quiz_sessions (
+    session_id TEXT PRIMARY KEY,
+    state BLOB NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_quiz_sessions_last_used ON quiz_sessions(last_used);
+"""
+
+
+class SharedQuizSessionStore:
+    """워커 프로세스 여러 개가 같이 쓰는 학습자별 퀴즈 진행 상태 (SQLite)
+
+    요청마다 학습자의 진행 상태(번호 배열, heap, 점수)만 읽어 QuizSession으로 되살리고,
+    바뀐 뒤 save()로 다시 쓴다. 단어 목록/오답 보기 색인은 저장하지 않고 WordBankView에서 다시 붙인다.
+    """
+
+    def __init__(self, word_bank, path=None, max_sessions=100000, ttl_seconds=3600):
+        self.word_bank = word_bank
+        self.path = path or QUIZ_SESSION_DB
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(QUIZ_SESSION_SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM quiz_sessions").fetchone()[0]
+
+    def add(self, session):
+        session_id = uuid.uuid4().hex
+        self.save(session_id, session)
+        self._evict()
+        return session_id
+
+    def get(self, session_id):
+        """세션 (없거나 만료되었으면 None)"""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT state FROM quiz_sessions WHERE session_id = ? AND last_used > ?",
+            (session_id, time.time() - self.ttl_seconds)
+        ).fetchone()
+        if row is None:
+            return None
+        return self._restore(pickle.loads(row[0]))
+
+    def save(self, session_id, session):
+        """바뀐 진행 상태를 저장하고 마지막 사용 시각을 갱신"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO quiz_sessions (session_id, state, last_used) VALUES (?, ?, ?)",
+                (session_id, pickle.dumps(session.state(), protocol=pickle.HIGHEST_PROTOCOL), time.time())
+            )
+
+    def remove(self, session_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT state FROM quiz_sessions WHERE session_id = ?", (session_id,)).fetchone()
+            conn.execute("DELETE FROM quiz_sessions WHERE session_id = ?", (session_id,))
+        return self._restore(pickle.loads(row[0])) if row else None
+
+    def _restore(self, state):
+        difficulty = state['difficulty']
+        distractors = self.word_bank.distractors(difficulty) if state['mode'] == MEANING_QUIZ else None
+        return QuizSession.restore(state, self.word_bank.words(difficulty), distractors)
+
+    def _evict(self):
+        # 만료된 세션을 지우고, 그래도 많으면 오래 안 쓴 것부터 지움
+        with self._connect() as conn:
+            conn.execute("DELETE FROM quiz_sessions WHERE last_used <= ?", (time.time() - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM quiz_sessions WHERE session_id IN "
+                "(SELECT session_id FROM quiz_sessions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,)
+            )
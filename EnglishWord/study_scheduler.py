@@ -0,0 +1,239 @@
+"""퀴즈 출제 순서와 단어별 학습 기록 (간격 반복)
+
+- WordPool: 아직 한 번도 풀지 않은 단어 번호 배열. 무작위로 고른 자리에 맨 뒤 원소를 옮기고
+  맨 뒤를 잘라내므로 꺼내기가 O(1)이고, 단어당 2~4바이트만 씀
+- 우선순위 큐(heap): (출제 시점, 난이도) 순으로 다시 낼 단어. 넣고 빼기 O(log N)
+- 단어별 기록은 SM-2 방식(반복 횟수, 쉬움 정도, 복습 간격)으로 SQLite에 저장하므로
+  여러 번 나눠 실행해도 이어서 학습할 수 있다
+
+한 번의 퀴즈에서는 복습할 때가 된 단어를 먼저, 그다음 새 단어를 무작위로 낸다.
+맞힌 단어는 이번 퀴즈에서 빠지고 다음 복습일이 정해지며, 틀린 단어는 몇 문제 뒤에 다시 나온다.
+"""
+import heapq
+import os
+import random
+import sqlite3
+import time
+from array import array
+
+PROGRESS_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz_progress.db")
+
+# 틀린 단어를 다시 낼 때까지 건너뛸 문제 수
+RELEARN_GAP = 5
+
+# SM-2 설정
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+DAY_SECONDS = 24 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS word_progress (
+    mode TEXT NOT NULL,
+    entry TEXT NOT NULL,
+    meaning TEXT NOT NULL,
+    repetitions INTEGER NOT NULL DEFAULT 0,
+    ease REAL NOT NULL DEFAULT 2.5,
+    interval_days REAL NOT NULL DEFAULT 0,
+    due_at REAL NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    incorrect INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (mode, entry, meaning)
+);
+"""
+
+
+def word_key(word):
+    """학습 기록 키 (같은 단어라도 단어장마다 뜻이 다르면 따로 기록)"""
+    return word['entry'].strip().lower(), word['korean_meaning']
+
+
+class WordPool:
+    """단어 번호 배열: 추가와 무작위 꺼내기 모두 O(1)"""
+
+    __slots__ = ('items',)
+
+    def __init__(self, size=0, filled=False):
+        # 단어 번호 크기에 맞춰 u16/u32 배열 사용 (학습자가 많아도 메모리가 작게 유지됨)
+        self.items = array('H' if size <= 0xFFFF else 'I', range(size) if filled else ())
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, index):
+        self.items.append(index)
+
+    def pop_random(self):
+        # 고른 자리에 맨 뒤 원소를 옮기고 맨 뒤를 잘라냄
+        i = random.randrange(len(self.items))
+        index = self.items[i]
+        self.items[i] = self.items[-1]
+        self.items.pop()
+        return index
+
+
+class ProgressStore:
+    """단어별 학습 기록 (SQLite)"""
+
+    def __init__(self, path=None):
+        self.path = path or PROGRESS_DB
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def load(self, mode):
+        """(단어, 뜻) → 기록 dict"""
+        rows = self.conn.execute("SELECT * FROM word_progress WHERE mode = ?", (mode,))
+        return {(row['entry'], row['meaning']): dict(row) for row in rows}
+
+    def save(self, mode, key, record):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO word_progress "
+                "(mode, entry, meaning, repetitions, ease, interval_days, due_at, correct, incorrect) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    mode,
+                    key[0],
+                    key[1],
+                    record['repetitions'],
+                    record['ease'],
+                    record['interval_days'],
+                    record['due_at'],
+                    record['correct'],
+                    record['incorrect']
+                )
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+def new_record():
+    return {
+        'repetitions': 0,
+        'ease': INITIAL_EASE,
+        'interval_days': 0,
+        'due_at': 0,
+        'correct': 0,
+        'incorrect': 0
+    }
+
+
+def review(record, correct, now):
+    """SM-2로 다음 복습 시점 계산 (맞힘=품질 4, 틀림=품질 1)"""
+    quality = 4 if correct else 1
+    record['ease'] = max(MIN_EASE, record['ease'] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if correct:
+        record['correct'] += 1
+        record['repetitions'] += 1
+        if record['repetitions'] == 1:
+            record['interval_days'] = 1
+        elif record['repetitions'] == 2:
+            record['interval_days'] = 6
+        else:
+            record['interval_days'] = round(record['interval_days'] * record['ease'], 1)
+    else:
+        record['incorrect'] += 1
+        record['repetitions'] = 0
+        record['interval_days'] = 0
+    record['due_at'] = now + record['interval_days'] * DAY_SECONDS
+    return record
+
+
+class QuizScheduler:
+    """한 번의 퀴즈에서 다음 문제를 고르고, 답을 기록
+
+    복습할 때가 된 단어와 틀린 단어는 (출제 문제 번호, 쉬움 정도) 순의 heap에,
+    처음 보는 단어는 WordPool에 둔다. 아직 복습일이 안 된 단어는 이번 퀴즈에서 제외한다.
+    단어 목록은 모든 학습자가 공유하고, 학습자마다 따로 드는 것은 번호 배열과 진행 중인 단어 기록뿐이다.
+    """
+
+    __slots__ = (
+        'words', 'mode', 'store', 'now', 'records', 'step', 'current', 'completed',
+        '_order', 'queue', 'pool', 'scheduled', 'total'
+    )
+
+    def __init__(self, words, mode, store=None, now=None):
+        self.words = words
+        self.mode = mode
+        self.store = store
+        self.now = time.time() if now is None else now
+        saved = store.load(mode) if store else {}
+        self.records = {}      # 이번 퀴즈에서 출제할 단어 중 기록이 있는 것만
+        self.step = 0          # 지금까지 답한 문제 수
+        self.current = None    # 답을 기다리는 단어 번호
+        self.completed = 0     # 이번 퀴즈에서 맞혀서 빠진 단어 수
+        self._order = 0        # heap에서 같은 우선순위일 때 넣은 순서
+
+        self.queue = []
+        # 기록이 하나도 없으면 단어를 훑지 않고 모든 번호를 새 단어로 넣음
+        self.pool = WordPool(len(words), filled=not saved)
+        self.scheduled = 0     # 아직 복습일이 안 되어 제외한 단어 수
+        for index, word in enumerate(words if saved else ()):
+            key = word_key(word)
+            record = saved.get(key)
+            if record is None:
+                self.pool.add(index)
+            elif record['due_at'] <= self.now:
+                # 오래 밀린 복습, 어려운 단어 순으로 먼저 냄
+                self.records[key] = record
+                self._push(index, 0, (record['due_at'], record['ease']))
+            else:
+                self.scheduled += 1
+        self.total = len(self.queue) + len(self.pool)
+
+    def state(self):
+        """단어 목록과 기록 저장소를 뺀 진행 상태 (워커 프로세스들이 같이 쓰는 세션 저장소에 보관)"""
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot not in ('words', 'store')}
+
+    @classmethod
+    def restore(cls, words, state, store=None):
+        """state()로 저장한 진행 상태를 단어 목록에 다시 붙임"""
+        scheduler = cls.__new__(cls)
+        scheduler.words = words
+        scheduler.store = store
+        for slot, value in state.items():
+            setattr(scheduler, slot, value)
+        return scheduler
+
+    def _push(self, index, due_step, priority=()):
+        self._order += 1
+        heapq.heappush(self.queue, (due_step, priority, self._order, index))
+
+    @property
+    def remaining(self):
+        return len(self.queue) + len(self.pool) + (self.current is not None)
+
+    def next(self):
+        """다음에 낼 단어 번호 (남은 단어가 없으면 None). 답하기 전에 다시 부르면 같은 단어"""
+        if self.current is not None:
+            return self.current
+        if self.queue and (self.queue[0][0] <= self.step or not self.pool):
+            self.current = heapq.heappop(self.queue)[-1]
+        elif self.pool:
+            self.current = self.pool.pop_random()
+        return self.current
+
+    def answer(self, correct):
+        """지금 단어의 채점 결과를 기록 (틀리면 RELEARN_GAP 문제 뒤에 다시 냄)"""
+        index, self.current = self.current, None
+        self.step += 1
+        key = word_key(self.words[index])
+        record = review(self.records.get(key) or new_record(), correct, time.time())
+        self.records[key] = record
+        if self.store:
+            self.store.save(self.mode, key, record)
+        if correct:
+            # 이번 퀴즈에서 다시 낼 일이 없으므로 메모리에서는 지움
+            del self.records[key]
+            self.completed += 1
+        else:
+            self._push(index, self.step + RELEARN_GAP, (record['ease'],))
+
+    def skip(self):
+        """채점하지 않고 지금 단어를 뒤로 미룸 (기록은 그대로)"""
+        index, self.current = self.current, None
+        self.step += 1
+        self._push(index, self.step + RELEARN_GAP)
@@ -0,0 +1,237 @@
+"""단어장 바이너리 캐시 (다섯 개의 oxford_*_words.csv를 한 파일로 컴파일)
+
+CSV를 난이도를 고를 때마다 다시 파싱하면 같은 문자열과 dict가 매번 새로 만들어진다.
+여기서는 모든 CSV를 처음 한 번만 word_bank.bin으로 컴파일하고, 이후에는 mmap으로 열어
+필요한 필드만 그때그때 디코딩한다. 여러 프로세스가 같은 파일을 열면 OS 페이지 캐시를 공유한다.
+
+파일 구성 (리틀/빅 엔디언은 만든 기계 기준, 다르면 다시 컴파일):
+    b"WBNK" | 버전(u32) | 헤더 길이(u32)
+    헤더 JSON      원본 CSV별 mtime/크기/sha256, 품사 목록, 난이도별 단어 범위 (4바이트 정렬)
+    offsets        u32 배열 (단어마다 entry, 뜻, 예문 3개 문자열의 시작 위치 + 끝)
+    pos            u8 배열 (품사 목록의 번호, 같은 품사 문자열은 하나만 보관)
+    blob           UTF-8 문자열을 이어붙인 바이트
+
+CSV의 mtime/크기가 바뀌면 내용 해시를 비교해, 내용까지 바뀐 경우에만 다시 컴파일한다.
+"""
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Mapping, Sequence
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(BASE_DIR, "word_bank.bin")
+
+DIFFICULTIES = ('A1_to_B1', 'B2', 'C1', 'C2', 'challenge')
+
+MAGIC = b"WBNK"
+# 파일 형식이 바뀌면 올려서 예전 캐시를 다시 컴파일
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct("<4sII")
+FIELDS = ('entry', 'korean_meaning', 'example_sentence')
+KEYS = ('entry', 'part_of_speech', 'korean_meaning', 'example_sentence')
+
+
+def csv_path(difficulty):
+    return os.path.join(BASE_DIR, f"oxford_{difficulty}_words.csv")
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def _pad4(data):
+    return data + b" " * (-len(data) % 4)
+
+
+def compile_bank(path=CACHE_PATH):
+    """있는 CSV를 모두 읽어 캐시 파일로 저장 (임시 파일에 쓴 뒤 이름을 바꿈)"""
+    sources = {}
+    ranges = {}
+    pos_names = []
+    pos_codes = {}
+    offsets = array('I', [0])
+    codes = array('B')
+    blob = bytearray()
+
+    for difficulty in DIFFICULTIES:
+        filename = csv_path(difficulty)
+        if not os.path.exists(filename):
+            continue
+        start = len(codes)
+        with open(filename, 'r', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                pos = row['part_of_speech']
+                if pos not in pos_codes:
+                    if len(pos_names) == 256:
+                        raise ValueError("품사 종류가 256개를 넘어 u8 번호로 저장할 수 없습니다.")
+                    pos_codes[pos] = len(pos_names)
+                    pos_names.append(pos)
+                codes.append(pos_codes[pos])
+                for field in FIELDS:
+                    blob += row[field].encode('utf-8')
+                    offsets.append(len(blob))
+        ranges[difficulty] = [start, len(codes)]
+        sources[os.path.basename(filename)] = {**_source_stamp(filename), 'sha256': _file_hash(filename)}
+
+    header = _pad4(json.dumps({
+        'byteorder': sys.byteorder,
+        'count': len(codes),
+        'pos': pos_names,
+        'ranges': ranges,
+        'sources': sources
+    }, ensure_ascii=False).encode('utf-8'))
+
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=".word_bank-", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            f.write(offsets.tobytes())
+            f.write(_pad4(codes.tobytes()))
+            f.write(blob)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _read_header(path):
+    """캐시 파일의 헤더 (없거나 형식이 다르면 None)"""
+    try:
+        with open(path, 'rb') as f:
+            magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return None
+            return json.loads(f.read(header_len))
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def is_fresh(header):
+    """캐시가 지금 CSV 파일들과 같은 내용으로 만들어졌는지"""
+    if header is None or header['byteorder'] != sys.byteorder:
+        return False
+    current = {os.path.basename(csv_path(d)) for d in DIFFICULTIES if os.path.exists(csv_path(d))}
+    if current != set(header['sources']):
+        return False
+    for name, saved in header['sources'].items():
+        path = os.path.join(BASE_DIR, name)
+        stamp = _source_stamp(path)
+        if stamp['mtime_ns'] == saved['mtime_ns'] and stamp['size'] == saved['size']:
+            continue
+        # git checkout처럼 시각만 바뀐 경우는 내용 해시로 확인
+        if stamp['size'] != saved['size'] or _file_hash(path) != saved['sha256']:
+            return False
+    return True
+
+
+class Word(Mapping):
+    """단어장의 단어 하나 (dict처럼 word['entry']로 읽고, 필드는 읽을 때 디코딩)"""
+
+    __slots__ = ('bank', 'index')
+
+    def __init__(self, bank, index):
+        self.bank = bank
+        self.index = index
+
+    def __getitem__(self, key):
+        if key == 'part_of_speech':
+            return self.bank.pos_names[self.bank.pos[self.index]]
+        try:
+            field = FIELDS.index(key)
+        except ValueError:
+            raise KeyError(key) from None
+        return self.bank.string(self.index * 3 + field)
+
+    def __iter__(self):
+        return iter(KEYS)
+
+    def __len__(self):
+        return len(KEYS)
+
+    def __repr__(self):
+        return f"Word({dict(self)!r})"
+
+
+class WordList(Sequence):
+    """한 난이도의 단어 목록 (단어 객체는 꺼낼 때 만듦)"""
+
+    def __init__(self, bank, start, stop):
+        self.bank = bank
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return Word(self.bank, self.start + i)
+
+
+class WordBank:
+    """mmap으로 연 단어장 캐시 (읽기 전용)"""
+
+    def __init__(self, path=CACHE_PATH):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        _, _, header_len = _PREFIX.unpack_from(view)
+        position = _PREFIX.size
+        self.header = json.loads(bytes(view[position:position + header_len]))
+        position += header_len
+
+        count = self.header['count']
+        offsets_len = (count * 3 + 1) * 4
+        self.offsets = view[position:position + offsets_len].cast('I')
+        position += offsets_len
+        self.pos = view[position:position + count]
+        position += count + (-count % 4)
+        self.blob = view[position:]
+        # 품사 문자열은 종류마다 하나만 만들어 모든 단어가 공유
+        self.pos_names = [sys.intern(name) for name in self.header['pos']]
+        self.ranges = self.header['ranges']
+
+    def string(self, i):
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+    def __len__(self):
+        return self.header['count']
+
+    def words(self, difficulty):
+        """난이도의 단어 목록 (CSV가 없었으면 None)"""
+        if difficulty not in self.ranges:
+            return None
+        start, stop = self.ranges[difficulty]
+        return WordList(self, start, stop)
+
+
+_banks = {}
+
+
+def open_word_bank(path=CACHE_PATH):
+    """캐시가 없거나 CSV가 바뀌었으면 다시 컴파일한 뒤 연다 (프로세스당 한 번)"""
+    if path not in _banks:
+        if not is_fresh(_read_header(path)):
+            compile_bank(path)
+        _banks[path] = WordBank(path)
+    return _banks[path]
@@ -0,0 +1,224 @@
+"""대용량 말뭉치용 근사 최근접 이웃(ANN) FAISS 인덱스
+
+LangChain의 FAISS.from_documents는 항상 전체 float32 벡터를 그대로 담는 Flat 인덱스를 만든다.
+여기서는 벡터 수에 따라(또는 설정으로) HNSW / IVF-Flat / IVF-PQ / IVF-SQ8 인덱스를 만들어
+같은 docstore와 함께 LangChain FAISS 객체로 감싼다. 거리 척도는 기존과 같은 L2다.
+"""
+import math
+from typing import Optional
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+import config
+
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq", "ivf_sq8")
+
+# faiss 학습에 필요한 최소 벡터 수: PQ는 부분 공간마다 2^8개 중심, IVF는 클러스터당 39개
+PQ_MIN_TRAIN_VECTORS = 256
+IVF_MIN_VECTORS_PER_LIST = 39
+
+
+def ann_settings() -> dict:
+    """만들어지는 인덱스를 바꾸는 설정 (공유 인덱스 식별값에 포함, 검색 시점 설정인 nprobe/efSearch는 제외)"""
+    return {
+        "index_type": config.ANN_INDEX_TYPE,
+        "hnsw_min_vectors": config.ANN_HNSW_MIN_VECTORS,
+        "ivf_min_vectors": config.ANN_IVF_MIN_VECTORS,
+        "hnsw_m": config.HNSW_M,
+        "hnsw_ef_construction": config.HNSW_EF_CONSTRUCTION,
+        "ivf_nlist": config.IVF_NLIST,
+        "pq_m": config.PQ_M,
+    }
+
+
+def choose_index_type(count: int, requested: str = None) -> str:
+    """설정값이 auto면 벡터 수로 인덱스 종류를 고름"""
+    requested = requested or config.ANN_INDEX_TYPE
+    if requested != "auto":
+        if requested not in INDEX_TYPES:
+            raise ValueError(f"지원하지 않는 인덱스 종류: {requested}")
+        return _trainable_type(requested, count)
+    if count >= config.ANN_IVF_MIN_VECTORS:
+        return "ivf_sq8"
+    if count >= config.ANN_HNSW_MIN_VECTORS:
+        return "hnsw"
+    return "flat"
+
+
+def _trainable_type(index_type: str, count: int) -> str:
+    """학습할 벡터가 모자라면 더 단순한 인덱스로 낮춤 (작은 업로드가 학습 오류로 실패하지 않도록)"""
+    if index_type == "ivf_pq" and count < PQ_MIN_TRAIN_VECTORS:
+        index_type = "ivf_flat"
+    if index_type.startswith("ivf") and count < IVF_MIN_VECTORS_PER_LIST:
+        index_type = "flat"
+    return index_type
+
+
+def index_type_of(index) -> str:
+    """faiss 인덱스 객체의 종류 이름"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVFScalarQuantizer):
+        return "ivf_sq8"
+    if isinstance(index, faiss.IndexIVFFlat):
+        return "ivf_flat"
+    return "flat"
+
+
+def _nlist(count: int) -> int:
+    nlist = config.IVF_NLIST or int(4 * math.sqrt(count))
+    # 설정값이어도 클러스터당 학습 벡터가 최소 39개는 되도록 제한 (벡터 수보다 클러스터가 많으면 학습 실패)
+    return max(1, min(nlist, count // IVF_MIN_VECTORS_PER_LIST))
+
+
+def _pq_m(dim: int) -> int:
+    if config.PQ_M:
+        return config.PQ_M
+    return max(m for m in range(1, dim // 8 + 1) if dim % m == 0)
+
+
+def factory_string(index_type: str, dim: int, count: int) -> str:
+    if index_type == "hnsw":
+        return f"HNSW{config.HNSW_M}"
+    if index_type == "ivf_flat":
+        return f"IVF{_nlist(count)},Flat"
+    if index_type == "ivf_pq":
+        return f"IVF{_nlist(count)},PQ{_pq_m(dim)}"
+    if index_type == "ivf_sq8":
+        return f"IVF{_nlist(count)},SQ8"
+    return "Flat"
+
+
+def set_search_params(index, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """검색 정확도/속도 조절 (IVF: nprobe, HNSW: efSearch)"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = nprobe or config.IVF_NPROBE
+    elif isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search or config.HNSW_EF_SEARCH
+
+
+def build_index(vectors: np.ndarray, index_type: str, max_train_points: int = 256):
+    """벡터로 인덱스를 학습(IVF)하고 채움"""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    count, dim = vectors.shape
+    index = faiss.index_factory(dim, factory_string(index_type, dim, count), faiss.METRIC_L2)
+
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efConstruction = config.HNSW_EF_CONSTRUCTION
+    if not index.is_trained:
+        # 학습은 클러스터당 max_train_points개 정도의 표본이면 충분
+        sample_size = min(count, faiss.extract_index_ivf(index).nlist * max_train_points)
+        sample = vectors[np.random.default_rng(0).choice(count, sample_size, replace=False)]
+        index.train(sample)
+
+    index.add(vectors)
+    if isinstance(index, faiss.IndexIVF):
+        # 삭제 후 재구성할 때 벡터를 꺼낼 수 있도록 direct map 유지
+        index.make_direct_map()
+    set_search_params(index)
+    return index
+
+
+def rebuild_vectorstore(vectorstore: FAISS, index_type: str) -> FAISS:
+    """같은 docstore를 유지한 채 인덱스만 다른 종류로 다시 만듦
+
+    IVF-PQ/SQ8에서 꺼낸 벡터는 양자화된 근삿값이므로, 정확한 재구성이 필요하면
+    디스크에 캐시된 파일별 Flat 인덱스에서 다시 만드는 편이 낫다.
+    """
+    count = vectorstore.index.ntotal
+    vectors = vectorstore.index.reconstruct_n(0, count)
+    return FAISS(
+        embedding_function=vectorstore.embedding_function,
+        index=build_index(vectors, index_type),
+        docstore=vectorstore.docstore,
+        index_to_docstore_id=dict(vectorstore.index_to_docstore_id),
+    )
+
+
+def copy_index(index: faiss.Index) -> faiss.Index:
+    """인덱스를 수정할 수 있는 메모리 복사본으로 (mmap으로 연 공유 인덱스 포함)
+
+    clone_index는 mmap으로 연 인덱스의 저장 공간을 그대로 참조하므로 직렬화해서 복사한다.
+    mmap으로 연 IVF의 역리스트(OnDiskInvertedLists)는 직렬화하면 읽을 때 원본 파일을 쓰기 모드로
+    다시 매핑하려다 실패하므로, 역리스트를 뺀 나머지만 직렬화하고 역리스트는 메모리로 옮겨 담는다.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is None or not isinstance(faiss.downcast_InvertedLists(ivf.invlists), faiss.OnDiskInvertedLists):
+        return faiss.deserialize_index(faiss.serialize_index(index))
+
+    writer = faiss.VectorIOWriter()
+    faiss.write_index(index, writer, faiss.IO_FLAG_SKIP_IVF_DATA)
+    reader = faiss.VectorIOReader()
+    reader.data = writer.data
+    copied = faiss.read_index(reader, faiss.IO_FLAG_SKIP_IVF_DATA)
+
+    source = ivf.invlists
+    invlists = faiss.ArrayInvertedLists(source.nlist, source.code_size)
+    for list_no in range(source.nlist):
+        size = source.list_size(list_no)
+        if size:
+            invlists.add_entries(list_no, size, source.get_ids(list_no), source.get_codes(list_no))
+    faiss.extract_index_ivf(copied).replace_invlists(invlists, True)
+    invlists.this.disown()  # 복사한 인덱스가 해제함
+    return copied
+
+
+def copy_vectorstore(vectorstore: FAISS) -> FAISS:
+    """인덱스/docstore/ID 매핑을 메모리로 복사 (mmap으로 연 공유 인덱스도 수정할 수 있는 복사본이 됨)"""
+    index_to_docstore_id = dict(vectorstore.index_to_docstore_id)
+    return FAISS(
+        embedding_function=vectorstore.embedding_function,
+        index=copy_index(vectorstore.index),
+        docstore=InMemoryDocstore(
+            {doc_id: vectorstore.docstore.search(doc_id) for doc_id in index_to_docstore_id.values()}
+        ),
+        index_to_docstore_id=index_to_docstore_id,
+    )
+
+
+def maybe_rebuild(vectorstore: Optional[FAISS]) -> Optional[FAISS]:
+    """벡터 수에 맞는 인덱스 종류가 현재와 다르면 다시 만듦 (같으면 그대로 반환)"""
+    if vectorstore is None:
+        return None
+    wanted = choose_index_type(vectorstore.index.ntotal)
+    if wanted == index_type_of(vectorstore.index):
+        return vectorstore
+    return rebuild_vectorstore(vectorstore, wanted)
+
+
+def delete_documents(vectorstore: FAISS, ids) -> Optional[FAISS]:
+    """청크 삭제
+
+    Flat 인덱스는 LangChain의 delete로 바로 지운다. HNSW는 remove_ids를 지원하지 않고,
+    IVF는 삭제 후 위치 번호가 당겨지지 않아 LangChain의 ID 매핑과 어긋나므로
+    남은 벡터로 같은 종류의 인덱스를 다시 만든다. (삭제는 파일을 뺄 때만 일어남)
+    """
+    index_type = index_type_of(vectorstore.index)
+    if index_type == "flat":
+        vectorstore.delete(ids)
+        return vectorstore
+
+    remove = set(ids)
+    keep = [(pos, doc_id) for pos, doc_id in sorted(vectorstore.index_to_docstore_id.items()) if doc_id not in remove]
+    vectorstore.docstore.delete([doc_id for doc_id in ids if doc_id in vectorstore.docstore._dict])
+    if not keep:
+        return FAISS(
+            embedding_function=vectorstore.embedding_function,
+            index=faiss.IndexFlatL2(vectorstore.index.d),
+            docstore=vectorstore.docstore,
+            index_to_docstore_id={},
+        )
+    vectors = np.vstack([vectorstore.index.reconstruct(pos) for pos, _ in keep])
+    return FAISS(
+        embedding_function=vectorstore.embedding_function,
+        index=build_index(vectors, choose_index_type(len(keep), index_type)),
+        docstore=vectorstore.docstore,
+        index_to_docstore_id={i: doc_id for i, (_, doc_id) in enumerate(keep)},
+    )
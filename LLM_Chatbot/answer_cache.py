@@ -0,0 +1,126 @@
+"""같은 문서 묶음에 대한 비슷한 질문의 답변을 재사용하는 캐시
+
+키는 (말뭉치 식별값, 정규화한 질문 임베딩)이다. 저장된 질문과의 코사인 유사도가
+threshold 이상이면 저장된 답변과 출처 문서를 그대로 돌려주고, 질문 재작성 / 검색 / LLM 호출을 건너뛴다.
+후속 질문은 대화 맥락에 따라 뜻이 달라지므로 이전 대화가 없는 질문에만 쓴다 (app.py).
+오래된 항목은 TTL로 만료되고, 개수가 max_entries를 넘으면 가장 오래 안 쓴 항목부터 지운다(LRU).
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+import config
+
+
+def normalize_question(question: str) -> str:
+    """공백/대소문자/끝 문장부호 차이를 무시"""
+    return re.sub(r"\s+", " ", question).strip().lower().rstrip("?!.？！。 ")
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    answer: str
+    source_documents: List[Document]
+    vector: np.ndarray
+    created_at: float = field(default_factory=time.time)
+
+
+class SemanticAnswerCache:
+    """프로세스 전체에서 공유하는 스레드 안전 답변 캐시"""
+
+    def __init__(
+        self,
+        embeddings,
+        threshold: float = None,
+        max_entries: int = None,
+        ttl_seconds: int = None,
+    ):
+        self.embeddings = embeddings
+        self.threshold = config.ANSWER_CACHE_THRESHOLD if threshold is None else threshold
+        self.max_entries = max_entries or config.ANSWER_CACHE_MAX_ENTRIES
+        self.ttl_seconds = config.ANSWER_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        # (말뭉치, 정규화한 질문) → CachedAnswer, 최근 사용 순서 유지
+        self._entries: "OrderedDict[Tuple[str, str], CachedAnswer]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expire(self, now: float):
+        if not self.ttl_seconds:
+            return
+        expired = [key for key, entry in self._entries.items() if now - entry.created_at > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+
+    def lookup(self, corpus: str, question: str) -> Tuple[Optional[CachedAnswer], Optional[np.ndarray]]:
+        """캐시된 답변과 질문 벡터를 돌려줌 (정확히 같은 질문이면 임베딩도 생략)
+
+        돌려받은 벡터를 store()에 넘기면 같은 질문을 두 번 임베딩하지 않는다.
+        """
+        normalized = normalize_question(question)
+        with self._lock:
+            self._expire(time.time())
+            entry = self._entries.get((corpus, normalized))
+            if entry is not None:
+                self._entries.move_to_end((corpus, normalized))
+                self.hits += 1
+                return entry, entry.vector
+
+        vector = self._embed(normalized)
+        with self._lock:
+            candidates = [(key, entry) for key, entry in self._entries.items() if key[0] == corpus]
+            if candidates:
+                matrix = np.stack([entry.vector for _, entry in candidates])
+                scores = matrix @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    key, entry = candidates[best]
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry, vector
+            self.misses += 1
+        return None, vector
+
+    def store(
+        self,
+        corpus: str,
+        question: str,
+        answer: str,
+        source_documents: List[Document],
+        vector: Optional[np.ndarray] = None,
+    ):
+        normalized = normalize_question(question)
+        if vector is None:
+            vector = self._embed(normalized)
+        entry = CachedAnswer(question, answer, list(source_documents), vector)
+        with self._lock:
+            self._entries[(corpus, normalized)] = entry
+            self._entries.move_to_end((corpus, normalized))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
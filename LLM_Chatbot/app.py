@@ -1,22 +1,15 @@
 import streamlit as st
 import os
-import json
 import uuid
-from datetime import datetime
-from typing import List, Dict, Any
-import pandas as pd
 from dotenv import load_dotenv
 load_dotenv()
 
-# RAG 관련 imports
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain.chains import ConversationalRetrievalChain
-from langchain.memory import ConversationBufferMemory
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
-from langchain.schema import Document
-import tempfile
+# 첫 화면(사이드바, 세션 목록)에 필요한 가벼운 모듈만 여기서 import하고,
+# LangChain/FAISS/OpenAI를 쓰는 모듈은 그 단계가 처음 실행될 때 함수 안에서 import한다
+# (Streamlit은 상호작용마다 스크립트를 다시 실행하지만, 한 번 import한 모듈은 재사용됨)
+import config
+from session_store import SessionStore, create_session, load_sessions
+from metrics import CACHE_LOOKUP, REGISTRY, RequestTrace, start_metrics_server
 
 # API 키 설정
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -27,7 +20,7 @@ if not openai_api_key:
 # Streamlit 페이지 설정
 st.set_page_config(
     page_title="문서검색 도우미 챗봇",
-    page_icon="",
+    page_icon="📚",  # 빈 문자열은 이미지로 처리되어 numpy를 불러옴
     layout="wide",
     initial_sidebar_state="expanded"
 )
@@ -43,207 +36,278 @@ if 'conversation_chain' not in st.session_state:
     st.session_state.conversation_chain = None
 if 'uploaded_docs' not in st.session_state:
     st.session_state.uploaded_docs = []
+if 'indexed_files' not in st.session_state:
+    st.session_state.indexed_files = {}  # 파일명 → {"key": 캐시 키, "ids": 청크 ID 목록}
+if 'keyword_index' not in st.session_state:
+    st.session_state.keyword_index = None  # 벡터 스토어와 같은 청크의 BM25 역색인
+if 'corpus_id' not in st.session_state:
+    st.session_state.corpus_id = ""  # 지금 열려 있는 말뭉치 (세션 저장소에 세션별로 기록됨)
+if 'history_window' not in st.session_state:
+    st.session_state.history_window = {}  # 세션 ID → 화면에 표시할 최근 메시지 수
+if 'ingest_job' not in st.session_state:
+    # 진행 중인 문서 수집 작업 (새로고침해도 URL의 작업 ID로 이어서 확인)
+    st.session_state.ingest_job = st.query_params.get("ingest_job")
 
 
-class ChatSession:
-    def __init__(self, session_id: str, name: str):
-        self.session_id = session_id
-        self.name = name
-        self.messages = []
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
-    
-    def add_message(self, role: str, content: str, sources: List[str] = None):
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            "sources": sources or []
-        }
-        self.messages.append(message)
-        self.updated_at = datetime.now()
-    
-    def to_dict(self):
-        return {
-            "session_id": self.session_id,
-            "name": self.name,
-            "messages": self.messages,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
-        }
+@st.cache_resource
+def get_metrics_server():
+    """프로세스당 한 번 /metrics HTTP 서버 시작 (RAG_METRICS_PORT가 0이면 사용 안 함)"""
+    if config.METRICS_PORT:
+        return start_metrics_server(config.METRICS_PORT)
+    return None
+
+def show_latency_panel():
+    """최근 요청의 단계별 지연 시간 (p50/p95)"""
+    with st.expander("⏱️ 지연 시간"):
+        for kind, title in (("query", "질문"), ("ingest", "문서 처리")):
+            rows = REGISTRY.summary(kind)
+            if not rows:
+                continue
+            table = [f"**{title}**", "", "| 단계 | p50 | p95 | 횟수 |", "|---|---|---|---|"]
+            table += [
+                f"| {row['stage']} | {row['p50'] * 1000:.0f}ms | {row['p95'] * 1000:.0f}ms | {row['count']} |"
+                for row in rows
+            ]
+            st.markdown("\n".join(table))
+        prompt_tokens = REGISTRY.counter("query", "prompt_tokens")
+        completion_tokens = REGISTRY.counter("query", "completion_tokens")
+        st.caption(f"토큰: 입력 {prompt_tokens} / 출력 {completion_tokens}")
+
+@st.cache_resource
+def get_embedding_client():
+    """모든 사용자 세션이 공유하는 임베딩 클라이언트 (로컬 백엔드면 모델을 여기서 한 번 로드)"""
+    from embedding_provider import get_embeddings
+    return get_embeddings()
+
+@st.cache_resource
+def get_llm_clients():
+    """모든 대화 체인이 공유하는 (답변 LLM, 질문 재작성 LLM) 클라이언트 (연결 풀은 임베딩과 공유)"""
+    from openai_clients import get_llms
+    return get_llms(openai_api_key)
+
+@st.cache_resource
+def get_answer_cache():
+    """모든 사용자 세션이 공유하는 질문-답변 캐시"""
+    from answer_cache import SemanticAnswerCache
+    return SemanticAnswerCache(get_embedding_client())
 
-def load_sessions():
-    """저장된 세션들을 로드"""
-    sessions_file = "chat_sessions.json"
-    if os.path.exists(sessions_file):
-        try:
-            with open(sessions_file, 'r', encoding='utf-8') as f:
-                sessions_data = json.load(f)
-            
-            sessions = {}
-            for session_data in sessions_data:
-                session = ChatSession(
-                    session_data['session_id'],
-                    session_data['name']
-                )
-                session.messages = session_data['messages']
-                session.created_at = datetime.fromisoformat(session_data['created_at'])
-                session.updated_at = datetime.fromisoformat(session_data['updated_at'])
-                sessions[session.session_id] = session
-            
-            return sessions
-        except Exception as e:
-            st.error(f"세션 로드 중 오류: {e}")
-            return {}
-    return {}
 
-def save_sessions():
-    """세션들을 파일에 저장"""
-    sessions_file = "chat_sessions.json"
-    try:
-        sessions_data = [session.to_dict() for session in st.session_state.chat_sessions.values()]
-        with open(sessions_file, 'w', encoding='utf-8') as f:
-            json.dump(sessions_data, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        st.error(f"세션 저장 중 오류: {e}")
+@st.cache_resource
+def get_session_store():
+    """모든 사용자 세션이 공유하는 채팅 세션 저장소 (예전 chat_sessions.json은 프로세스마다 여기서 한 번만 가져옴)"""
+    store = SessionStore()
+    store.import_json(config.LEGACY_SESSIONS_FILE)
+    return store
 
 def create_new_session():
     """새로운 채팅 세션 생성"""
     session_id = str(uuid.uuid4())
     session_name = f"세션 {len(st.session_state.chat_sessions) + 1}"
-    new_session = ChatSession(session_id, session_name)
+    new_session = create_session(get_session_store(), session_id, session_name)
     st.session_state.chat_sessions[session_id] = new_session
     st.session_state.current_session_id = session_id
-    save_sessions()
     return session_id
 
-# 1. 데이터 로드
-def load_documents(uploaded_files):
-    """업로드된 파일들을 문서로 변환"""
-    documents = []
-    
-    for uploaded_file in uploaded_files:
-        # 임시 파일로 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as tmp_file:
-            tmp_file.write(uploaded_file.read())
-            tmp_file_path = tmp_file.name
-        
-        try:
-            if uploaded_file.name.endswith('.pdf'):
-                loader = PyPDFLoader(tmp_file_path)
-                docs = loader.load()
-            elif uploaded_file.name.endswith('.txt'):
-                # 여러 인코딩을 시도해보기
-                encodings = ['utf-8', 'cp949', 'euc-kr', 'latin-1']
-                docs = None
-                
-                for encoding in encodings:
-                    try:
-                        # 파일이 실제로 존재하는지 확인
-                        if not os.path.exists(tmp_file_path):
-                            st.error(f"임시 파일이 생성되지 않았습니다: {tmp_file_path}")
-                            break
-                            
-                        loader = TextLoader(tmp_file_path, encoding=encoding)
-                        docs = loader.load()
-                        st.success(f"파일 '{uploaded_file.name}'을 {encoding} 인코딩으로 성공적으로 로드했습니다.")
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                    except Exception as e:
-                        st.warning(f"인코딩 {encoding}으로 파일을 읽을 수 없습니다: {e}")
-                        continue
-                
-                if docs is None:
-                    st.error(f"파일 '{uploaded_file.name}'의 인코딩을 인식할 수 없습니다.")
-                    continue
-            else:
-                st.warning(f"지원하지 않는 파일 형식: {uploaded_file.name}")
-                continue
-            
-            # 문서에 메타데이터 추가
-            for doc in docs:
-                doc.metadata['source'] = uploaded_file.name
-            
-            documents.extend(docs)
-            
-        except Exception as e:
-            st.error(f"파일 '{uploaded_file.name}' 처리 중 오류: {e}")
-        finally:
-            # 임시 파일 삭제
-            if os.path.exists(tmp_file_path):
-                os.unlink(tmp_file_path)
-    
-    return documents
+def show_messages(messages):
+    """문서 로더가 돌려준 (레벨, 내용) 메시지를 화면에 표시"""
+    for level, text in messages:
+        getattr(st, level)(text)
 
-# 2 to 4. 데이터 분할 + 임베딩 + 벡터DB 저장
-def create_vectorstore(documents):
-    """문서들로부터 벡터 스토어 생성"""
-    if not documents:
-        return None
-    
-    # 2. 텍스트 분할
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len
+@st.cache_resource
+def get_corpus_cache():
+    """최근에 쓴 말뭉치의 인덱스를 프로세스당 메모리 예산 안에서 열어 두고 모든 세션이 공유"""
+    from corpus_cache import CorpusCache
+    return CorpusCache()
+
+@st.cache_resource
+def get_ingest_queue():
+    """모든 사용자 세션이 공유하는 백그라운드 문서 수집 작업 큐"""
+    from ingest_jobs import IngestQueue
+    return IngestQueue()
+
+# 파일별 처리 단계 → (진행률, 표시 이름)
+STAGE_PROGRESS = {
+    "queued": (0.0, "대기 중"),
+    "parsed": (0.25, "파싱 완료"),
+    "chunked": (0.5, "임베딩 중"),
+    "embedded": (0.75, "임베딩 완료"),
+    "indexed": (1.0, "인덱싱 완료"),
+    "skipped": (1.0, "내용 없음")
+}
+
+def start_ingest_job(uploaded_files):
+    """업로드한 파일로 새 인덱스를 만드는 작업을 백그라운드에 등록"""
+    files = [(f.name, f.getvalue()) for f in uploaded_files]
+    # 지금 인덱스를 넘기면 작업은 그 복사본에 추가/삭제된 파일만 반영
+    base = None
+    if st.session_state.vectorstore is not None:
+        base = (st.session_state.vectorstore, st.session_state.keyword_index, st.session_state.indexed_files)
+    job_id = get_ingest_queue().submit(files, shared=config.SHARED_INDEX, base=base)
+    st.session_state.ingest_job = job_id
+    st.query_params["ingest_job"] = job_id
+
+def finish_ingest_job():
+    st.session_state.ingest_job = None
+    if "ingest_job" in st.query_params:
+        del st.query_params["ingest_job"]
+
+def clear_index():
+    """파일을 모두 뺐을 때 인덱스와 대화 체인을 비움"""
+    st.session_state.corpus_id = ""
+    st.session_state.vectorstore = None
+    st.session_state.conversation_chain = None
+    st.session_state.keyword_index = None
+    st.session_state.indexed_files = {}
+    st.session_state.uploaded_docs = []
+
+def activate_corpus(corpus_id, corpus):
+    """말뭉치(LoadedCorpus)의 인덱스로 검색/대화 체인을 교체하고 현재 세션의 대화 맥락을 복원"""
+    st.session_state.corpus_id = corpus_id
+    st.session_state.vectorstore = corpus.vectorstore
+    st.session_state.keyword_index = corpus.keyword_index
+    st.session_state.indexed_files = corpus.indexed_files
+    st.session_state.uploaded_docs = list(corpus.indexed_files)
+    from rag_pipeline import create_conversation_chain
+    llm, condense_llm = get_llm_clients()
+    conversation_chain = create_conversation_chain(
+        corpus.vectorstore, openai_api_key, llm=llm, condense_llm=condense_llm, keyword_index=corpus.keyword_index
     )
+    st.session_state.conversation_chain = conversation_chain
+    current = st.session_state.chat_sessions.get(st.session_state.current_session_id)
+    sync_memory_with_session(conversation_chain, current)
+
+def bind_session_corpus(chat_session):
+    """세션에 지금 열려 있는 말뭉치를 기록 (세션을 다시 고르면 이 말뭉치를 엶)"""
+    if not chat_session or chat_session.corpus_id == st.session_state.corpus_id:
+        return
+    files = {name: info["key"] for name, info in st.session_state.indexed_files.items()}
+    get_session_store().save_corpus(chat_session.session_id, st.session_state.corpus_id, files)
+    chat_session.corpus_id = st.session_state.corpus_id
+
+def restore_session_corpus(chat_session):
+    """세션에 기록된 말뭉치로 전환 (최근에 쓴 말뭉치는 메모리에서, 아니면 디스크에서 다시 엶)"""
+    if not chat_session.corpus_id or chat_session.corpus_id == st.session_state.corpus_id:
+        # 말뭉치가 같거나 아직 기록이 없는 세션은 지금 인덱스를 그대로 쓰고 대화 맥락만 복원
+        sync_memory_with_session(st.session_state.conversation_chain, chat_session)
+        return
     
-    chunks = text_splitter.split_documents(documents)
-    
-    # 3. 임베딩 생성
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-    
-    # 4. FAISS 벡터 스토어 생성 후 저장
-    vectorstore = FAISS.from_documents(chunks, embeddings)
-    
-    return vectorstore
+    _, files = get_session_store().load_corpus(chat_session.session_id)
+    corpus = get_corpus_cache().get(chat_session.corpus_id, files)
+    if corpus is None:
+        clear_index()
+        st.session_state.ingest_notice = (
+            "warning", "이 세션의 문서 인덱스를 찾을 수 없습니다. 문서를 다시 업로드해주세요."
+        )
+        return
+    activate_corpus(chat_session.corpus_id, corpus)
 
-# 5. LangChain 생성
-def create_conversation_chain(vectorstore, openai_api_key):
-    """대화형 검색 체인 생성"""
-    if not vectorstore:
-        return None
+def apply_ingest_result(job):
+    """완료된 작업의 인덱스로 한 번에 교체 (작업 중에는 이전 인덱스로 계속 대화)"""
+    corpus_cache = get_corpus_cache()
+    if config.SHARED_INDEX:
+        files = {f["name"]: f["file_key"] for f in job["file_progress"]}
+        corpus_id = job["corpus_id"]
+        corpus = corpus_cache.get(corpus_id, files)
+        if corpus is None:
+            return False
+    else:
+        result = get_ingest_queue().result(job["job_id"])
+        if result is None:
+            return False
+        vectorstore, keyword_index, indexed_files = result
+        from rag_pipeline import shared_corpus_id
+        corpus_id = shared_corpus_id({name: info["key"] for name, info in indexed_files.items()})
+        corpus = corpus_cache.put(corpus_id, vectorstore, keyword_index, indexed_files)
     
-    llm = ChatOpenAI(
-        model="gpt-4-turbo-preview",
-        temperature=0.7,
-        openai_api_key=openai_api_key
-    )
+    previous = set(st.session_state.indexed_files)
+    activate_corpus(corpus_id, corpus)
+    # 새 인덱스는 지금 세션의 말뭉치가 됨
+    bind_session_corpus(st.session_state.chat_sessions.get(st.session_state.current_session_id))
+    indexed_files = corpus.indexed_files
     
-    # 메모리 설정
-    memory = ConversationBufferMemory(
-        memory_key="chat_history",
-        return_messages=True,
-        output_key="answer"
-    )
+    added = len(set(indexed_files) - previous)
+    removed = len(previous - set(indexed_files))
+    stats = job["stats"]
+    notice = f"✅ 추가 {added}개 / 삭제 {removed}개 파일이 반영되었습니다! (캐시 사용: {stats.get('cached', 0)}개)"
+    if stats.get("chunks_saved") or stats.get("tokens_saved"):
+        # 중복 청크/반복 머리글·바닥글을 임베딩 전에 걸러 낸 양
+        notice += f" 중복 제거로 청크 {stats['chunks_saved']}개, 토큰 {stats['tokens_saved']:,}개 절약"
+    st.session_state.ingest_notice = ("success", notice)
+    return True
+
+@st.fragment(run_every=1.0)
+def show_ingest_progress():
+    """작업 진행 상황만 주기적으로 다시 그림 (채팅 화면은 그대로)"""
+    from ingest_jobs import DONE, FAILED
+    job = get_ingest_queue().store.get(st.session_state.ingest_job)
+    if job is None:
+        finish_ingest_job()
+        return
     
-    # 대화형 검색 체인 생성
-    conversation_chain = ConversationalRetrievalChain.from_llm(
-        llm=llm,
-        retriever=vectorstore.as_retriever(search_kwargs={"k": 3}),
-        memory=memory,
-        return_source_documents=True,
-        verbose=True
-    )
+    if job["status"] == DONE:
+        applied = apply_ingest_result(job)
+        finish_ingest_job()
+        if not applied:
+            st.session_state.ingest_notice = ("warning", "작업 결과를 찾을 수 없습니다. 문서를 다시 업로드해주세요.")
+        st.rerun()
+    if job["status"] == FAILED:
+        finish_ingest_job()
+        st.session_state.ingest_notice = ("error", f"문서를 처리할 수 없습니다: {job['error']}")
+        st.rerun()
     
-    return conversation_chain
+    st.caption("문서를 학습하고 있습니다... (기존 문서로 계속 대화할 수 있습니다)")
+    for file in job["file_progress"]:
+        value, label = STAGE_PROGRESS.get(file["stage"], (0.0, file["stage"]))
+        if file["stage"] == "chunked" and file["chunks"]:
+            value += 0.25 * file["embedded"] / file["chunks"]
+            label = f"임베딩 {file['embedded']}/{file['chunks']} 청크"
+        st.progress(min(value, 1.0), text=f"{file['name']}: {label}")
+    show_messages(job["messages"])
 
 def sync_memory_with_session(conversation_chain, chat_session):
-    """세션에 저장된 메시지를 LangChain 메모리에 반영"""
+    """세션의 캐시된 요약 + 최근 메시지만 LangChain 메모리에 반영 (전체 대화를 다시 넣지 않음)"""
     if not conversation_chain or not chat_session:
         return
     
+    from chat_memory import restore_memory
+    store = get_session_store()
+    summary, summary_upto = store.load_summary(chat_session.session_id)
     memory = conversation_chain.memory
-    memory.clear()  # 기존 메모리 초기화
-    
-    for msg in chat_session.messages:
-        if msg["role"] == "user":
-            memory.chat_memory.add_user_message(msg["content"])
-        elif msg["role"] == "assistant":
-            memory.chat_memory.add_ai_message(msg["content"])
-            
+    if restore_memory(memory, chat_session.messages, summary, summary_upto):
+        save_memory_summary(conversation_chain, chat_session)
+
+def save_memory_summary(conversation_chain, chat_session):
+    """메모리의 누적 요약을 세션 저장소에 캐시"""
+    memory = conversation_chain.memory
+    summary_upto = max(0, chat_session.message_count - memory.buffered_count)
+    get_session_store().save_summary(chat_session.session_id, memory.moving_summary_buffer, summary_upto)
+
+def render_sources(source_docs):
+    """출처 문서 목록을 접이식 영역으로 표시"""
+    if not source_docs:
+        return
+    from rag_pipeline import format_source
+    with st.expander("📚 출처"):
+        for i, doc in enumerate(source_docs, 1):
+            st.write(f"**{i}. {format_source(doc)}**")
+            st.write(doc.page_content[:300] + "..." if len(doc.page_content) > 300 else doc.page_content)
+            st.divider()
+
+@st.cache_data(max_entries=2000, show_spinner=False)
+def sources_markdown(sources):
+    """저장된 출처 목록을 마크다운 한 덩어리로 변환 (바뀌지 않은 메시지는 캐시 사용)"""
+    return "\n".join(f"{i}. {source}" for i, source in enumerate(sources, 1))
+
+def render_message(role, content, sources=()):
+    """저장된 메시지 하나를 말풍선으로 표시"""
+    with st.chat_message(role):
+        st.markdown(content)
+        if role == "assistant" and sources:
+            with st.expander("📚 출처"):
+                st.markdown(sources_markdown(sources))
+
 def main():
+    get_metrics_server()
     st.title("📚 RAG 문서 챗봇")
     st.markdown("PDF/TXT 문서를 업로드하고 질문해보세요!")
     
@@ -253,7 +317,10 @@ def main():
         
         # 세션 로드
         if not st.session_state.chat_sessions:
-            st.session_state.chat_sessions = load_sessions()
+            try:
+                st.session_state.chat_sessions = load_sessions(get_session_store())
+            except Exception as e:
+                st.error(f"세션 로드 중 오류: {e}")
         
         # 새 세션 생성 버튼
         if st.button("🆕 새 세션 생성"):
@@ -267,20 +334,20 @@ def main():
                 col1, col2 = st.columns([3, 1])
                 with col1:
                     if st.button(
-                        f"{session.name} ({len(session.messages)})",
+                        f"{session.name} ({session.message_count})",
                         key=f"session_{session_id}",
                         use_container_width=True
                     ):
                         st.session_state.current_session_id = session_id
-                        # 🔑 대화 히스토리 복원
-                        sync_memory_with_session(st.session_state.conversation_chain, st.session_state.chat_sessions[session_id])
+                        # 🔑 세션의 문서 인덱스와 대화 히스토리 복원
+                        restore_session_corpus(session)
                         st.rerun()
                 with col2:
                     if st.button("🗑️", key=f"delete_{session_id}"):
                         del st.session_state.chat_sessions[session_id]
                         if st.session_state.current_session_id == session_id:
                             st.session_state.current_session_id = None
-                        save_sessions()
+                        get_session_store().delete_session(session_id)
                         st.rerun()
         
         st.divider()
@@ -293,31 +360,38 @@ def main():
             accept_multiple_files=True
         )
         
-        if uploaded_files:
-            if st.button("문서 업로드"):
-                with st.spinner("업로드한 문서를 학습하고 있습니다..."):
-                    # 문서 로드
-                    documents = load_documents(uploaded_files)
-                    st.session_state.uploaded_docs = [f.name for f in uploaded_files]
-                    
-                    if documents:
-                        # 벡터 스토어 생성
-                        vectorstore = create_vectorstore(documents)
-                        st.session_state.vectorstore = vectorstore
-                        
-                        # 대화 체인 생성
-                        conversation_chain = create_conversation_chain(vectorstore, openai_api_key)
-                        st.session_state.conversation_chain = conversation_chain
-                        
-                        st.success(f"✅ {len(documents)}개의 문서가 성공적으로 처리되었습니다!")
-                    else:
-                        st.error("문서를 처리할 수 없습니다.")
+        # 파일을 모두 뺀 경우에도 인덱스에서 삭제할 수 있도록 버튼 표시
+        if uploaded_files or st.session_state.indexed_files:
+            if st.button("문서 업로드", disabled=bool(st.session_state.ingest_job)):
+                if uploaded_files:
+                    # 파싱/임베딩은 백그라운드에서 진행하고, 끝나면 새 인덱스로 교체
+                    start_ingest_job(uploaded_files)
+                else:
+                    clear_index()
+                    bind_session_corpus(st.session_state.chat_sessions.get(st.session_state.current_session_id))
+        
+        if st.session_state.ingest_job:
+            show_ingest_progress()
+        
+        # 작업이 끝나며 남긴 결과 메시지는 한 번만 표시
+        if "ingest_notice" in st.session_state:
+            show_messages([st.session_state.pop("ingest_notice")])
         
         # 업로드된 문서 표시
         if st.session_state.uploaded_docs:
             st.subheader("📋 업로드된 문서")
             for doc_name in st.session_state.uploaded_docs:
                 st.text(f"• {doc_name}")
+        
+        # 답변 캐시 현황 (캐시는 임베딩 클라이언트가 필요하므로 문서를 불러온 뒤에만 표시)
+        if config.ANSWER_CACHE_ENABLED and st.session_state.conversation_chain:
+            answer_cache = get_answer_cache()
+            st.caption(
+                f"답변 캐시: {len(answer_cache)}개 저장 / 적중 {answer_cache.hits} / "
+                f"미적중 {answer_cache.misses} ({answer_cache.hit_rate:.0%})"
+            )
+        
+        show_latency_panel()
     
     # 메인 영역 - 채팅
     if not st.session_state.conversation_chain:
@@ -336,26 +410,29 @@ def main():
     # 채팅 히스토리 표시
     st.subheader(f"💬 {current_session.name}")
     
-    # 메시지 표시 영역
+    # 메시지 표시 영역 (최근 메시지만 표시하고, 이전 메시지는 요청할 때 더 보여줌)
     chat_container = st.container()
     
+    messages = current_session.messages
+    window = st.session_state.history_window.get(current_session.session_id, config.CHAT_PAGE_SIZE)
+    hidden_count = max(0, len(messages) - window)
+    
     with chat_container:
-        for message in current_session.messages:
-            if message["role"] == "user":
-                with st.chat_message("user"):
-                    st.write(message["content"])
-            else:
-                with st.chat_message("assistant"):
-                    st.write(message["content"])
-                    if message.get("sources"):
-                        with st.expander("📚 출처"):
-                            for i, source in enumerate(message["sources"], 1):
-                                st.write(f"{i}. {source}")
+        if hidden_count:
+            if st.button(f"⬆️ 이전 메시지 {min(hidden_count, config.CHAT_PAGE_SIZE)}개 더 보기 (숨김 {hidden_count}개)"):
+                st.session_state.history_window[current_session.session_id] = window + config.CHAT_PAGE_SIZE
+                st.rerun()
+        
+        for message in messages[hidden_count:]:
+            render_message(message["role"], message["content"], tuple(message.get("sources") or ()))
     
     # 질문 입력
     user_question = st.chat_input("문서에 대해 질문해보세요...")
     
     if user_question:
+        # 말뭉치를 기록하지 않은 세션(문서를 올린 뒤 만든 세션 등)은 지금 말뭉치에 묶음
+        bind_session_corpus(current_session)
+        
         # 사용자 메시지 추가
         current_session.add_message("user", user_question)
         
@@ -363,43 +440,75 @@ def main():
         with st.chat_message("user"):
             st.write(user_question)
         
-        # AI 응답 생성
+        # AI 응답 생성 (토큰이 도착하는 대로 표시하고, 검색이 끝나면 출처를 먼저 붙임)
+        from rag_pipeline import format_source
+        from streaming import MetricsCallbackHandler, StreamingAnswerHandler
         with st.chat_message("assistant"):
-            with st.spinner("답변을 생성하고 있습니다..."):
-                try:
-                    response = st.session_state.conversation_chain({"question": user_question})
+            answer_placeholder = st.empty()
+            sources_placeholder = st.empty()
+            answer_placeholder.markdown("답변을 생성하고 있습니다...")
+            
+            def show_sources(source_docs):
+                with sources_placeholder.container():
+                    render_sources(source_docs)
+            
+            handler = StreamingAnswerHandler(
+                on_token=lambda text: answer_placeholder.markdown(text + "▌"),
+                on_sources=show_sources
+            )
+            # 질문 재작성/검색/첫 토큰/전체 생성 시간과 토큰 수 계측
+            trace = RequestTrace("query")
+            
+            try:
+                # 같은 문서에 대한 비슷한 질문이 캐시에 있으면 체인을 건너뜀
+                # 이전 대화가 있으면 후속 질문("그건 얼마야?")의 뜻이 맥락에 따라 달라지므로 캐시를 쓰지 않음
+                memory = st.session_state.conversation_chain.memory
+                use_cache = config.ANSWER_CACHE_ENABLED and st.session_state.corpus_id and not memory.has_history
+                answer_cache = get_answer_cache() if use_cache else None
+                cached, question_vector = None, None
+                if answer_cache is not None:
+                    with trace.span(CACHE_LOOKUP):
+                        cached, question_vector = answer_cache.lookup(st.session_state.corpus_id, user_question)
+                    trace.count("answer_cache_hit" if cached else "answer_cache_miss")
+                
+                if cached:
+                    answer = cached.answer
+                    source_docs = cached.source_documents
+                    # 캐시 답변도 대화 메모리에는 남겨 후속 질문의 맥락이 되도록 함
+                    memory.save_context(
+                        {"question": user_question}, {"answer": answer}
+                    )
+                else:
+                    response = st.session_state.conversation_chain.invoke(
+                        {"question": user_question},
+                        config={"callbacks": [handler, MetricsCallbackHandler(trace)]}
+                    )
                     answer = response["answer"]
                     source_docs = response.get("source_documents", [])
-                    
-                    # 답변 표시
-                    st.write(answer)
-                    
-                    # 출처 정보 수집
-                    sources = []
-                    if source_docs:
-                        with st.expander("📚 출처"):
-                            for i, doc in enumerate(source_docs, 1):
-                                source_name = doc.metadata.get('source', '알 수 없음')
-                                page = doc.metadata.get('page', '')
-                                page_info = f" (페이지 {page + 1})" if page != '' else ""
-                                source_text = f"{source_name}{page_info}"
-                                sources.append(source_text)
-                                
-                                st.write(f"**{i}. {source_text}**")
-                                st.write(doc.page_content[:300] + "..." if len(doc.page_content) > 300 else doc.page_content)
-                                st.divider()
-                    
-                    # AI 메시지 추가
-                    current_session.add_message("assistant", answer, sources)
-                    
-                except Exception as e:
-                    error_message = f"답변 생성 중 오류가 발생했습니다: {e}"
-                    st.error(error_message)
-                    current_session.add_message("assistant", error_message)
+                    if answer_cache is not None:
+                        answer_cache.store(st.session_state.corpus_id, user_question, answer, source_docs, question_vector)
+                
+                # 답변 표시
+                answer_placeholder.markdown(answer)
+                
+                # 출처 정보 수집
+                show_sources(source_docs)
+                sources = [format_source(doc) for doc in source_docs]
+                
+                # AI 메시지 추가
+                current_session.add_message("assistant", answer, sources)
+                save_memory_summary(st.session_state.conversation_chain, current_session)
+                
+            except Exception as e:
+                trace.count("errors")
+                error_message = f"답변 생성 중 오류가 발생했습니다: {e}"
+                answer_placeholder.error(error_message)
+                current_session.add_message("assistant", error_message)
+            
+            REGISTRY.observe(trace)
         
-        # 세션 저장
-        save_sessions()
-        st.rerun()
+        # 메시지는 add_message에서 이미 저장소에 추가되었고 새 답변도 화면에 그려졌으므로,
+        # 전체 화면을 다시 그리는 st.rerun()은 하지 않음
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
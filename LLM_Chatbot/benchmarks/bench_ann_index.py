@@ -0,0 +1,141 @@
+"""벡터 인덱스 종류별 recall(Flat 기준), 검색 지연, 메모리 측정 (합성 벡터, 오프라인)
+
+종류마다 공유 인덱스처럼 파일로 저장해 mmap으로 연 뒤 수정용 복사본(copy_index)을 만드는 시간도 잰다.
+복사본의 검색 결과가 원본과 다르거나 복사본에 벡터를 더할 수 없으면 종료 코드 1로 끝난다.
+
+사용법:
+    python benchmarks/bench_ann_index.py --vectors 100000 --dim 1536
+    python benchmarks/bench_ann_index.py --types hnsw --ef-search 16 32 64 128
+"""
+import argparse
+import gc
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faiss
+import numpy as np
+
+from ann_index import INDEX_TYPES, build_index, copy_index, set_search_params
+from shared_index import mmap_flags
+
+
+def rss_mb() -> float:
+    """현재 프로세스의 상주 메모리(MB)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_vectors(count, dim, clusters=200, seed=0):
+    """실제 임베딩처럼 군집이 있는 정규화 벡터"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, count)] + 0.3 * rng.normal(size=(count, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def recall_at_k(found, truth, k):
+    return np.mean([len(set(f[:k]) & set(t[:k])) / k for f, t in zip(found, truth)])
+
+
+def search(index, queries, k):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(ids[0])
+    latencies.sort()
+    return results, statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def check_mmap_copy(index, index_type, queries, k):
+    """mmap으로 연 인덱스의 복사본을 만드는 시간(ms) (검색 결과가 다르거나 벡터를 더할 수 없으면 None)"""
+    directory = tempfile.mkdtemp(prefix="bench_ann_index_")
+    try:
+        path = os.path.join(directory, "index.faiss")
+        faiss.write_index(index, path)
+        mapped = faiss.read_index(path, mmap_flags(index_type))
+        start = time.perf_counter()
+        copied = copy_index(mapped)
+        elapsed = (time.perf_counter() - start) * 1000
+        if not np.array_equal(copied.search(queries, k)[1], mapped.search(queries, k)[1]):
+            return None
+        copied.add(queries[:1])
+        return elapsed if copied.ntotal == mapped.ntotal + 1 else None
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=1536, help="text-embedding-3-small은 1536")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[32, 64, 128])
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.vectors, args.dim)
+    queries = make_vectors(args.queries, args.dim, seed=1)
+
+    flat = build_index(vectors, "flat")
+    truth, _, _ = search(flat, queries, args.k)
+    del flat
+    gc.collect()
+
+    print(f"vectors={args.vectors} dim={args.dim} queries={args.queries} k={args.k}")
+    print(f"{'type':<9} {'param':<12} {'build(s)':>8} {'size(MB)':>9} {'rss+(MB)':>9} "
+          f"{'recall':>7} {'p50(ms)':>8} {'p95(ms)':>8}")
+    copy_times = {}
+    for index_type in args.types:
+        gc.collect()
+        before = rss_mb()
+        start = time.perf_counter()
+        index = build_index(vectors, index_type)
+        build_seconds = time.perf_counter() - start
+        rss_delta = rss_mb() - before
+        size_mb = faiss.serialize_index(index).nbytes / 1024 / 1024
+
+        if index_type == "hnsw":
+            settings = [("efSearch", value, dict(ef_search=value)) for value in args.ef_search]
+        elif index_type.startswith("ivf"):
+            settings = [("nprobe", value, dict(nprobe=value)) for value in args.nprobe]
+        else:
+            settings = [("-", "", {})]
+
+        for name, value, params in settings:
+            set_search_params(index, **params)
+            found, p50, p95 = search(index, queries, args.k)
+            label = f"{name}={value}" if value != "" else "-"
+            print(f"{index_type:<9} {label:<12} {build_seconds:>8.2f} {size_mb:>9.1f} {rss_delta:>9.1f} "
+                  f"{recall_at_k(found, truth, args.k):>7.3f} {p50:>8.3f} {p95:>8.3f}")
+        copy_times[index_type] = check_mmap_copy(index, index_type, queries, args.k)
+        del index
+
+    print(f"{'type':<9} {'mmap copy(ms)':>14}")
+    for index_type, elapsed in copy_times.items():
+        print(f"{index_type:<9} {'실패' if elapsed is None else f'{elapsed:.1f}':>14}")
+    failed = [index_type for index_type, elapsed in copy_times.items() if elapsed is None]
+    if failed:
+        print(f"mmap 인덱스 복사 실패: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""머리글/바닥글 제거 확인 + 분할 처리 시간 측정 (합성 페이지, 오프라인)
+
+페이지 묶음 세 가지를 chunk_documents에 넣는다.
+
+    report    본문 위아래에 "연차 보고서 2024 | N" 머리글과 "Page N of M" 바닥글이 있는 긴 페이지
+    slides    "Slide N: ..."처럼 숫자만 다른 줄로 이루어진 짧은 페이지 (줄 4개 이하)
+    tables    페이지 위아래가 숫자만 다른 표의 행인 페이지
+
+머리글/바닥글은 모두 지우고 본문 줄은 하나도 잃지 않아야 한다. 지우면 안 되는 줄이
+사라지거나, 지워야 할 줄이 남거나, 청크가 하나도 안 나오면 종료 코드 1로 끝난다.
+
+사용법:
+    python benchmarks/bench_chunking.py --pages 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+
+from chunking import ChunkStats, chunk_documents
+
+WORDS = "배송 환불 보증 계약 청구 교환 수리 요금 기간 신청 승인 고객 문의 규정 예외 절차 서류 담당".split()
+
+
+def report_pages(rng, pages):
+    """(페이지 목록, 지워야 할 줄, 남아야 할 줄)"""
+    documents, boilerplate, content = [], [], []
+    for number in range(1, pages + 1):
+        body = [" ".join(rng.choices(WORDS, k=40)) + f" 금액은 {rng.randint(1, 999)}만 원이다." for _ in range(6)]
+        header, footer = f"연차 보고서 2024 | {number}", f"Page {number} of {pages}"
+        documents.append("\n".join([header] + body + [footer]))
+        boilerplate += [header, footer]
+        content += body
+    return documents, boilerplate, content
+
+
+def slide_pages(rng, pages):
+    documents, content = [], []
+    for number in range(1, pages + 1):
+        lines = [f"Slide {number}: {rng.choice(WORDS)}", f"The value is {number * 7}", f"매출 {number}% 증가"]
+        documents.append("\n".join(lines))
+        content += lines
+    return documents, [], content
+
+
+def table_pages(rng, pages):
+    documents, content = [], []
+    for number in range(1, pages + 1):
+        rows = [f"| {2000 + number} | {rng.choice(WORDS)} | {rng.randint(1, 999)} |" for _ in range(8)]
+        documents.append("\n".join(rows))
+        content += rows
+    return documents, [], content
+
+
+def check(name, pages, boilerplate, content):
+    """(걸린 시간 ms, 청크 수, 남은 머리글/바닥글 줄, 사라진 본문 줄)"""
+    documents = [Document(page_content=text, metadata={"source": f"{name}.pdf", "page": i}) for i, text in enumerate(pages)]
+    stats = ChunkStats()
+    start = time.perf_counter()
+    chunks = chunk_documents(documents, stats)
+    elapsed = (time.perf_counter() - start) * 1000
+    text = "\n".join(chunk.page_content for chunk in chunks)
+    kept = [line for line in boilerplate if line in text]
+    lost = [line for line in content if line not in text]
+    return elapsed, len(chunks), stats.boilerplate_lines, kept, lost
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failed = []
+    print(f"{'pages':<8} {'ms':>8} {'chunks':>7} {'removed':>8} {'kept bp':>8} {'lost':>5}")
+    for name, make in (("report", report_pages), ("slides", slide_pages), ("tables", table_pages)):
+        pages, boilerplate, content = make(random.Random(args.seed), args.pages)
+        elapsed, chunks, removed, kept, lost = check(name, pages, boilerplate, content)
+        print(f"{name:<8} {elapsed:>8.1f} {chunks:>7} {removed:>8} {len(kept):>8} {len(lost):>5}")
+        if kept or lost or not chunks:
+            failed.append(name)
+            for line in lost[:3]:
+                print(f"  사라진 줄: {line}")
+
+    if failed:
+        print(f"머리글/바닥글 제거 오류: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""OpenAI 클라이언트 연결 재사용 측정 (연결 수를 세는 로컬 OpenAI 대역 서버 사용)
+
+로컬 HTTP 서버가 /v1/embeddings, /v1/chat/completions(스트리밍 포함)를 흉내 내며
+새로 맺은 TCP 연결 수와 요청 수를 센다. 세션 N개가 각각 문서를 올리고(임베딩) 질문 K개를 하는 과정을
+두 방식으로 새 프로세스에서 돌려 비교한다.
+
+    per-session  예전 방식: 세션(업로드)마다 OpenAIEmbeddings/ChatOpenAI를 새로 만듦
+    shared       openai_clients: 프로세스가 공유하는 LLM/임베딩 클라이언트와 keep-alive 연결 풀
+
+공유 방식은 세션 수와 무관하게 연결 수가 RAG_OPENAI_MAX_CONNECTIONS 이하로 유지되어야 한다.
+로컬 연결이라 TLS 핸드셰이크가 없으므로, 시간 차이는 실제 API보다 작게 나온다.
+
+사용법:
+    python benchmarks/bench_client_pool.py --sessions 20 --questions 3
+    python benchmarks/bench_client_pool.py --concurrency 8 --latency 0.05
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ("per-session", "shared")
+WORDS = "배송 환불 보증 계약 청구 교환 수리 요금 기간 신청 승인 고객 문의 규정 예외 절차 서류 담당".split()
+ANSWER = "대역 서버의 답변입니다. 문서에 따르면 요청한 내용은 다음과 같습니다."
+
+
+class StandInServer(ThreadingHTTPServer):
+    """OpenAI API 대역: 연결/요청 수를 세고, latency만큼 기다린 뒤 응답"""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.0, dimensions: int = 64):
+        from fakes import FakeEmbeddings
+
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.latency = latency
+        self.embeddings = FakeEmbeddings(size=dimensions)
+        self.connections = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.latency)
+        if self.path.endswith("/embeddings"):
+            self._embeddings(body)
+        elif self.path.endswith("/chat/completions"):
+            self._chat(body)
+        else:
+            self.send_error(404)
+
+    def _embeddings(self, body):
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        # 길이 확인을 켜면 토큰 ID 목록이 오므로 문자열로 바꿔 벡터를 만듦
+        texts = [text if isinstance(text, str) else " ".join(map(str, text)) for text in inputs]
+        vectors = self.server.embeddings.embed_documents(texts)
+        self._send("application/json", json.dumps({
+            "object": "list",
+            "model": body.get("model", ""),
+            "data": [{"object": "embedding", "index": i, "embedding": vector} for i, vector in enumerate(vectors)],
+            "usage": {"prompt_tokens": len(texts), "total_tokens": len(texts)}
+        }))
+
+    def _chat(self, body):
+        base = {"id": "chatcmpl-standin", "created": int(time.time()), "model": body.get("model", "")}
+        if not body.get("stream"):
+            self._send("application/json", json.dumps({
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": ANSWER}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20}
+            }))
+            return
+        events = []
+        for i, token in enumerate(ANSWER.split(" ")):
+            delta = {"content": token if i == 0 else " " + token}
+            events.append({**base, "object": "chat.completion.chunk",
+                           "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+        events.append({**base, "object": "chat.completion.chunk",
+                       "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        self._send("text/event-stream", "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n")
+
+    def _send(self, content_type, text):
+        data = text.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_mode(mode: str, args) -> dict:
+    """새 프로세스에서 실행: 대역 서버를 띄우고 세션들을 돌린 뒤 연결/요청 수를 돌려줌"""
+    server = StandInServer(latency=args.latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "sk-standin"
+    os.environ["RAG_INDEX_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_client_pool_")
+    os.environ["RAG_METRICS_LOG_PATH"] = ""
+    os.environ["RAG_HYBRID_SEARCH"] = "false"
+
+    import config
+    from langchain_core.documents import Document
+    from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+    from rag_pipeline import create_conversation_chain, create_vectorstore
+
+    def session(number: int):
+        rng = random.Random(number)
+        documents = [
+            Document(
+                page_content="\n\n".join(" ".join(rng.choices(WORDS, k=40)) + "." for _ in range(5)),
+                metadata={"source": f"session{number}-{i}.txt"}
+            )
+            for i in range(args.docs)
+        ]
+        if mode == "per-session":
+            # 예전 create_vectorstore / create_conversation_chain처럼 업로드마다 새 클라이언트
+            vectorstore = create_vectorstore(documents, OpenAIEmbeddings(model=config.EMBEDDING_MODEL))
+            llm = ChatOpenAI(model=config.LLM_MODEL, temperature=0.7, streaming=config.STREAM_ANSWERS)
+            condense_llm = ChatOpenAI(model=config.LLM_MODEL, temperature=0.7, streaming=False)
+            chain = create_conversation_chain(vectorstore, None, llm=llm, condense_llm=condense_llm)
+        else:
+            chain = create_conversation_chain(create_vectorstore(documents), None)
+        for question in range(args.questions):
+            chain.invoke({"question": f"세션 {number}의 {question}번째 질문: 환불 규정은?"})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(session, range(args.sessions)))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    return {"connections": server.connections, "requests": server.requests, "seconds": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=3, help="세션마다 할 질문 수")
+    parser.add_argument("--docs", type=int, default=5, help="세션마다 올릴 문서 수")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 진행할 세션 수")
+    parser.add_argument("--latency", type=float, default=0.0, help="대역 서버 응답 지연(초)")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args)))
+        return
+
+    import config
+
+    passed = [f"--{name}={getattr(args, name)}" for name in ("sessions", "questions", "docs", "concurrency", "latency")]
+    print(f"sessions={args.sessions} questions={args.questions} docs={args.docs} concurrency={args.concurrency}")
+    results = {}
+    print(f"{'mode':<12} {'connections':>11} {'requests':>9} {'req/conn':>9} {'seconds':>8}")
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode] + passed, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:<12} {result['connections']:>11} {result['requests']:>9} "
+            f"{result['requests'] / max(result['connections'], 1):>9.1f} {result['seconds']:>8.2f}"
+        )
+        results[mode] = result
+
+    if results["shared"]["connections"] > config.OPENAI_MAX_CONNECTIONS:
+        print(f"공유 방식의 연결 수가 풀 크기({config.OPENAI_MAX_CONNECTIONS})를 넘었습니다.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""임베딩 파이프라인 처리량 측정 (가짜 임베딩 백엔드 사용, 오프라인)
+
+사용법:
+    python benchmarks/bench_embedding.py --chunks 2000 --latency 0.2 --workers 1 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_pipeline import BatchedEmbeddings
+from fakes import FakeEmbeddings
+
+
+def make_chunks(count: int):
+    return [f"문서 {i}번 청크입니다. " + "sample text for embedding " * 30 for i in range(count)]
+
+
+def run(chunks, workers, latency, rate_limit_every, batch_tokens):
+    base = FakeEmbeddings(latency_per_call=latency, rate_limit_every=rate_limit_every)
+    embeddings = BatchedEmbeddings(
+        base,
+        max_batch_tokens=batch_tokens,
+        max_workers=workers,
+        backoff_seconds=0.05,
+    )
+    start = time.perf_counter()
+    vectors = embeddings.embed_documents(chunks)
+    elapsed = time.perf_counter() - start
+    assert len(vectors) == len(chunks)
+    return elapsed, base
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.2, help="가짜 API 호출 1회당 지연(초)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--batch-tokens", type=int, default=8000)
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="N번째 호출마다 429 발생")
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    print(f"chunks={args.chunks} latency={args.latency}s batch_tokens={args.batch_tokens}")
+    print(f"{'workers':>8} {'seconds':>9} {'chunks/s':>10} {'calls':>6} {'429s':>5}")
+    for workers in args.workers:
+        elapsed, base = run(chunks, workers, args.latency, args.rate_limit_every, args.batch_tokens)
+        print(f"{workers:>8} {elapsed:>9.2f} {len(chunks) / elapsed:>10.1f} {base.calls:>6} {base.rate_limited:>5}")
+
+
+if __name__ == "__main__":
+    main()
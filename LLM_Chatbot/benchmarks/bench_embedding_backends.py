@@ -0,0 +1,88 @@
+"""임베딩 백엔드별 문서 처리량(docs/sec) 비교: API vs 로컬 CPU 모델
+
+- api: 기본은 호출당 지연을 흉내낸 가짜 임베딩 (--live면 실제 OpenAI API, OPENAI_API_KEY 필요)
+- local: sentence-transformers 모델 (torch / onnx, int8 양자화 여부별)
+  sentence-transformers(ONNX는 onnxruntime, optimum 포함)가 설치되어 있지 않으면 건너뛴다.
+
+두 백엔드 모두 실제 수집 경로와 같은 create_document_embeddings 배치 설정으로 돌린다.
+
+사용법:
+    python benchmarks/bench_embedding_backends.py --docs 1000 --api-latency 0.3
+    python benchmarks/bench_embedding_backends.py --local torch torch-int8 onnx onnx-int8 --threads 4
+    python benchmarks/bench_embedding_backends.py --live --docs 200
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from embedding_provider import LocalEmbeddings, create_document_embeddings
+from fakes import FakeEmbeddings
+
+# 로컬 변형 → (백엔드, int8 양자화)
+LOCAL_VARIANTS = {
+    "torch": ("torch", False),
+    "torch-int8": ("torch", True),
+    "onnx": ("onnx", False),
+    "onnx-int8": ("onnx", True),
+}
+
+
+def make_docs(count: int):
+    return [f"문서 {i}번 청크입니다. " + "sample text for embedding benchmark " * 25 for i in range(count)]
+
+
+def measure(embeddings, docs):
+    start = time.perf_counter()
+    vectors = create_document_embeddings(embeddings).embed_documents(docs)
+    elapsed = time.perf_counter() - start
+    assert len(vectors) == len(docs)
+    return elapsed
+
+
+def missing_packages(backend: str):
+    required = ["sentence_transformers"] + (["onnxruntime", "optimum"] if backend == "onnx" else [])
+    return [name for name in required if importlib.util.find_spec(name) is None]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--api-latency", type=float, default=0.3, help="가짜 API 호출 1회당 지연(초)")
+    parser.add_argument("--live", action="store_true", help="가짜 대신 실제 OpenAI 임베딩 API 호출")
+    parser.add_argument("--local", nargs="*", default=["torch", "torch-int8"], choices=sorted(LOCAL_VARIANTS))
+    parser.add_argument("--model", default=config.LOCAL_EMBEDDING_MODEL)
+    parser.add_argument("--batch-size", type=int, default=config.LOCAL_EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--threads", type=int, default=config.LOCAL_EMBEDDING_THREADS)
+    args = parser.parse_args()
+
+    docs = make_docs(args.docs)
+    print(f"docs={args.docs} cpus={os.cpu_count()} local_model={args.model}")
+    print(f"{'backend':<22} {'seconds':>9} {'docs/s':>9}")
+
+    if args.live:
+        from langchain_openai import OpenAIEmbeddings
+        api, label = OpenAIEmbeddings(model=config.EMBEDDING_MODEL), f"api ({config.EMBEDDING_MODEL})"
+    else:
+        api, label = FakeEmbeddings(latency_per_call=args.api_latency), f"api (fake {args.api_latency}s)"
+    elapsed = measure(api, docs)
+    print(f"{label:<22} {elapsed:>9.2f} {args.docs / elapsed:>9.1f}")
+
+    for variant in args.local:
+        backend, quantize = LOCAL_VARIANTS[variant]
+        missing = missing_packages(backend)
+        if missing:
+            print(f"{'local ' + variant:<22} 건너뜀 (설치 필요: {', '.join(missing)})")
+            continue
+        local = LocalEmbeddings(args.model, backend, quantize, args.batch_size, args.threads)
+        local.embed_documents(docs[:8])  # 모델 로드/워밍업은 측정에서 제외
+        elapsed = measure(local, docs)
+        print(f"{'local ' + variant:<22} {elapsed:>9.2f} {args.docs / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""RAG 전체 경로 오프라인 벤치마크 (문서 수집 + 질의, 가짜 임베딩/LLM 사용)
+
+합성 PDF/TXT 말뭉치를 크기별로 만들어 실제 파이프라인 함수
+(load_documents → split_documents → create_vectorstore → 대화 체인)를 그대로 실행하고,
+단계별 처리량, p50/p95 지연, 최대 메모리를 측정한다. OpenAI API는 호출하지 않는다.
+
+결과는 benchmarks/results/rag-<시각>.json에 저장하고, 직전 결과(또는 --compare로 지정한 파일)와 비교해 출력한다.
+
+사용법:
+    python benchmarks/bench_rag.py --sizes 10 50 200 --queries 20
+    python benchmarks/bench_rag.py --embed-latency 0.2 --first-token 0.5 --token-delay 0.02
+    python benchmarks/bench_rag.py --compare benchmarks/results/rag-20250101-120000.json
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 디스크 캐시/로그가 실제 앱 파일과 섞이지 않도록 임시 경로 사용 (config import 전에 설정)
+_workdir = tempfile.mkdtemp(prefix="bench_rag_")
+os.environ.setdefault("RAG_INDEX_CACHE_DIR", os.path.join(_workdir, "index_cache"))
+os.environ["RAG_METRICS_LOG_PATH"] = ""
+
+from embedding_pipeline import BatchedEmbeddings
+from fakes import FakeEmbeddings, FakeStreamingChatModel
+from metrics import MetricsRegistry, RequestTrace
+from rag_pipeline import create_conversation_chain, create_vectorstore, load_documents, split_documents
+from retrieval import BM25Index
+from streaming import MetricsCallbackHandler
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+TOPICS = [
+    "invoice", "contract", "warranty", "shipping", "refund", "security", "backup", "network",
+    "payroll", "holiday", "insurance", "training", "compliance", "budget", "hardware", "license"
+]
+WORDS = (
+    "the system policy team customer report process data service request account period review "
+    "update support issue record manager office document section rule schedule approval access"
+).split()
+
+
+def make_sentence(rng: random.Random, topic: str) -> str:
+    words = rng.choices(WORDS, k=rng.randint(8, 16))
+    words.insert(rng.randint(0, len(words)), topic)
+    return " ".join(words).capitalize() + "."
+
+
+def make_page(rng: random.Random, topic: str, sentences: int = 25) -> str:
+    return " ".join(make_sentence(rng, topic) for _ in range(sentences))
+
+
+def make_pdf(pages) -> bytes:
+    """텍스트 페이지들로 최소한의 PDF를 만듦 (Helvetica, 한 페이지에 한 줄씩 출력)"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        lines = [text[i:i + 90] for i in range(0, len(text), 90)]
+        body = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(
+            "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") '" for line in lines
+        ) + " ET"
+        objects.append(f"<< /Length {len(body)} >>\nstream\n{body}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return out
+
+
+def make_corpus(count: int, pages: int, pdf_ratio: float, seed: int):
+    """(파일명, bytes) 목록과 파일별 주제"""
+    rng = random.Random(seed)
+    files, topics = [], []
+    for i in range(count):
+        topic = TOPICS[i % len(TOPICS)]
+        texts = [make_page(rng, topic) for _ in range(pages)]
+        if rng.random() < pdf_ratio:
+            files.append((f"doc{i:04d}_{topic}.pdf", make_pdf(texts)))
+        else:
+            files.append((f"doc{i:04d}_{topic}.txt", "\n\n".join(texts).encode("utf-8")))
+        topics.append(topic)
+    return files, topics
+
+
+def measure(func):
+    """(결과, 경과 초, 이 단계의 파이썬 힙 최대 증가량 MB)"""
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    return result, elapsed, (peak - base) / 1024 / 1024
+
+
+def run_ingest(files, args):
+    embeddings = BatchedEmbeddings(
+        FakeEmbeddings(latency_per_call=args.embed_latency, latency_per_text=args.embed_latency_per_text),
+        backoff_seconds=0.05
+    )
+    stages = {}
+    documents, seconds, peak = measure(lambda: load_documents(files))
+    stages["load"] = {"seconds": seconds, "items": len(files), "unit": "files", "peak_mb": peak}
+    chunks, seconds, peak = measure(lambda: split_documents(documents))
+    stages["split"] = {"seconds": seconds, "items": len(documents), "unit": "pages", "peak_mb": peak}
+    vectorstore, seconds, peak = measure(lambda: create_vectorstore(documents, embeddings, chunks=chunks))
+    stages["embed"] = {"seconds": seconds, "items": len(chunks), "unit": "chunks", "peak_mb": peak}
+    for stage in stages.values():
+        stage["throughput"] = stage["items"] / stage["seconds"] if stage["seconds"] else 0.0
+    return vectorstore, stages, len(chunks)
+
+
+def run_queries(vectorstore, topics, args):
+    llm = FakeStreamingChatModel(
+        responses=["문서에 따르면 요청하신 내용은 다음과 같습니다. " * 4],
+        first_token_delay=args.first_token,
+        token_delay=args.token_delay
+    )
+    condense_llm = FakeStreamingChatModel(
+        responses=["재작성된 질문"], first_token_delay=args.first_token, streaming=False
+    )
+    chain = create_conversation_chain(
+        vectorstore, "offline", llm=llm, condense_llm=condense_llm,
+        keyword_index=BM25Index.from_vectorstore(vectorstore)
+    )
+    registry = MetricsRegistry(log_path="", window=args.queries)
+    rng = random.Random(args.seed)
+
+    def ask_all():
+        for _ in range(args.queries):
+            trace = RequestTrace("query")
+            question = f"What is the {rng.choice(topics)} policy for the {rng.choice(WORDS)}?"
+            chain.invoke({"question": question}, config={"callbacks": [MetricsCallbackHandler(trace)]})
+            registry.observe(trace)
+
+    _, seconds, peak = measure(ask_all)
+    stages = {
+        row["stage"]: {"p50": row["p50"], "p95": row["p95"], "count": row["count"]}
+        for row in registry.summary("query")
+    }
+    return {"seconds": seconds, "qps": args.queries / seconds, "peak_mb": peak, "stages": stages}
+
+
+def latest_result(exclude=None):
+    paths = sorted(p for p in glob.glob(os.path.join(RESULTS_DIR, "rag-*.json")) if p != exclude)
+    return paths[-1] if paths else None
+
+
+def print_comparison(current, previous_path):
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = {run["files"]: run for run in json.load(f)["runs"]}
+    print(f"\n비교 대상: {os.path.relpath(previous_path)} (값: 이번/이전, 1.00보다 작으면 빨라짐)")
+    for run in current["runs"]:
+        before = previous.get(run["files"])
+        if not before:
+            continue
+        parts = [
+            f"{stage} {run['ingest'][stage]['seconds'] / before['ingest'][stage]['seconds']:.2f}"
+            for stage in run["ingest"]
+            if before["ingest"].get(stage, {}).get("seconds")
+        ]
+        for stage in ("retrieve", "llm_first_token", "total"):
+            now, old = run["query"]["stages"].get(stage), before["query"]["stages"].get(stage)
+            if now and old and old["p95"]:
+                parts.append(f"{stage} p95 {now['p95'] / old['p95']:.2f}")
+        print(f"  files={run['files']:>5}: " + ", ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200], help="말뭉치 파일 수")
+    parser.add_argument("--pages", type=int, default=4, help="파일당 페이지 수")
+    parser.add_argument("--pdf-ratio", type=float, default=0.5, help="PDF 파일 비율 (나머지는 TXT)")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="임베딩 호출 1회당 지연(초)")
+    parser.add_argument("--embed-latency-per-text", type=float, default=0.0, help="텍스트 1개당 추가 지연(초)")
+    parser.add_argument("--first-token", type=float, default=0.05, help="LLM 첫 토큰 지연(초)")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="LLM 토큰 간 지연(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", help="비교할 이전 결과 파일 (기본: 가장 최근 결과)")
+    parser.add_argument("--no-save", action="store_true", help="결과 파일을 저장하지 않음")
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    result = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("compare", "no_save")},
+        "runs": []
+    }
+
+    print(
+        f"pages/file={args.pages} pdf_ratio={args.pdf_ratio} embed_latency={args.embed_latency}s "
+        f"first_token={args.first_token}s queries={args.queries}"
+    )
+    # 파싱 프로세스 풀을 미리 띄워 첫 말뭉치의 load 시간에 프로세스 시작 비용이 섞이지 않게 함
+    load_documents(make_corpus(2, 1, 0.0, args.seed)[0])
+
+    print(f"{'files':>6} {'chunks':>7} | {'stage':<16} {'seconds':>8} {'throughput':>16} {'peak MB':>8}")
+    for size in args.sizes:
+        files, topics = make_corpus(size, args.pages, args.pdf_ratio, args.seed)
+        vectorstore, ingest, chunk_count = run_ingest(files, args)
+        query = run_queries(vectorstore, topics, args)
+        for stage, values in ingest.items():
+            print(
+                f"{size:>6} {chunk_count:>7} | {stage:<16} {values['seconds']:>8.3f} "
+                f"{values['throughput']:>10.1f} {values['unit'] + '/s':<5} {values['peak_mb']:>8.1f}"
+            )
+        print(
+            f"{size:>6} {chunk_count:>7} | {'query':<16} {query['seconds']:>8.3f} "
+            f"{query['qps']:>10.1f} {'q/s':<5} {query['peak_mb']:>8.1f}"
+        )
+        for stage, values in query["stages"].items():
+            print(f"{'':>6} {'':>7} |   {stage:<16} p50 {values['p50'] * 1000:>8.1f}ms  p95 {values['p95'] * 1000:>8.1f}ms")
+        result["runs"].append({"files": size, "chunks": chunk_count, "ingest": ingest, "query": query})
+
+    result["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\n프로세스 최대 RSS: {result['max_rss_mb']:.1f} MB")
+
+    saved_path = None
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        saved_path = os.path.join(RESULTS_DIR, f"rag-{datetime.now():%Y%m%d-%H%M%S}.json")
+        with open(saved_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {os.path.relpath(saved_path)}")
+
+    previous = args.compare or latest_result(exclude=saved_path)
+    if previous:
+        print_comparison(result, previous)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""검색 방식별 recall@k와 지연 시간 측정 (라벨링된 소규모 평가 세트, 오프라인)
+
+기본은 가짜 임베딩(단어 해시)을 쓰므로 벡터 검색 수치는 상대 비교용이다.
+--openai를 주면 실제 OpenAI 임베딩으로, --reranker를 주면 cross-encoder 재정렬까지 측정한다.
+
+사용법:
+    python benchmarks/bench_retrieval.py --k 1 3 5
+    python benchmarks/bench_retrieval.py --openai --reranker BAAI/bge-reranker-base
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.vectorstores import FAISS
+
+from fakes import FakeEmbeddings
+from retrieval import BM25Index, CrossEncoderReranker, HybridRetriever
+
+EVAL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "retrieval_eval.json")
+
+
+def evaluate(retriever, queries, k):
+    hits, latencies = 0, []
+    for item in queries:
+        start = time.perf_counter()
+        docs = retriever.invoke(item["query"])
+        latencies.append((time.perf_counter() - start) * 1000)
+        found = {doc.id for doc in docs[:k]}
+        hits += bool(found & set(item["relevant"]))
+    return hits / len(queries), statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eval-file", default=EVAL_FILE)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--fetch-k", type=int, default=20)
+    parser.add_argument("--openai", action="store_true", help="실제 OpenAI 임베딩 사용")
+    parser.add_argument("--reranker", default="", help="cross-encoder 모델 이름")
+    args = parser.parse_args()
+
+    with open(args.eval_file, encoding="utf-8") as f:
+        data = json.load(f)
+
+    if args.openai:
+        from langchain_openai import OpenAIEmbeddings
+        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+    else:
+        embeddings = FakeEmbeddings()
+
+    ids = [doc["id"] for doc in data["documents"]]
+    texts = [doc["text"] for doc in data["documents"]]
+    vectorstore = FAISS.from_texts(texts, embeddings, ids=ids)
+    keyword_index = BM25Index()
+    keyword_index.add(ids, texts)
+
+    modes = {
+        "dense": dict(dense_weight=1.0, sparse_weight=0.0),
+        "bm25": dict(dense_weight=0.0, sparse_weight=1.0),
+        "hybrid": dict(dense_weight=1.0, sparse_weight=1.0),
+    }
+    if args.reranker:
+        modes["hybrid+rerank"] = dict(dense_weight=1.0, sparse_weight=1.0, reranker=CrossEncoderReranker(args.reranker))
+
+    print(f"documents={len(ids)} queries={len(data['queries'])}")
+    print(f"{'mode':<14} {'k':>3} {'recall@k':>9} {'p50(ms)':>8}")
+    for name, params in modes.items():
+        for k in args.k:
+            retriever = HybridRetriever(
+                vectorstore=vectorstore,
+                keyword_index=keyword_index,
+                k=k,
+                fetch_k=max(args.fetch_k, k),
+                **params
+            )
+            recall, latency = evaluate(retriever, data["queries"], k)
+            print(f"{name:<14} {k:>3} {recall:>9.2f} {latency:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
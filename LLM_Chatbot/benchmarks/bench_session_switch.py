@@ -0,0 +1,149 @@
+"""세션 전환 시 검색 인덱스 복원 시간 측정 (가짜 임베딩, 오프라인)
+
+세션 N개가 각자 다른 문서 묶음(말뭉치)으로 대화한다고 보고, 세션을 고를 때 그 세션의 말뭉치를
+CorpusCache에서 다시 여는 데 걸리는 시간을 경로별로 잰다 (재임베딩은 어느 경로에도 없음).
+
+    lru hit        메모리에 열려 있는 말뭉치
+    shared mmap    게시된 공유 인덱스 + 저장된 BM25 인덱스 (RAG_SHARED_INDEX=true)
+    shared+bm25    BM25 인덱스 없이 게시된 예전 공유 인덱스 (청크를 다시 토큰화)
+    file shards    파일별 인덱스 캐시의 샤드를 합침 (공유 인덱스를 쓰지 않을 때)
+
+마지막으로 메모리 예산(--budget-mb)을 작게 준 캐시에서 세션을 차례로 돌며 내보내기 횟수와
+추정 메모리 합계를 출력한다. 경로별 최댓값이 --budget-ms를 넘으면 종료 코드 1로 끝난다.
+
+사용법:
+    python benchmarks/bench_session_switch.py --sessions 8 --files 3 --chunks 200
+    python benchmarks/bench_session_switch.py --budget-mb 16 --budget-ms 500
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 디스크 캐시가 실제 앱 파일과 섞이지 않도록 임시 경로 사용 (config import 전에 설정)
+_workdir = tempfile.mkdtemp(prefix="bench_session_switch_")
+os.environ["RAG_INDEX_CACHE_DIR"] = os.path.join(_workdir, "index_cache")
+os.environ["RAG_SHARED_INDEX_DIR"] = os.path.join(_workdir, "shared_index")
+os.environ["RAG_METRICS_LOG_PATH"] = ""
+
+from langchain_core.documents import Document
+
+import embedding_provider
+import shared_index
+from corpus_cache import CorpusCache
+from fakes import FakeEmbeddings
+from index_store import IndexStore
+from rag_pipeline import create_vectorstore, file_keys, open_corpus, shared_corpus_id, split_documents
+
+WORDS = (
+    "배송 환불 보증 계약 청구 교환 수리 요금 기간 신청 승인 고객 문의 규정 예외 절차 서류 담당 "
+    "invoice refund warranty contract shipping repair policy approval customer request"
+).split()
+
+
+def make_file(rng, chunks: int) -> bytes:
+    # 청크 크기 근처의 문단을 chunks개 만듦
+    paragraphs = [" ".join(rng.choices(WORDS, k=120)) + "." for _ in range(chunks)]
+    return "\n\n".join(paragraphs).encode("utf-8")
+
+
+def build_sessions(args):
+    """세션마다 파일 묶음을 만들어 파일별 샤드를 저장 (세션 → (말뭉치 ID, 파일명 → 캐시 키))"""
+    store = IndexStore()
+    embeddings = embedding_provider.get_embeddings()
+    sessions = []
+    for number in range(args.sessions):
+        rng = random.Random(number)
+        files = [(f"session{number}-{i}.txt", make_file(rng, args.chunks // args.files)) for i in range(args.files)]
+        keys = file_keys(files)
+        for name, data in files:
+            documents = [Document(page_content=data.decode("utf-8"), metadata={"source": name})]
+            store.save(keys[name], create_vectorstore(documents, embeddings, chunks=split_documents(documents)))
+        sessions.append((shared_corpus_id(keys), keys))
+    return sessions
+
+
+def publish(sessions, with_keyword_index: bool):
+    for corpus_id, keys in sessions:
+        vectorstore, keyword_index, _ = open_corpus(corpus_id, keys)
+        shared_index.publish(vectorstore, corpus_id, keyword_index=keyword_index if with_keyword_index else None)
+
+
+def switch_times(sessions, cache: CorpusCache, before=None):
+    """세션마다 말뭉치를 한 번씩 열어 걸린 시간(ms) 목록"""
+    times = []
+    for corpus_id, keys in sessions:
+        if before:
+            before(corpus_id)
+        start = time.perf_counter()
+        corpus = cache.get(corpus_id, keys)
+        times.append((time.perf_counter() - start) * 1000)
+        if corpus is None:
+            raise RuntimeError(f"말뭉치를 열 수 없습니다: {corpus_id}")
+    return times
+
+
+def drop_keyword_index(corpus_id):
+    path = os.path.join(shared_index._path(corpus_id), "bm25.pkl")
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--files", type=int, default=3, help="세션마다 올린 파일 수")
+    parser.add_argument("--chunks", type=int, default=600, help="세션마다 말뭉치의 대략적인 청크 수")
+    parser.add_argument("--dimensions", type=int, default=256, help="가짜 임베딩 차원")
+    parser.add_argument("--budget-mb", type=float, default=8, help="내보내기 측정에 쓸 캐시 메모리 예산")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="경로별 전환 시간 최댓값 예산")
+    args = parser.parse_args()
+
+    embedding_provider._embeddings = FakeEmbeddings(size=args.dimensions)
+    sessions = build_sessions(args)
+    print(f"sessions={args.sessions} files={args.files} chunks≈{args.chunks} dimensions={args.dimensions}")
+
+    results = {}
+    # 파일별 샤드 (공유 인덱스 게시 전)
+    results["file shards"] = switch_times(sessions, CorpusCache(max_entries=1))
+    # BM25 없이 게시된 공유 인덱스: 열 때마다 BM25를 새로 만들고 저장하므로 매번 지우고 잼
+    publish(sessions, with_keyword_index=False)
+    results["shared+bm25"] = switch_times(sessions, CorpusCache(max_entries=1), before=drop_keyword_index)
+    switch_times(sessions, CorpusCache(max_entries=1))  # bm25.pkl 다시 저장
+    results["shared mmap"] = switch_times(sessions, CorpusCache(max_entries=1))
+    warm = CorpusCache(max_entries=args.sessions, max_bytes=sys.maxsize)
+    switch_times(sessions, warm)
+    results["lru hit"] = switch_times(sessions, warm)
+    chunks = statistics.mean(len(warm.get(corpus_id).keyword_index) for corpus_id, _ in sessions)
+    print(f"chunks per corpus={chunks:.0f}")
+
+    print(f"{'path':<12} {'p50 ms':>8} {'max ms':>8}")
+    for path in ("lru hit", "shared mmap", "shared+bm25", "file shards"):
+        times = results[path]
+        print(f"{path:<12} {statistics.median(times):>8.2f} {max(times):>8.2f}")
+
+    # 메모리 예산으로 내보내기: 파일별 샤드로 연 말뭉치(mmap이 아니라 전부 메모리에 있음)를 돌아가며 씀
+    for corpus_id, _ in sessions:
+        shutil.rmtree(shared_index._path(corpus_id))
+    bounded = CorpusCache(max_entries=args.sessions, max_bytes=int(args.budget_mb * 1024 * 1024))
+    for _ in range(2):
+        switch_times(sessions, bounded)
+    print(
+        f"budget {args.budget_mb:g}MB: open={len(bounded)} estimated={bounded.size_bytes / 1024 / 1024:.1f}MB "
+        f"hits={bounded.hits} misses={bounded.misses} evictions={bounded.evictions}"
+    )
+
+    slow = [path for path, times in results.items() if max(times) > args.budget_ms]
+    if slow:
+        print(f"예산 초과 ({args.budget_ms:.0f}ms): {', '.join(slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
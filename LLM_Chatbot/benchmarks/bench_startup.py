@@ -0,0 +1,113 @@
+"""Streamlit 앱(app.py) 콜드 스타트 측정: import 시간과 첫 화면까지의 시간
+
+측정마다 새 파이썬 프로세스를 띄워 (새 Streamlit 워커처럼 모듈 캐시가 빈 상태)
+- import: app.py 맨 위의 import 문만 실행하는 데 걸린 시간 (ast로 app.py에서 직접 읽음)
+- first paint: streamlit을 import하고 AppTest로 문서 없는 첫 화면을 한 번 그리기까지 걸린 시간
+- heavy: 첫 화면을 그린 뒤 이미 로드된 무거운 모듈 (첫 화면에서는 비어 있어야 함)
+을 구하고, 반복 측정의 중앙값이 예산을 넘거나 무거운 모듈이 로드되면 종료 코드 1로 끝난다.
+
+사용법:
+    python benchmarks/bench_startup.py --repeat 5
+    python benchmarks/bench_startup.py --import-budget-ms 300 --paint-budget-ms 600
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(APP_DIR, "app.py")
+
+# 첫 화면에서 로드되면 안 되는 모듈 (문서 처리/질문 단계에서만 필요)
+HEAVY_MODULES = ("langchain", "langchain_core", "langchain_community", "langchain_openai", "faiss", "numpy", "pandas", "openai")
+
+
+def top_level_imports(path: str) -> str:
+    """app.py의 모듈 수준 import 문만 모은 코드"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    nodes = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in nodes)
+
+
+def run_import():
+    code = top_level_imports(APP_PATH)
+    start = time.perf_counter()
+    exec(code, {})
+    return {"import_ms": (time.perf_counter() - start) * 1000}
+
+
+def run_paint():
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120).run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"첫 화면을 그리는 중 오류: {at.exception[0].value}")
+    heavy = sorted(name for name in HEAVY_MODULES if name in sys.modules)
+    return {"paint_ms": elapsed * 1000, "heavy": heavy}
+
+
+def measure(kind: str) -> dict:
+    """새 프로세스에서 한 번 측정"""
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY") or "sk-bench",
+        RAG_SESSION_DB_PATH=os.path.join(workdir, "chat_sessions.db"),
+        RAG_METRICS_LOG_PATH="",
+        RAG_METRICS_PORT="0",
+    )
+    output = subprocess.run(
+        [sys.executable, __file__, "--measure", kind],
+        cwd=APP_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=500, help="import 시간 중앙값 예산")
+    parser.add_argument("--paint-budget-ms", type=float, default=1000, help="첫 화면 시간 중앙값 예산")
+    parser.add_argument("--measure", choices=("import", "paint"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        sys.path.insert(0, APP_DIR)
+        result = run_import() if args.measure == "import" else run_paint()
+        print(json.dumps(result))
+        return
+
+    imports = [measure("import")["import_ms"] for _ in range(args.repeat)]
+    paints = [measure("paint") for _ in range(args.repeat)]
+    import_ms = statistics.median(imports)
+    paint_ms = statistics.median(run["paint_ms"] for run in paints)
+    heavy = sorted({name for run in paints for name in run["heavy"]})
+
+    print(f"{'':<12} {'median ms':>10} {'min ms':>8} {'max ms':>8} {'budget ms':>10}")
+    print(f"{'import':<12} {import_ms:>10.0f} {min(imports):>8.0f} {max(imports):>8.0f} {args.import_budget_ms:>10.0f}")
+    paint_values = [run["paint_ms"] for run in paints]
+    print(f"{'first paint':<12} {paint_ms:>10.0f} {min(paint_values):>8.0f} {max(paint_values):>8.0f} {args.paint_budget_ms:>10.0f}")
+    print(f"heavy modules after first paint: {', '.join(heavy) or '-'}")
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import {import_ms:.0f}ms > {args.import_budget_ms:.0f}ms")
+    if paint_ms > args.paint_budget_ms:
+        failures.append(f"first paint {paint_ms:.0f}ms > {args.paint_budget_ms:.0f}ms")
+    if heavy:
+        failures.append(f"첫 화면에서 무거운 모듈 로드: {', '.join(heavy)}")
+    if failures:
+        print("예산 초과: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""스트리밍 답변의 첫 토큰 지연(TTFT)과 전체 지연 측정 (가짜 LLM/임베딩 사용, 오프라인)
+
+사용법:
+    python benchmarks/bench_streaming.py --first-token-delay 0.5 --token-delay 0.05
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.chains import ConversationalRetrievalChain
+from langchain.memory import ConversationBufferMemory
+from langchain_community.vectorstores import FAISS
+
+from fakes import FakeEmbeddings, FakeStreamingChatModel
+from streaming import StreamingAnswerHandler
+
+
+def build_chain(first_token_delay, token_delay, answer_words):
+    vectorstore = FAISS.from_texts(
+        [f"제품 코드 A-{i} 의 보증 기간은 {i % 5 + 1}년입니다." for i in range(200)],
+        FakeEmbeddings()
+    )
+    answer = " ".join(f"토큰{i}" for i in range(answer_words))
+    llm = FakeStreamingChatModel(
+        responses=[answer],
+        first_token_delay=first_token_delay,
+        token_delay=token_delay
+    )
+    condense_llm = FakeStreamingChatModel(responses=["재작성된 질문"], streaming=False)
+    memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True, output_key="answer")
+    return ConversationalRetrievalChain.from_llm(
+        llm=llm,
+        condense_question_llm=condense_llm,
+        retriever=vectorstore.as_retriever(search_kwargs={"k": 3}),
+        memory=memory,
+        return_source_documents=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--first-token-delay", type=float, default=0.5)
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    parser.add_argument("--answer-words", type=int, default=60)
+    args = parser.parse_args()
+
+    chain = build_chain(args.first_token_delay, args.token_delay, args.answer_words)
+    print(f"{'#':>3} {'sources(s)':>10} {'TTFT(s)':>8} {'total(s)':>9}")
+    for i in range(args.questions):
+        sources_at = []
+        handler = StreamingAnswerHandler(
+            on_token=lambda text: None,
+            on_sources=lambda docs: sources_at.append(time.perf_counter())
+        )
+        chain.invoke({"question": f"A-{i} 제품의 보증 기간은?"}, config={"callbacks": [handler]})
+        total = time.perf_counter() - handler.started_at
+        sources = sources_at[0] - handler.started_at if sources_at else float("nan")
+        print(f"{i + 1:>3} {sources:>10.3f} {handler.time_to_first_token:>8.3f} {total:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""토큰 예산이 정해진 대화 메모리
+
+최근 N턴은 원문 그대로, 그 이전 대화는 누적 요약 한 덩어리로만 유지하므로
+대화가 길어져도 질문 재작성 프롬프트 크기가 일정하다.
+요약은 세션 저장소에 (요약, 요약에 포함된 메시지 수)로 캐시해 세션 전환 시 다시 만들지 않는다.
+"""
+from typing import List
+
+from langchain.memory import ConversationSummaryBufferMemory
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+import config
+
+
+class BoundedSummaryMemory(ConversationSummaryBufferMemory):
+    """턴 수와 토큰 수 두 가지 한도를 모두 지키는 ConversationSummaryBufferMemory"""
+
+    max_turns: int = 4
+
+    def _pop_overflow(self) -> List[BaseMessage]:
+        """턴 수나 토큰 수 한도를 넘는 오래된 메시지를 버퍼에서 꺼냄 (요약할 메시지)"""
+        buffer = self.chat_memory.messages
+        pruned_memory = []
+        while buffer and (
+            len(buffer) > self.max_turns * 2
+            or self.llm.get_num_tokens_from_messages(buffer) > self.max_token_limit
+        ):
+            pruned_memory.append(buffer.pop(0))
+        return pruned_memory
+
+    def prune(self) -> None:
+        pruned_memory = self._pop_overflow()
+        if pruned_memory:
+            self.moving_summary_buffer = self.predict_new_summary(
+                pruned_memory,
+                self.moving_summary_buffer,
+            )
+
+    async def aprune(self) -> None:
+        # API 서버의 chain.ainvoke는 asave_context → aprune 경로로 저장하므로 같은 한도를 적용
+        pruned_memory = self._pop_overflow()
+        if pruned_memory:
+            self.moving_summary_buffer = await self.apredict_new_summary(
+                pruned_memory,
+                self.moving_summary_buffer,
+            )
+
+    @property
+    def buffered_count(self) -> int:
+        """요약되지 않고 원문으로 남아 있는 메시지 수"""
+        return len(self.chat_memory.messages)
+
+    @property
+    def has_history(self) -> bool:
+        """이전 대화(원문이나 요약)가 있는지 (있으면 같은 질문이라도 재작성 결과가 달라질 수 있음)"""
+        return bool(self.chat_memory.messages or self.moving_summary_buffer)
+
+
+def create_memory(llm) -> BoundedSummaryMemory:
+    return BoundedSummaryMemory(
+        llm=llm,
+        max_turns=config.MEMORY_RECENT_TURNS,
+        max_token_limit=config.MEMORY_MAX_TOKENS,
+        memory_key="chat_history",
+        input_key="question",
+        output_key="answer",
+        return_messages=True
+    )
+
+
+def to_langchain_messages(messages: List[dict]) -> List[BaseMessage]:
+    """세션에 저장된 메시지(dict)를 LangChain 메시지로 변환"""
+    converted = []
+    for msg in messages:
+        if msg["role"] == "user":
+            converted.append(HumanMessage(content=msg["content"]))
+        elif msg["role"] == "assistant":
+            converted.append(AIMessage(content=msg["content"]))
+    return converted
+
+
+def restore_memory(memory: BoundedSummaryMemory, messages: List[dict], summary: str, summary_upto: int) -> bool:
+    """캐시된 요약 + 최근 메시지만으로 메모리를 복원 (요약이 바뀌었으면 True)
+
+    요약 이후에 쌓였지만 최근 N턴에 들지 않는 메시지만 새로 요약하므로,
+    LLM 호출은 세션 전환마다가 아니라 요약이 뒤처졌을 때 한 번만 일어난다.
+    """
+    memory.clear()
+    memory.moving_summary_buffer = summary or ""
+
+    summary_upto = min(summary_upto, len(messages))
+    recent_start = max(summary_upto, len(messages) - memory.max_turns * 2)
+    changed = False
+
+    stale = to_langchain_messages(messages[summary_upto:recent_start])
+    if stale:
+        memory.moving_summary_buffer = memory.predict_new_summary(stale, memory.moving_summary_buffer)
+        changed = True
+
+    for message in to_langchain_messages(messages[recent_start:]):
+        memory.chat_memory.add_message(message)
+
+    before = memory.moving_summary_buffer
+    memory.prune()
+    return changed or memory.moving_summary_buffer != before
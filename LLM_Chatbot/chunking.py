@@ -0,0 +1,288 @@
+"""구조 기반 청크 분할 + 중복 제거 (임베딩 전에 실행)
+
+- 크기는 글자 수가 아니라 토큰 수로 잰다
+- 제목/문단 경계를 따라 문단을 청크 크기까지 채우고, 제목이 나오면 새 청크를 시작
+- 겹침(overlap)은 한 문단이 청크 크기를 넘어 문장 단위로 잘라야 할 때만 둔다
+- PDF에서 여러 페이지에 반복되는 머리글/바닥글 줄을 지우고,
+  내용이 같은 청크(해시)와 거의 같은 청크(MinHash)를 임베딩 전에 버린다
+"""
+import hashlib
+import re
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+import config
+from embedding_pipeline import count_tokens
+
+# 제목으로 볼 줄: 마크다운 제목, 번호 제목(1. / 1.2 / IV. / 제3장), 짧은 대문자 줄
+HEADING_PATTERNS = [
+    re.compile(r"^#{1,6}\s+\S"),
+    re.compile(r"^(\d+(\.\d+)*\.?|[IVX]+\.|제\s*\d+\s*[장절조항편])\s+\S"),
+    re.compile(r"^[A-Z][A-Z0-9 &/\-]{2,}$"),
+]
+SENTENCE_END = re.compile(r"(?<=[.!?。])\s+")
+MAX_HEADING_CHARS = 80
+
+# 머리글/바닥글: 페이지마다 숫자만 바뀌는 줄은 쪽 번호 줄("3", "- 3 -", "Page 3 of 10", "3쪽")이나
+# 구분자로 붙은 쪽 번호가 있는 짧은 줄("연차 보고서 | 3")만 같은 줄로 봄 (표의 행이나 본문 문장은 숫자를 그대로 비교)
+MAX_BOILERPLATE_CHARS = 80
+_PAGE_NUMBER = r"(?:(?:page|p\.|pg\.)\s*)?\d+(?:\s*(?:of|/)\s*\d+)?\s*(?:쪽|페이지)?"
+PAGE_NUMBER_LINE = re.compile(rf"^[\W_]*{_PAGE_NUMBER}[\W_]*$")
+PAGE_NUMBER_EDGE = re.compile(rf"^{_PAGE_NUMBER}\s*[|·•–—-]\s*(?=\S)|(?<=\S)\s*[|·•–—-]\s*{_PAGE_NUMBER}$")
+
+# MinHash: 64개 해시 = 16개 밴드 x 4행
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 16
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(1)
+_HASH_A = _rng.randint(1, int(_MERSENNE_PRIME), size=MINHASH_PERMUTATIONS).astype(np.uint64)
+_HASH_B = _rng.randint(0, int(_MERSENNE_PRIME), size=MINHASH_PERMUTATIONS).astype(np.uint64)
+
+_splitter = None
+
+
+@dataclass
+class ChunkStats:
+    """업로드 한 번의 분할 결과 (여러 파일에 걸쳐 누적)"""
+    chunks: int = 0             # 임베딩할 청크 수
+    tokens: int = 0             # 임베딩할 토큰 수
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    boilerplate_lines: int = 0  # 지운 머리글/바닥글 줄 수
+    saved_chunks: int = 0       # 중복으로 버린 청크 수
+    saved_tokens: int = 0       # 중복 청크 + 반복 줄로 줄인 토큰 수
+
+
+def is_heading(line: str) -> bool:
+    line = line.strip()
+    if not line or len(line) > MAX_HEADING_CHARS or line[-1] in ".,;:!?。":
+        return False
+    return any(pattern.match(line) for pattern in HEADING_PATTERNS)
+
+
+def _normalize_line(line: str) -> str:
+    line = " ".join(line.split()).lower()
+    if len(line) > MAX_BOILERPLATE_CHARS:
+        return line
+    # 쪽 번호 줄과 쪽 번호가 붙은 머리글은 번호만 바뀌어도 같은 줄로 봄
+    if PAGE_NUMBER_LINE.match(line):
+        return "#"
+    return PAGE_NUMBER_EDGE.sub(" # ", line).strip()
+
+
+def _edge_indices(non_empty: List[int]) -> List[int]:
+    """머리글/바닥글 후보 줄: 위/아래 두 줄 (내용이 4줄 이하인 짧은 페이지는 한 줄씩)"""
+    width = 1 if len(non_empty) <= 4 else 2
+    return non_empty[:width] + non_empty[-width:]
+
+
+def strip_boilerplate(documents: List[Document], stats: ChunkStats) -> List[Document]:
+    """페이지 위/아래 줄 중 절반 이상의 페이지에 반복되는 줄(머리글/바닥글)을 지움 (페이지를 비우지는 않음)"""
+    if len(documents) < 3:
+        return documents
+    edge_lines = []
+    for doc in documents:
+        lines = doc.page_content.splitlines()
+        non_empty = [i for i, line in enumerate(lines) if line.strip()]
+        edge_lines.append({_normalize_line(lines[i]) for i in _edge_indices(non_empty)})
+    counts = {}
+    for lines in edge_lines:
+        for line in lines:
+            counts[line] = counts.get(line, 0) + 1
+    repeated = {line for line, count in counts.items() if count >= max(3, len(documents) // 2)}
+    if not repeated:
+        return documents
+
+    cleaned = []
+    for doc in documents:
+        lines = doc.page_content.splitlines()
+        non_empty = [i for i, line in enumerate(lines) if line.strip()]
+        removed = [i for i in set(_edge_indices(non_empty)) if _normalize_line(lines[i]) in repeated]
+        if len(removed) == len(non_empty):
+            # 반복되는 줄뿐인 페이지(표지 등)는 그대로 둠
+            removed = []
+        stats.boilerplate_lines += len(removed)
+        stats.saved_tokens += sum(count_tokens(lines[i]) for i in removed)
+        text = "\n".join(line for i, line in enumerate(lines) if i not in removed)
+        cleaned.append(Document(page_content=text, metadata=doc.metadata))
+    return cleaned
+
+
+def _blocks(text: str) -> List[Tuple[bool, str]]:
+    """(제목 여부, 내용) 목록: 빈 줄이나 제목 줄에서 문단을 끊음 (PDF처럼 빈 줄이 없어도 제목은 인식)"""
+    blocks, paragraph = [], []
+
+    def end_paragraph():
+        if paragraph:
+            blocks.append((False, " ".join(paragraph)))
+            paragraph.clear()
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            end_paragraph()
+        elif is_heading(stripped):
+            end_paragraph()
+            blocks.append((True, stripped))
+        else:
+            paragraph.append(stripped)
+    end_paragraph()
+    return blocks
+
+
+def _split_long(text: str, max_tokens: int, overlap_tokens: int) -> List[str]:
+    """청크 크기를 넘는 문단을 문장 단위로 자르고, 이어지는 조각 사이에만 겹침을 둠"""
+    sentences = []
+    for sentence in SENTENCE_END.split(text):
+        tokens = count_tokens(sentence)
+        if tokens <= max_tokens:
+            sentences.append((sentence, tokens))
+            continue
+        # 문장 하나가 너무 길면 글자 수 비율로 고정 길이로 자름
+        width = max(1, len(sentence) * max_tokens // tokens)
+        sentences += [(sentence[i:i + width], max_tokens) for i in range(0, len(sentence), width)]
+
+    pieces, current, current_tokens = [], [], 0
+    for sentence, tokens in sentences:
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append(" ".join(s for s, _ in current))
+            # 끝 문장들을 overlap_tokens 이내로 다음 조각 앞에 다시 붙임
+            carry, carry_tokens = [], 0
+            for s, t in reversed(current):
+                if carry_tokens + t > overlap_tokens:
+                    break
+                carry.insert(0, (s, t))
+                carry_tokens += t
+            current, current_tokens = carry, carry_tokens
+        current.append((sentence, tokens))
+        current_tokens += tokens
+    if current:
+        pieces.append(" ".join(s for s, _ in current))
+    return pieces
+
+
+def split_structured(text: str, max_tokens: int, min_tokens: int, overlap_tokens: int) -> List[Tuple[str, str]]:
+    """(소제목, 청크 내용) 목록"""
+    chunks = []
+    current, current_tokens, only_headings = [], 0, True
+    section = ""
+
+    def flush():
+        nonlocal current, current_tokens, only_headings
+        # 제목만 남은 경우에는 내보내지 않고 다음 문단 앞에 붙임
+        if current and not only_headings:
+            chunks.append((section, "\n\n".join(current)))
+            current, current_tokens, only_headings = [], 0, True
+
+    for heading, block in _blocks(text):
+        tokens = count_tokens(block)
+        if heading:
+            if current_tokens >= min_tokens:
+                flush()
+            section = block
+            current.append(block)
+            current_tokens += tokens
+            continue
+        if current_tokens + tokens > max_tokens:
+            flush()
+        if current_tokens + tokens > max_tokens:
+            # 제목을 붙여도 넘치는 긴 문단은 문장 단위로 자름 (첫 조각에 제목 포함)
+            prefix = "\n\n".join(current)
+            for i, piece in enumerate(_split_long(block, max_tokens, overlap_tokens)):
+                chunks.append((section, f"{prefix}\n\n{piece}" if prefix and i == 0 else piece))
+            current, current_tokens, only_headings = [], 0, True
+            continue
+        current.append(block)
+        current_tokens += tokens
+        only_headings = False
+    if current:
+        only_headings = False
+        flush()
+    return chunks
+
+
+def _shingles(text: str) -> np.ndarray:
+    words = text.lower().split()
+    if len(words) >= 3:
+        grams = {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+    else:
+        compact = "".join(words)
+        grams = {compact[i:i + 5] for i in range(max(1, len(compact) - 4))}
+    return np.array([zlib.crc32(gram.encode("utf-8")) for gram in grams], dtype=np.uint64)
+
+
+def minhash(text: str) -> np.ndarray:
+    shingles = _shingles(text) % _MERSENNE_PRIME
+    hashed = (_HASH_A[:, None] * shingles[None, :] + _HASH_B[:, None]) % _MERSENNE_PRIME
+    return hashed.min(axis=1)
+
+
+def deduplicate(chunks: List[Document], threshold: float, stats: ChunkStats) -> List[Document]:
+    """내용이 같은 청크와 MinHash로 추정한 Jaccard 유사도가 threshold 이상인 청크를 버림 (먼저 나온 쪽 유지)"""
+    seen_hashes = set()
+    buckets = {}
+    signatures = []
+    rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+    kept = []
+    for chunk in chunks:
+        normalized = " ".join(chunk.page_content.lower().split())
+        digest = hashlib.sha1(normalized.encode("utf-8")).digest()
+        if digest in seen_hashes:
+            stats.exact_duplicates += 1
+            stats.saved_chunks += 1
+            stats.saved_tokens += count_tokens(chunk.page_content)
+            continue
+        seen_hashes.add(digest)
+
+        signature = minhash(normalized)
+        bands = [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(MINHASH_BANDS)]
+        candidates = {index for band in bands for index in buckets.get(band, ())}
+        if any(np.mean(signatures[index] == signature) >= threshold for index in candidates):
+            stats.near_duplicates += 1
+            stats.saved_chunks += 1
+            stats.saved_tokens += count_tokens(chunk.page_content)
+            continue
+        for band in bands:
+            buckets.setdefault(band, []).append(len(signatures))
+        signatures.append(signature)
+        kept.append(chunk)
+    return kept
+
+
+def get_splitter():
+    """recursive 전략의 글자 수 기준 분할기 (처음 쓸 때 한 번 만들어 모든 작업이 공유)"""
+    global _splitter
+    if _splitter is None:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        _splitter = RecursiveCharacterTextSplitter(
+            chunk_size=config.CHUNK_SIZE,
+            chunk_overlap=config.CHUNK_OVERLAP,
+            length_function=len
+        )
+    return _splitter
+
+
+def chunk_documents(documents: List[Document], stats: Optional[ChunkStats] = None) -> List[Document]:
+    """파일 하나의 문서(페이지)들을 청크로 나누고 중복을 제거"""
+    stats = stats if stats is not None else ChunkStats()
+    if config.CHUNK_STRATEGY == "recursive":
+        # 예전 방식: 글자 수 기준 고정 크기 + 겹침
+        chunks = get_splitter().split_documents(documents)
+    else:
+        chunks = []
+        for doc in strip_boilerplate(documents, stats):
+            for section, text in split_structured(
+                doc.page_content, config.CHUNK_TOKENS, config.CHUNK_MIN_TOKENS, config.CHUNK_OVERLAP_TOKENS
+            ):
+                metadata = {**doc.metadata, "section": section} if section else dict(doc.metadata)
+                chunks.append(Document(page_content=text, metadata=metadata))
+
+    if config.CHUNK_DEDUP:
+        chunks = deduplicate(chunks, config.NEAR_DUPLICATE_THRESHOLD, stats)
+    stats.chunks += len(chunks)
+    stats.tokens += sum(count_tokens(chunk.page_content) for chunk in chunks)
+    return chunks
@@ -0,0 +1,109 @@
+"""RAG 챗봇 설정값 (환경 변수로 덮어쓸 수 있음)"""
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 텍스트 분할 설정
+CHUNK_SIZE = int(os.getenv("RAG_CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "200"))
+
+# 청크 분할 방식: structure(제목/문단 기준, 토큰 단위) | recursive(예전 방식, 위의 글자 수 설정 사용)
+CHUNK_STRATEGY = os.getenv("RAG_CHUNK_STRATEGY", "structure")
+CHUNK_TOKENS = int(os.getenv("RAG_CHUNK_TOKENS", "400"))
+CHUNK_MIN_TOKENS = int(os.getenv("RAG_CHUNK_MIN_TOKENS", "80"))  # 이보다 작은 청크는 다음 제목과 합침
+CHUNK_OVERLAP_TOKENS = int(os.getenv("RAG_CHUNK_OVERLAP_TOKENS", "40"))  # 긴 문단을 자를 때만 사용
+CHUNK_DEDUP = os.getenv("RAG_CHUNK_DEDUP", "true").lower() == "true"
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("RAG_NEAR_DUPLICATE_THRESHOLD", "0.9"))  # MinHash 추정 Jaccard
+
+# 임베딩 설정
+EMBEDDING_MODEL = os.getenv("RAG_EMBEDDING_MODEL", "text-embedding-3-small")
+
+# 임베딩 백엔드: openai(API) | local(CPU의 sentence-transformers 모델, API 없이 동작)
+EMBEDDING_PROVIDER = os.getenv("RAG_EMBEDDING_PROVIDER", "openai")
+LOCAL_EMBEDDING_MODEL = os.getenv("RAG_LOCAL_EMBEDDING_MODEL", "intfloat/multilingual-e5-small")
+LOCAL_EMBEDDING_BACKEND = os.getenv("RAG_LOCAL_EMBEDDING_BACKEND", "torch")  # torch | onnx
+LOCAL_EMBEDDING_QUANTIZE = os.getenv("RAG_LOCAL_EMBEDDING_QUANTIZE", "false").lower() == "true"  # int8
+LOCAL_EMBEDDING_BATCH_SIZE = int(os.getenv("RAG_LOCAL_EMBEDDING_BATCH_SIZE", "32"))
+LOCAL_EMBEDDING_THREADS = int(os.getenv("RAG_LOCAL_EMBEDDING_THREADS", "0"))  # PyTorch 스레드 수 (0이면 기본값)
+LOCAL_EMBEDDING_CACHE_DIR = os.getenv("RAG_LOCAL_EMBEDDING_CACHE_DIR", os.path.join(BASE_DIR, "embedding_models"))
+# 질문/문서 앞에 붙일 접두어 (설정하지 않으면 모델별 기본값, e5 계열은 "query: " / "passage: ")
+LOCAL_EMBEDDING_QUERY_PREFIX = os.getenv("RAG_LOCAL_EMBEDDING_QUERY_PREFIX")
+LOCAL_EMBEDDING_PASSAGE_PREFIX = os.getenv("RAG_LOCAL_EMBEDDING_PASSAGE_PREFIX")
+
+# 파일별 FAISS 인덱스 캐시 폴더
+INDEX_CACHE_DIR = os.getenv("RAG_INDEX_CACHE_DIR", os.path.join(BASE_DIR, "index_cache"))
+
+# 임베딩 배치/동시 처리 설정
+EMBEDDING_BATCH_TOKENS = int(os.getenv("RAG_EMBEDDING_BATCH_TOKENS", "8000"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("RAG_EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_WORKERS = int(os.getenv("RAG_EMBEDDING_WORKERS", "4"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("RAG_EMBEDDING_MAX_RETRIES", "5"))
+
+# 문서 파싱 프로세스 풀 설정
+LOADER_WORKERS = int(os.getenv("RAG_LOADER_WORKERS", str(os.cpu_count() or 1)))
+PDF_PAGES_PER_TASK = int(os.getenv("RAG_PDF_PAGES_PER_TASK", "20"))
+
+# 답변 생성 설정
+LLM_MODEL = os.getenv("RAG_LLM_MODEL", "gpt-4-turbo-preview")
+STREAM_ANSWERS = os.getenv("RAG_STREAM_ANSWERS", "true").lower() == "true"
+
+# OpenAI HTTP 연결 풀: 모든 세션의 LLM/임베딩 호출이 프로세스당 하나의 keep-alive 연결 풀을 공유
+OPENAI_MAX_CONNECTIONS = int(os.getenv("RAG_OPENAI_MAX_CONNECTIONS", "20"))  # 동시에 열 수 있는 연결 수
+OPENAI_MAX_KEEPALIVE = int(os.getenv("RAG_OPENAI_MAX_KEEPALIVE", "20"))  # 요청이 없을 때도 열어 둘 연결 수
+OPENAI_KEEPALIVE_SECONDS = float(os.getenv("RAG_OPENAI_KEEPALIVE_SECONDS", "60"))  # 쉬는 연결을 닫기까지 (초)
+OPENAI_TIMEOUT = float(os.getenv("RAG_OPENAI_TIMEOUT", "60"))  # 응답 읽기/요청 쓰기/빈 연결 대기 (초)
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("RAG_OPENAI_CONNECT_TIMEOUT", "10"))  # 새 연결(TCP/TLS) (초)
+
+# 질문-답변 캐시 설정
+ANSWER_CACHE_ENABLED = os.getenv("RAG_ANSWER_CACHE", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("RAG_ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("RAG_ANSWER_CACHE_MAX_ENTRIES", "1000"))
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("RAG_ANSWER_CACHE_TTL_SECONDS", "86400"))
+
+# 채팅 세션 저장소 (SQLite) / 예전 JSON 파일 (처음 한 번 가져옴)
+SESSION_DB_PATH = os.getenv("RAG_SESSION_DB_PATH", os.path.join(BASE_DIR, "chat_sessions.db"))
+LEGACY_SESSIONS_FILE = os.path.join(BASE_DIR, "chat_sessions.json")
+
+# 채팅 화면에 한 번에 표시할 메시지 수
+CHAT_PAGE_SIZE = int(os.getenv("RAG_CHAT_PAGE_SIZE", "20"))
+
+# 대화 메모리: 최근 N턴은 그대로, 그 이전은 요약으로 유지
+MEMORY_RECENT_TURNS = int(os.getenv("RAG_MEMORY_RECENT_TURNS", "4"))
+MEMORY_MAX_TOKENS = int(os.getenv("RAG_MEMORY_MAX_TOKENS", "1500"))
+
+# 검색 설정: BM25 + 벡터 검색 결과를 순위 융합(RRF)하고, 필요하면 로컬 cross-encoder로 재정렬
+RETRIEVER_K = int(os.getenv("RAG_RETRIEVER_K", "3"))
+RETRIEVER_FETCH_K = int(os.getenv("RAG_RETRIEVER_FETCH_K", "20"))
+HYBRID_SEARCH = os.getenv("RAG_HYBRID_SEARCH", "true").lower() == "true"
+HYBRID_DENSE_WEIGHT = float(os.getenv("RAG_HYBRID_DENSE_WEIGHT", "1.0"))
+HYBRID_SPARSE_WEIGHT = float(os.getenv("RAG_HYBRID_SPARSE_WEIGHT", "1.0"))
+RERANKER_MODEL = os.getenv("RAG_RERANKER_MODEL", "")  # 예: "BAAI/bge-reranker-base" (비어 있으면 사용 안 함)
+
+# 벡터 인덱스 종류: auto | flat | hnsw | ivf_flat | ivf_pq | ivf_sq8
+ANN_INDEX_TYPE = os.getenv("RAG_ANN_INDEX_TYPE", "auto")
+ANN_HNSW_MIN_VECTORS = int(os.getenv("RAG_ANN_HNSW_MIN_VECTORS", "20000"))  # auto: 이 이상이면 HNSW
+ANN_IVF_MIN_VECTORS = int(os.getenv("RAG_ANN_IVF_MIN_VECTORS", "500000"))   # auto: 이 이상이면 IVF-SQ8
+HNSW_M = int(os.getenv("RAG_HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("RAG_HNSW_EF_SEARCH", "64"))
+IVF_NLIST = int(os.getenv("RAG_IVF_NLIST", "0"))  # 0이면 4 * sqrt(벡터 수), 벡터 수 / 39를 넘지 않음
+IVF_NPROBE = int(os.getenv("RAG_IVF_NPROBE", "16"))
+PQ_M = int(os.getenv("RAG_PQ_M", "0"))  # 0이면 차원 / 8 이하에서 차원을 나누는 가장 큰 값
+
+# 공유 인덱스 모드: 같은 문서 묶음의 벡터/청크를 mmap 파일로 두고 모든 세션/프로세스가 읽기 전용으로 공유
+SHARED_INDEX = os.getenv("RAG_SHARED_INDEX", "false").lower() == "true"
+SHARED_INDEX_DIR = os.getenv("RAG_SHARED_INDEX_DIR", os.path.join(BASE_DIR, "shared_index"))
+
+# 세션별 말뭉치: 세션마다 만든 말뭉치를 기록하고, 최근에 쓴 말뭉치의 검색 인덱스를 메모리에 열어 둠
+CORPUS_CACHE_ENTRIES = int(os.getenv("RAG_CORPUS_CACHE_ENTRIES", "8"))  # 열어 둘 말뭉치 수
+CORPUS_CACHE_MB = int(os.getenv("RAG_CORPUS_CACHE_MB", "512"))  # 열어 둔 말뭉치의 추정 메모리 합계 상한
+
+# 백그라운드 문서 수집 작업 (작업 상태는 SQLite에 저장해 새로고침/재시작 후에도 조회 가능)
+INGEST_DB_PATH = os.getenv("RAG_INGEST_DB_PATH", os.path.join(BASE_DIR, "ingest_jobs.db"))
+INGEST_WORKERS = int(os.getenv("RAG_INGEST_WORKERS", "2"))
+
+# 요청 계측: 요청마다 단계별 소요 시간/토큰 수를 JSONL로 남김 (경로를 비우면 기록 안 함)
+METRICS_LOG_PATH = os.getenv("RAG_METRICS_LOG_PATH", os.path.join(BASE_DIR, "metrics.jsonl"))
+METRICS_WINDOW = int(os.getenv("RAG_METRICS_WINDOW", "500"))  # p50/p95 계산에 쓰는 최근 요청 수
+METRICS_PORT = int(os.getenv("RAG_METRICS_PORT", "0"))  # Streamlit 앱의 /metrics 포트 (0이면 사용 안 함)
+CHAIN_VERBOSE = os.getenv("RAG_CHAIN_VERBOSE", "false").lower() == "true"  # 체인 실행 내용을 stdout에 출력
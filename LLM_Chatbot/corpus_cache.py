@@ -0,0 +1,101 @@
+"""최근에 쓴 말뭉치의 검색 인덱스를 메모리 예산 안에서 열어 두는 LRU
+
+세션마다 자기가 만든 말뭉치 ID를 세션 저장소에 기록하므로, 세션을 바꾸면 그 말뭉치의
+벡터 스토어와 BM25 인덱스를 여기서 찾는다 (다시 임베딩하지 않음).
+- 최근에 쓴 것부터 남기고, 개수(RAG_CORPUS_CACHE_ENTRIES)나 추정 메모리 합계(RAG_CORPUS_CACHE_MB)를
+  넘으면 가장 오래 안 쓴 것부터 내보낸다
+- 내보낸 말뭉치는 다시 쓸 때 디스크(공유 인덱스 또는 파일별 인덱스 캐시)에서 연다
+
+mmap으로 연 공유 인덱스의 벡터/청크는 프로세스 메모리가 아니라 OS 페이지 캐시에 있으므로 추정에서 뺀다.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import config
+from rag_pipeline import open_corpus
+from shared_index import MmapDocstore
+
+# 추정 메모리: BM25 (단어, 문서) 항목 하나 ≈ 90바이트, 청크 하나의 고정 비용 ≈ 300바이트 (tracemalloc으로 측정)
+POSTING_BYTES = 90
+CHUNK_BYTES = 300
+
+
+@dataclass
+class LoadedCorpus:
+    vectorstore: Any
+    keyword_index: Any
+    indexed_files: Dict[str, dict]  # 파일명 → {"key": 캐시 키, "ids": 청크 ID 목록}
+    size_bytes: int = 0
+
+
+def estimate_bytes(vectorstore, keyword_index=None) -> int:
+    """말뭉치가 프로세스 메모리에서 차지하는 대략의 크기"""
+    size = 0
+    if not isinstance(vectorstore.docstore, MmapDocstore):
+        index = vectorstore.index
+        # float32 벡터 기준 (PQ/SQ 인덱스는 실제로 더 작음)
+        size += index.ntotal * index.d * 4
+        size += sum(
+            len(vectorstore.docstore.search(doc_id).page_content.encode("utf-8")) + CHUNK_BYTES
+            for doc_id in vectorstore.index_to_docstore_id.values()
+        )
+    if keyword_index is not None:
+        size += keyword_index.posting_count * POSTING_BYTES + len(keyword_index) * CHUNK_BYTES
+    return size
+
+
+class CorpusCache:
+    """말뭉치 ID → LoadedCorpus (스레드 안전, 마지막 사용 순서로 정리)"""
+
+    def __init__(self, max_entries: int = None, max_bytes: int = None):
+        self.max_entries = max_entries or config.CORPUS_CACHE_ENTRIES
+        self.max_bytes = max_bytes if max_bytes is not None else config.CORPUS_CACHE_MB * 1024 * 1024
+        self._corpora: "OrderedDict[str, LoadedCorpus]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._corpora)
+
+    def __contains__(self, corpus_id: str):
+        return corpus_id in self._corpora
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(corpus.size_bytes for corpus in self._corpora.values())
+
+    def get(self, corpus_id: str, files: Optional[Dict[str, str]] = None) -> Optional[LoadedCorpus]:
+        """말뭉치 (메모리에 없으면 디스크에서 열고, 디스크에도 없으면 None)
+
+        files는 파일명 → 캐시 키 (공유 인덱스가 없을 때 파일별 인덱스로 다시 만들기 위해 필요)
+        """
+        with self._lock:
+            corpus = self._corpora.get(corpus_id)
+            if corpus is not None:
+                self._corpora.move_to_end(corpus_id)
+                self.hits += 1
+                return corpus
+            self.misses += 1
+        # 디스크에서 여는 동안 다른 세션이 막히지 않도록 잠금 밖에서 불러옴
+        loaded = open_corpus(corpus_id, files)
+        if loaded is None:
+            return None
+        return self.put(corpus_id, *loaded)
+
+    def put(self, corpus_id: str, vectorstore, keyword_index, indexed_files) -> LoadedCorpus:
+        """새로 만든 말뭉치를 넣음 (예산을 넘으면 오래 안 쓴 말뭉치부터 내보냄)"""
+        corpus = LoadedCorpus(vectorstore, keyword_index, indexed_files, estimate_bytes(vectorstore, keyword_index))
+        with self._lock:
+            self._corpora[corpus_id] = corpus
+            self._corpora.move_to_end(corpus_id)
+            # 방금 넣은 말뭉치 하나는 예산보다 커도 남김
+            while len(self._corpora) > 1 and (
+                len(self._corpora) > self.max_entries or self.size_bytes > self.max_bytes
+            ):
+                self._corpora.popitem(last=False)
+                self.evictions += 1
+        return corpus
@@ -0,0 +1,154 @@
+"""업로드 파일 파싱 (여러 파일과 PDF 페이지 구간을 프로세스 풀에서 병렬 처리)
+
+임시 파일을 만들지 않고 메모리의 bytes를 바로 파싱한다.
+Streamlit에 의존하지 않도록, 화면에 띄울 메시지는 (레벨, 내용) 목록으로 돌려준다.
+"""
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Tuple
+
+from langchain.schema import Document
+
+import config
+
+# 순서대로 시도할 인코딩 (cp949는 euc-kr의 상위 집합, latin-1은 항상 성공)
+TEXT_ENCODINGS = ['utf-8', 'cp949', 'latin-1']
+
+Message = Tuple[str, str]  # ("success" | "warning" | "error", 내용)
+
+_pool = None
+
+
+def _get_pool():
+    """프로세스 풀은 한 번만 만들어 재사용 (Streamlit 재실행마다 새로 띄우지 않음)"""
+    global _pool
+    if _pool is None:
+        # Streamlit/uvicorn은 여러 스레드를 쓰므로 fork 대신 spawn 사용
+        _pool = ProcessPoolExecutor(
+            max_workers=config.LOADER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def decode_text(data: bytes) -> Tuple[str, str]:
+    """메모리 버퍼에서 바로 인코딩을 판별해 디코딩 (BOM → utf-8 → cp949 → latin-1)"""
+    if data.startswith(b'\xef\xbb\xbf'):
+        return data[3:].decode('utf-8'), 'utf-8-sig'
+    for encoding in TEXT_ENCODINGS:
+        try:
+            return data.decode(encoding), encoding
+        except UnicodeDecodeError:
+            continue
+    raise UnicodeDecodeError('unknown', data, 0, len(data), '인코딩을 인식할 수 없습니다')
+
+
+def pdf_page_count(data: bytes) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+
+def parse_pdf_pages(name: str, data: bytes, start: int, end: int) -> List[Document]:
+    """PDF의 [start, end) 페이지를 페이지별 Document로 변환 (PyPDFLoader와 같은 메타데이터)"""
+    from pypdf import PdfReader
+    reader = PdfReader(io.BytesIO(data))
+    total_pages = len(reader.pages)
+    return [
+        Document(
+            page_content=reader.pages[page].extract_text(),
+            metadata={'source': name, 'page': page, 'total_pages': total_pages}
+        )
+        for page in range(start, min(end, total_pages))
+    ]
+
+
+def parse_text(name: str, data: bytes) -> Tuple[List[Document], List[Message]]:
+    text, encoding = decode_text(data)
+    docs = [Document(page_content=text, metadata={'source': name})]
+    return docs, [("success", f"파일 '{name}'을 {encoding} 인코딩으로 성공적으로 로드했습니다.")]
+
+
+def _run_task(kind: str, name: str, data: bytes, start: int = 0, end: int = 0):
+    """프로세스 풀에서 실행되는 작업 단위 (pickle 가능한 최상위 함수)"""
+    if kind == 'pdf':
+        return parse_pdf_pages(name, data, start, end), []
+    return parse_text(name, data)
+
+
+def _plan_tasks(name: str, data: bytes, messages: List[Message]) -> list:
+    """파일을 작업 단위로 나눔 (큰 PDF는 페이지 구간별로)"""
+    if name.endswith('.pdf'):
+        pages = pdf_page_count(data)
+        step = max(1, config.PDF_PAGES_PER_TASK)
+        return [('pdf', name, data, start, start + step) for start in range(0, pages, step)]
+    if name.endswith('.txt'):
+        return [('txt', name, data)]
+    messages.append(("warning", f"지원하지 않는 파일 형식: {name}"))
+    return []
+
+
+def iter_documents(files: Iterable[Tuple[str, bytes]]) -> Iterator[Tuple[str, List[Document], List[Message]]]:
+    """(파일명, bytes) 목록을 파싱해, 파일 하나가 끝날 때마다 (파일명, 문서들, 메시지)를 내보냄
+
+    파일 간 / 페이지 구간 간에는 순서를 보장하지 않고 먼저 끝난 파일부터 내보내므로,
+    받는 쪽은 다른 파일이 파싱되는 동안 분할/임베딩을 시작할 수 있다.
+    """
+    tasks = []
+    pending = {}  # 파일명 → 남은 작업 수
+    results = {}  # 파일명 → [(시작 페이지, 문서들)]
+    messages = {}
+
+    for name, data in files:
+        messages[name] = []
+        try:
+            file_tasks = _plan_tasks(name, data, messages[name])
+        except Exception as e:
+            file_tasks = []
+            messages[name].append(("error", f"파일 '{name}' 처리 중 오류: {e}"))
+        if not file_tasks:
+            yield name, [], messages[name]
+            continue
+        pending[name] = len(file_tasks)
+        results[name] = []
+        tasks.extend(file_tasks)
+
+    if not tasks:
+        return
+
+    def finish(name, start, outcome):
+        if isinstance(outcome, Exception):
+            messages[name].append(("error", f"파일 '{name}' 처리 중 오류: {outcome}"))
+        else:
+            docs, task_messages = outcome
+            results[name].append((start, docs))
+            messages[name].extend(task_messages)
+        pending[name] -= 1
+        if pending[name] == 0:
+            docs = [doc for _, chunk in sorted(results.pop(name), key=lambda r: r[0]) for doc in chunk]
+            return name, docs, messages[name]
+        return None
+
+    # 작업이 하나뿐이면 프로세스를 거치지 않고 바로 처리
+    if len(tasks) == 1 or config.LOADER_WORKERS <= 1:
+        for task in tasks:
+            try:
+                outcome = _run_task(*task)
+            except Exception as e:
+                outcome = e
+            done = finish(task[1], task[3] if len(task) > 3 else 0, outcome)
+            if done:
+                yield done
+        return
+
+    pool = _get_pool()
+    futures = {pool.submit(_run_task, *task): task for task in tasks}
+    for future in as_completed(futures):
+        task = futures[future]
+        try:
+            outcome = future.result()
+        except Exception as e:
+            outcome = e
+        done = finish(task[1], task[3] if len(task) > 3 else 0, outcome)
+        if done:
+            yield done
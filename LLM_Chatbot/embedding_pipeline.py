@@ -0,0 +1,146 @@
+"""청크 임베딩을 토큰 예산 단위 배치로 나눠 동시에 처리
+
+- 배치마다 토큰 수 합이 max_batch_tokens를 넘지 않도록 묶음
+- 정해진 수의 워커 스레드로 배치를 동시에 요청
+- 속도 제한(429)이나 일시적인 서버 오류는 지수 백오프로 재시도하고,
+  그동안 다른 워커도 요청을 멈추도록 공유 대기 시간을 둠
+- 완료된 청크 수를 progress_callback(done, total)으로 알림
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+import config
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """임베딩 모델 기준 토큰 수 (tiktoken을 쓸 수 없으면 영문 4글자 ≈ 1토큰, 그 외 1글자 ≈ 1토큰으로 근사)"""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding is False:
+        ascii_chars = len(text.encode("ascii", "ignore"))
+        return (ascii_chars + 3) // 4 + len(text) - ascii_chars
+    return len(_encoding.encode_ordinary(text))
+
+
+def make_batches(
+    texts: List[str], max_batch_tokens: int, max_batch_size: int, token_counts: List[int] = None
+) -> List[List[int]]:
+    """텍스트 인덱스를 토큰 예산 안에서 순서대로 묶음 (token_counts를 넘기면 다시 세지 않음)"""
+    batches = []
+    current, current_tokens = [], 0
+    for i, text in enumerate(texts):
+        tokens = token_counts[i] if token_counts is not None else count_tokens(text)
+        if current and (current_tokens + tokens > max_batch_tokens or len(current) >= max_batch_size):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """속도 제한/일시적 오류인지 판단 (openai 패키지를 직접 import하지 않음)"""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(error).__name__ in ("RateLimitError", "APITimeoutError", "APIConnectionError")
+
+
+class BatchedEmbeddings(Embeddings):
+    """다른 Embeddings를 감싸서 embed_documents를 배치 + 동시 처리로 바꿈"""
+
+    def __init__(
+        self,
+        base: Embeddings,
+        max_batch_tokens: int = None,
+        max_batch_size: int = None,
+        max_workers: int = None,
+        max_retries: int = None,
+        backoff_seconds: float = 1.0,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ):
+        self.base = base
+        self.max_batch_tokens = max_batch_tokens or config.EMBEDDING_BATCH_TOKENS
+        self.max_batch_size = max_batch_size or config.EMBEDDING_BATCH_SIZE
+        self.max_workers = max_workers or config.EMBEDDING_WORKERS
+        self.max_retries = config.EMBEDDING_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_seconds = backoff_seconds
+        self.progress_callback = progress_callback
+        # 속도 제한에 걸리면 모든 워커가 이 시각까지 새 요청을 보내지 않음
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+        self.tokens_embedded = 0
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.base.embed_query(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        token_counts = [count_tokens(text) for text in texts]
+        self.tokens_embedded += sum(token_counts)
+        batches = make_batches(texts, self.max_batch_tokens, self.max_batch_size, token_counts)
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        done = 0
+        self._report(done, len(texts))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self._embed_batch, [texts[i] for i in batch]): batch
+                for batch in batches
+            }
+            try:
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    for i, vector in zip(batch, future.result()):
+                        vectors[i] = vector
+                    done += len(batch)
+                    self._report(done, len(texts))
+            except BaseException:
+                # 한 배치가 끝내 실패하면 아직 시작하지 않은 배치는 취소
+                for future in futures:
+                    future.cancel()
+                raise
+
+        return vectors
+
+    def _report(self, done: int, total: int):
+        if self.progress_callback:
+            self.progress_callback(done, total)
+
+    def _wait_for_cooldown(self):
+        while True:
+            with self._lock:
+                remaining = self._cooldown_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def _embed_batch(self, batch_texts: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            self._wait_for_cooldown()
+            try:
+                return self.base.embed_documents(batch_texts)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    raise
+                delay = self.backoff_seconds * (2 ** attempt) * (1 + random.random() * 0.25)
+                with self._lock:
+                    self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+                attempt += 1
@@ -0,0 +1,200 @@
+"""임베딩 백엔드 선택 (OpenAI API 또는 로컬 CPU 모델)
+
+RAG_EMBEDDING_PROVIDER=openai | local 로 고른다. local은 sentence-transformers 모델을
+CPU에서 배치로 돌리며(PyTorch 또는 ONNX Runtime), 원하면 int8 동적 양자화를 적용한다.
+
+e5 계열처럼 질문/문서 앞에 접두어를 붙여 학습된 모델은 모델별 접두어를 붙여 임베딩한다.
+
+모델 식별값(embedding_model_id)은 캐시 키와 저장된 인덱스 메타데이터에 함께 들어가므로,
+다른 백엔드/모델/접두어로 만든 벡터가 한 인덱스에 섞이지 않는다.
+"""
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+
+import config
+from embedding_pipeline import BatchedEmbeddings
+from openai_clients import http_clients
+
+
+# 모델별 (질문 접두어, 문서 접두어): 이 접두어를 붙여 학습되어 빼면 검색 정확도가 떨어짐
+E5_PREFIXES = ("query: ", "passage: ")
+MODEL_PREFIXES = {
+    "intfloat/multilingual-e5-small": E5_PREFIXES,
+    "intfloat/multilingual-e5-base": E5_PREFIXES,
+    "intfloat/multilingual-e5-large": E5_PREFIXES,
+    "intfloat/e5-small-v2": E5_PREFIXES,
+    "intfloat/e5-base-v2": E5_PREFIXES,
+    "intfloat/e5-large-v2": E5_PREFIXES,
+}
+
+
+class EmbeddingModelMismatch(ValueError):
+    """저장된 인덱스의 임베딩 모델이 지금 설정과 다름"""
+
+
+def embedding_prefixes(model_name: str = None) -> Tuple[str, str]:
+    """로컬 모델의 (질문 접두어, 문서 접두어) - 환경 변수로 준 값이 모델별 기본값보다 우선"""
+    query, passage = MODEL_PREFIXES.get(model_name or config.LOCAL_EMBEDDING_MODEL, ("", ""))
+    if config.LOCAL_EMBEDDING_QUERY_PREFIX is not None:
+        query = config.LOCAL_EMBEDDING_QUERY_PREFIX
+    if config.LOCAL_EMBEDDING_PASSAGE_PREFIX is not None:
+        passage = config.LOCAL_EMBEDDING_PASSAGE_PREFIX
+    return query, passage
+
+
+def embedding_model_id() -> str:
+    """지금 설정의 임베딩 모델 식별값 (예: openai:text-embedding-3-small, local:모델명:onnx-int8:prefix='query: '/'passage: ')"""
+    if config.EMBEDDING_PROVIDER == "local":
+        variant = config.LOCAL_EMBEDDING_BACKEND + ("-int8" if config.LOCAL_EMBEDDING_QUANTIZE else "")
+        model_id = f"local:{config.LOCAL_EMBEDDING_MODEL}:{variant}"
+        query, passage = embedding_prefixes()
+        if query or passage:
+            model_id += f":prefix={query!r}/{passage!r}"
+        return model_id
+    return f"openai:{config.EMBEDDING_MODEL}"
+
+
+def check_model(stored_id: Optional[str]):
+    """저장된 모델 식별값이 지금 설정과 다르면 EmbeddingModelMismatch"""
+    current = embedding_model_id()
+    if stored_id != current:
+        raise EmbeddingModelMismatch(f"인덱스 임베딩 모델({stored_id})이 현재 설정({current})과 다릅니다.")
+
+
+class LocalEmbeddings(Embeddings):
+    """sentence-transformers 모델로 CPU에서 임베딩 (프로세스당 모델 한 번만 로드)"""
+
+    _models: Dict[str, Any] = {}
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        model_name: str = None,
+        backend: str = None,
+        quantize: bool = None,
+        batch_size: int = None,
+        threads: int = None,
+    ):
+        self.model_name = model_name or config.LOCAL_EMBEDDING_MODEL
+        self.backend = backend or config.LOCAL_EMBEDDING_BACKEND
+        self.quantize = config.LOCAL_EMBEDDING_QUANTIZE if quantize is None else quantize
+        self.batch_size = batch_size or config.LOCAL_EMBEDDING_BATCH_SIZE
+        self.threads = config.LOCAL_EMBEDDING_THREADS if threads is None else threads
+        self.query_prefix, self.passage_prefix = embedding_prefixes(self.model_name)
+        # 모델 추론은 내부 스레드(intra-op)로 병렬화하므로 동시에 한 배치만 넣음
+        self._encode_lock = threading.Lock()
+
+    def _model(self):
+        key = f"{self.model_name}:{self.backend}:{self.quantize}"
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = self._load()
+            return self._models[key]
+
+    def _load(self):
+        from sentence_transformers import SentenceTransformer
+
+        if self.backend == "onnx":
+            model = SentenceTransformer(self.model_name, device="cpu", backend="onnx")
+            if self.quantize:
+                model = self._quantize_onnx(model)
+            # ONNX Runtime은 기본으로 모든 코어를 사용
+            return model
+
+        import torch
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        model = SentenceTransformer(self.model_name, device="cpu")
+        if self.quantize:
+            # Linear 층 가중치만 int8로 (정확도 손실은 작고 CPU 추론은 빨라짐)
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
+    def _quantize_onnx(self, model):
+        """ONNX 모델을 int8로 동적 양자화해 캐시 폴더에 한 번만 저장하고 다시 로드"""
+        from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+        save_dir = os.path.join(config.LOCAL_EMBEDDING_CACHE_DIR, self.model_name.replace("/", "__"))
+        file_name = "model_qint8_avx2.onnx"
+        if not os.path.exists(os.path.join(save_dir, "onnx", file_name)):
+            model.save_pretrained(save_dir)
+            export_dynamic_quantized_onnx_model(model, "avx2", save_dir)
+        return SentenceTransformer(
+            save_dir, device="cpu", backend="onnx", model_kwargs={"file_name": f"onnx/{file_name}"}
+        )
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        model = self._model()
+        with self._encode_lock:
+            vectors = model.encode(
+                texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+        return vectors.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._encode([self.passage_prefix + text for text in texts])
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([self.query_prefix + text])[0]
+
+
+_embeddings = None
+_document_embeddings = None
+_embeddings_lock = threading.Lock()
+
+
+def get_embeddings() -> Embeddings:
+    """설정된 백엔드의 임베딩 객체 (프로세스 전체에서 공유)"""
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            if config.EMBEDDING_PROVIDER == "local":
+                _embeddings = LocalEmbeddings()
+            else:
+                # LLM과 같은 keep-alive 연결 풀을 씀
+                _embeddings = OpenAIEmbeddings(model=config.EMBEDDING_MODEL, **http_clients())
+        return _embeddings
+
+
+def _document_base() -> Embeddings:
+    """문서 수집용 기본 임베딩 (OpenAI는 SDK 재시도를 끈 객체를 따로 둠)
+
+    BatchedEmbeddings가 배치 단위로 재시도하므로 SDK 재시도까지 겹치면 한 배치의 요청 수가 두 재시도 횟수의 곱만큼 늘어난다.
+    질문 임베딩은 BatchedEmbeddings를 거치지 않으므로 get_embeddings()는 SDK 재시도를 그대로 둔다.
+    """
+    global _document_embeddings
+    base = get_embeddings()
+    if not isinstance(base, OpenAIEmbeddings):
+        return base
+    with _embeddings_lock:
+        if _document_embeddings is None:
+            _document_embeddings = OpenAIEmbeddings(model=config.EMBEDDING_MODEL, max_retries=0, **http_clients())
+        return _document_embeddings
+
+
+def create_document_embeddings(
+    base: Embeddings = None, progress_callback: Optional[Callable[[int, int], None]] = None
+) -> BatchedEmbeddings:
+    """문서 수집용 임베딩: API는 여러 배치를 동시에 요청하고, 로컬 모델은 배치를 차례로 넣음"""
+    base = base or _document_base()
+    if isinstance(base, LocalEmbeddings):
+        return BatchedEmbeddings(
+            base,
+            max_batch_tokens=sys.maxsize,
+            max_batch_size=base.batch_size * 8,
+            max_workers=1,
+            max_retries=0,
+            progress_callback=progress_callback
+        )
+    return BatchedEmbeddings(base, progress_callback=progress_callback)
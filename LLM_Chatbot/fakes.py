@@ -0,0 +1,109 @@
+"""오프라인 테스트/벤치마크용 가짜 백엔드 (OpenAI API 호출 없음)"""
+import hashlib
+import math
+import re
+import threading
+import time
+from typing import Iterator, List
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class RateLimitError(Exception):
+    """OpenAI의 429 응답을 흉내내는 예외"""
+    status_code = 429
+
+
+class FakeEmbeddings(Embeddings):
+    """단어 해시 기반의 결정적 임베딩
+
+    같은 단어를 많이 공유하는 텍스트일수록 벡터가 가까워지므로 검색 결과도 어느 정도 의미가 있다.
+    latency_per_call / latency_per_text로 API 지연을, rate_limit_every로 속도 제한을 흉내낸다.
+    """
+
+    def __init__(
+        self,
+        size: int = 256,
+        latency_per_call: float = 0.0,
+        latency_per_text: float = 0.0,
+        rate_limit_every: int = 0,
+    ):
+        self.size = size
+        self.latency_per_call = latency_per_call
+        self.latency_per_text = latency_per_text
+        self.rate_limit_every = rate_limit_every
+        self.calls = 0
+        self.texts_embedded = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    def _vector(self, text: str) -> List[float]:
+        vector = [0.0] * self.size
+        for token in re.findall(r"\w+", text.lower()):
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.size
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            self.calls += 1
+            throttled = self.rate_limit_every and self.calls % self.rate_limit_every == 0
+            if throttled:
+                self.rate_limited += 1
+        time.sleep(self.latency_per_call + self.latency_per_text * len(texts))
+        if throttled:
+            raise RateLimitError("Rate limit reached (fake)")
+        with self._lock:
+            self.texts_embedded += len(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency_per_call)
+        return self._vector(text)
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """정해진 답변을 토큰(단어) 단위로 지연을 두고 흘려보내는 가짜 채팅 모델"""
+
+    responses: List[str] = ["문서에 따르면 요청하신 내용은 다음과 같습니다."]
+    first_token_delay: float = 0.0
+    token_delay: float = 0.0
+    streaming: bool = True
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming-chat"
+
+    def get_token_ids(self, text: str) -> List[int]:
+        # 토크나이저 없이 공백 단위로 토큰 수만 맞춤 (메모리 토큰 예산 계산용)
+        return list(range(len(text.split())))
+
+    def _tokens(self) -> Iterator[str]:
+        response = self.responses[self.calls % len(self.responses)]
+        self.calls += 1
+        time.sleep(self.first_token_delay)
+        for i, token in enumerate(re.findall(r"\S+\s*", response)):
+            if i:
+                time.sleep(self.token_delay)
+            yield token
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        for token in self._tokens():
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text = ""
+        for token in self._tokens():
+            if self.streaming and run_manager:
+                run_manager.on_llm_new_token(token)
+            text += token
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
@@ -0,0 +1,105 @@
+"""업로드 파일별 FAISS 인덱스를 디스크에 캐시
+
+파일 내용(bytes)과 분할/임베딩 설정을 합쳐 해시한 값을 키로 사용하므로,
+같은 문서를 다시 업로드하면 임베딩 API를 호출하지 않고 저장된 인덱스를 불러온다.
+폴더마다 임베딩 모델 식별값(model.json)을 함께 저장해 다른 모델의 벡터는 불러오지 않는다.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+from langchain_community.vectorstores import FAISS
+
+import config
+from embedding_provider import EmbeddingModelMismatch, check_model, embedding_model_id
+
+# 저장 형식이나 분할 결과가 바뀌면 올려서 예전 캐시를 무효화 (2: 숫자만 다른 본문 줄을 머리글로 지우던 캐시)
+INDEX_FORMAT_VERSION = 2
+
+
+def index_settings() -> dict:
+    """캐시 키에 포함되는 분할/임베딩 설정"""
+    return {
+        "version": INDEX_FORMAT_VERSION,
+        "chunk_size": config.CHUNK_SIZE,
+        "chunk_overlap": config.CHUNK_OVERLAP,
+        "chunk_strategy": config.CHUNK_STRATEGY,
+        "chunk_tokens": config.CHUNK_TOKENS,
+        "chunk_min_tokens": config.CHUNK_MIN_TOKENS,
+        "chunk_overlap_tokens": config.CHUNK_OVERLAP_TOKENS,
+        "chunk_dedup": config.CHUNK_DEDUP,
+        "near_duplicate_threshold": config.NEAR_DUPLICATE_THRESHOLD,
+        "embedding_model": embedding_model_id(),
+    }
+
+
+def shard_key(data: bytes, settings: dict = None) -> str:
+    """파일 내용 + 설정으로 캐시 키(sha256) 생성"""
+    digest = hashlib.sha256()
+    digest.update(data)
+    digest.update(json.dumps(settings or index_settings(), sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class IndexStore:
+    """캐시 키 → FAISS 인덱스 폴더 (save_local / load_local)"""
+
+    def __init__(self, root: str = None):
+        self.root = root or config.INDEX_CACHE_DIR
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self.path(key), "index.faiss"))
+
+    def load(self, key: str, embeddings) -> Optional[FAISS]:
+        """저장된 인덱스를 불러옴 (없거나 손상되었거나 임베딩 모델이 다르면 None)"""
+        if not self.exists(key):
+            return None
+        try:
+            check_model(_read_model_id(self.path(key)))
+        except EmbeddingModelMismatch:
+            return None
+        try:
+            # 이 프로세스가 직접 저장한 파일만 읽으므로 pickle 역직렬화를 허용
+            return FAISS.load_local(self.path(key), embeddings, allow_dangerous_deserialization=True)
+        except Exception:
+            shutil.rmtree(self.path(key), ignore_errors=True)
+            return None
+
+    def save(self, key: str, vectorstore: FAISS):
+        """임시 폴더에 저장한 뒤 이름을 바꿔서, 동시에 읽는 쪽이 반쯤 쓴 파일을 보지 않게 함"""
+        if self.exists(key):
+            return
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.root)
+        try:
+            vectorstore.save_local(tmp_dir)
+            with open(os.path.join(tmp_dir, "model.json"), "w", encoding="utf-8") as f:
+                json.dump({"embedding_model": embedding_model_id()}, f)
+            os.replace(tmp_dir, self.path(key))
+        except OSError:
+            # 다른 프로세스가 먼저 같은 키를 저장한 경우
+            pass
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _read_model_id(directory: str) -> Optional[str]:
+    try:
+        with open(os.path.join(directory, "model.json"), encoding="utf-8") as f:
+            return json.load(f).get("embedding_model")
+    except (OSError, ValueError):
+        return None
+
+
+def corpus_fingerprint(keys) -> str:
+    """파일 캐시 키들의 집합으로 말뭉치 식별값 생성 (업로드 순서와 무관)"""
+    digest = hashlib.sha256()
+    for key in sorted(set(keys)):
+        digest.update(key.encode("utf-8"))
+    return digest.hexdigest()
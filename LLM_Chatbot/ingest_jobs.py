@@ -0,0 +1,281 @@
+"""백그라운드 문서 수집 작업
+
+업로드 요청은 작업 ID만 바로 돌려주고, 파싱/분할/임베딩/인덱싱은 스레드 풀에서 진행한다.
+작업과 파일별 진행 단계는 SQLite 테이블에 남기므로 브라우저를 새로고침하거나
+다른 프로세스(여러 uvicorn 워커)에서도 조회할 수 있다.
+
+새 인덱스는 기존 인덱스를 건드리지 않고 따로 만든 뒤 완료 시 결과로 넘기므로,
+사용하는 쪽은 참조만 바꿔 끼우면 된다 (작업 중에도 이전 인덱스로 계속 대화 가능).
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import config
+from rag_pipeline import (
+    CHUNKED,
+    EMBEDDED,
+    INDEXED,
+    UploadedFile,
+    build_shared_corpus,
+    copy_corpus,
+    file_keys,
+    update_vectorstore
+)
+from metrics import REGISTRY, RequestTrace
+from retrieval import BM25Index
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    files TEXT NOT NULL,
+    corpus_id TEXT,
+    stats TEXT NOT NULL DEFAULT '{}',
+    messages TEXT NOT NULL DEFAULT '[]',
+    error TEXT NOT NULL DEFAULT '',
+    pid INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingest_job_files (
+    job_id TEXT NOT NULL REFERENCES ingest_jobs(job_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    file_key TEXT NOT NULL DEFAULT '',
+    stage TEXT NOT NULL,
+    chunks INTEGER NOT NULL DEFAULT 0,
+    embedded INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, name)
+);
+"""
+
+# 작업 상태: queued → running → done | failed
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+# 결과(벡터 스토어)를 메모리에 보관할 최근 작업 수
+MAX_RESULTS = 16
+
+
+class JobStore:
+    """스레드마다 별도 연결을 쓰는 SQLite 작업 테이블"""
+
+    def __init__(self, path: str = None):
+        self.path = path or config.INGEST_DB_PATH
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # 진행 메시지/프로세스 컬럼이 없던 예전 DB 파일 보완
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(ingest_jobs)")}
+            if "messages" not in columns:
+                conn.execute("ALTER TABLE ingest_jobs ADD COLUMN messages TEXT NOT NULL DEFAULT '[]'")
+                conn.execute("ALTER TABLE ingest_jobs ADD COLUMN pid INTEGER NOT NULL DEFAULT 0")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def create(
+        self, files: List[str], status: str = QUEUED, corpus_id: str = None, keys: Dict[str, str] = None
+    ) -> str:
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO ingest_jobs (job_id, status, files, corpus_id, pid, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, status, json.dumps(files, ensure_ascii=False), corpus_id, os.getpid(), now, now)
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO ingest_job_files (job_id, name, file_key, stage) VALUES (?, ?, ?, ?)",
+                [(job_id, name, (keys or {}).get(name, ""), status if status == DONE else QUEUED) for name in files]
+            )
+        return job_id
+
+    def update(self, job_id: str, status: str, corpus_id: str = None, stats: dict = None, error: str = ""):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE ingest_jobs SET status = ?, corpus_id = COALESCE(?, corpus_id), "
+                "stats = COALESCE(?, stats), error = ?, updated_at = ? WHERE job_id = ?",
+                (
+                    status,
+                    corpus_id,
+                    json.dumps(stats) if stats is not None else None,
+                    error,
+                    datetime.now().isoformat(),
+                    job_id
+                )
+            )
+
+    def update_file(self, job_id: str, name: str, stage: str = None, chunks: int = None, embedded: int = None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE ingest_job_files SET stage = COALESCE(?, stage), chunks = COALESCE(?, chunks), "
+                "embedded = COALESCE(?, embedded) WHERE job_id = ? AND name = ?",
+                (stage, chunks, embedded, job_id, name)
+            )
+
+    def add_messages(self, job_id: str, messages: list):
+        """문서 로더의 (레벨, 내용) 메시지를 작업에 덧붙임"""
+        if not messages:
+            return
+        with self._connect() as conn:
+            row = conn.execute("SELECT messages FROM ingest_jobs WHERE job_id = ?", (job_id,)).fetchone()
+            saved = json.loads(row["messages"]) if row else []
+            conn.execute(
+                "UPDATE ingest_jobs SET messages = ? WHERE job_id = ?",
+                (json.dumps(saved + [list(message) for message in messages], ensure_ascii=False), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM ingest_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["files"] = json.loads(job["files"])
+        job["stats"] = json.loads(job["stats"])
+        job["messages"] = json.loads(job["messages"])
+        job["file_progress"] = [
+            dict(file_row)
+            for file_row in conn.execute(
+                "SELECT name, file_key, stage, chunks, embedded FROM ingest_job_files WHERE job_id = ? ORDER BY rowid",
+                (job_id,)
+            )
+        ]
+        return job
+
+    def fail_orphaned(self) -> int:
+        """실행하던 프로세스가 사라져 끝나지 못한 작업을 실패로 표시"""
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT job_id, pid FROM ingest_jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+        ).fetchall()
+        orphaned = [row["job_id"] for row in rows if not _process_alive(row["pid"])]
+        for job_id in orphaned:
+            self.update(job_id, FAILED, error="작업을 실행하던 프로세스가 종료되었습니다. 다시 업로드해주세요.")
+        return len(orphaned)
+
+
+def _process_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobProgress:
+    """파이프라인 콜백을 작업 테이블 갱신으로 연결"""
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self.current = None  # 지금 임베딩 중인 파일
+
+    def stage(self, name: str, stage: str, count: int):
+        if stage == CHUNKED:
+            self.current = name
+        self.store.update_file(
+            self.job_id,
+            name,
+            stage=stage,
+            chunks=count or None,
+            embedded=count if stage in (EMBEDDED, INDEXED) and count else None
+        )
+
+    def embedding(self, done: int, total: int):
+        if self.current:
+            self.store.update_file(self.job_id, self.current, embedded=done)
+
+    def messages(self, messages):
+        self.store.add_messages(self.job_id, messages)
+
+
+class IngestQueue:
+    """작업 테이블 + 스레드 풀 (파싱 자체는 doc_loader의 프로세스 풀에서 병렬로 진행)
+
+    shared=True면 공유 mmap 인덱스로 게시하고 corpus_id를 남기며,
+    아니면 (벡터 스토어, BM25 인덱스, 파일 정보)를 result()로 돌려준다.
+    base로 지금 쓰는 (벡터 스토어, BM25 인덱스, 파일 정보)를 넘기면 그 복사본에 추가/삭제된 파일만 반영한다
+    (작업 중에도 원본으로 계속 검색하고, 작업이 끝나면 결과로 통째로 교체).
+    """
+
+    def __init__(self, store: JobStore = None, max_workers: int = None):
+        self.store = store or JobStore()
+        self.store.fail_orphaned()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or config.INGEST_WORKERS)
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, files: List[UploadedFile], shared: bool = True, base=None) -> str:
+        job_id = self.store.create([name for name, _ in files], keys=file_keys(files))
+        self._executor.submit(self._run, job_id, files, shared, base)
+        return job_id
+
+    def result(self, job_id: str):
+        """완료된 작업의 (벡터 스토어, BM25 인덱스, 파일 정보), 이 프로세스에 없으면 None"""
+        with self._lock:
+            return self._results.get(job_id)
+
+    def _run(self, job_id: str, files: List[UploadedFile], shared: bool, base=None):
+        self.store.update(job_id, RUNNING)
+        progress = JobProgress(self.store, job_id)
+        trace = RequestTrace("ingest")
+        try:
+            if shared:
+                corpus, stats = build_shared_corpus(
+                    files, progress.embedding, progress.messages, progress.stage, trace=trace, base=base
+                )
+                ok = corpus is not None
+            else:
+                # 기존 인덱스는 그대로 두고 복사본에 바뀐 파일만 반영
+                corpus = None
+                vectorstore, keyword_index, indexed_files = copy_corpus(*base) if base else (None, BM25Index(), {})
+                vectorstore, indexed_files, stats = update_vectorstore(
+                    vectorstore,
+                    files,
+                    indexed_files,
+                    progress_callback=progress.embedding,
+                    keyword_index=keyword_index,
+                    message_callback=progress.messages,
+                    stage_callback=progress.stage,
+                    trace=trace
+                )
+                ok = vectorstore is not None
+                if ok:
+                    with self._lock:
+                        self._results[job_id] = (vectorstore, keyword_index, indexed_files)
+                        while len(self._results) > MAX_RESULTS:
+                            self._results.popitem(last=False)
+        except Exception as e:
+            trace.count("errors")
+            REGISTRY.observe(trace)
+            self.store.update(job_id, FAILED, error=str(e))
+            return
+        REGISTRY.observe(trace)
+        if ok:
+            self.store.update(job_id, DONE, corpus_id=corpus, stats=stats)
+        else:
+            self.store.update(job_id, FAILED, stats=stats, error="처리할 수 있는 문서가 없습니다.")
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
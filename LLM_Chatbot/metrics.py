@@ -0,0 +1,220 @@
+"""요청 단위 지연 시간/토큰 계측
+
+- RequestTrace: 한 요청(질문 또는 문서 수집)의 단계별 소요 시간과 카운터
+- MetricsCallbackHandler(streaming.py): 체인 실행 중 질문 재작성/검색/LLM 첫 토큰/LLM 전체 시간과 토큰 수를 기록
+- MetricsRegistry: 끝난 요청을 JSONL 로그에 한 줄씩 남기고, Prometheus 텍스트 형식과 최근 p50/p95로 집계
+
+LangChain을 가져오지 않으므로 화면을 처음 그릴 때 바로 import해도 된다.
+집계는 프로세스 단위다 (uvicorn 워커마다 /metrics가 따로 있음). 모든 요청 기록은 JSONL 로그에 남는다.
+"""
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+
+import config
+
+# 단계 이름
+LOAD, SPLIT, EMBED = "load", "split", "embed"
+CACHE_LOOKUP, CONDENSE, RETRIEVE = "cache_lookup", "condense", "retrieve"
+LLM_FIRST_TOKEN, LLM_TOTAL, TOTAL = "llm_first_token", "llm_total", "total"
+STAGES = (LOAD, SPLIT, EMBED, CACHE_LOOKUP, CONDENSE, RETRIEVE, LLM_FIRST_TOKEN, LLM_TOTAL, TOTAL)
+
+# 히스토그램 구간 (초)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class RequestTrace:
+    """요청 하나의 단계별 소요 시간(같은 단계가 여러 번이면 합산)과 카운터"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.request_id = uuid.uuid4().hex
+        self.timestamp = datetime.now().isoformat()
+        self.spans: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self.spans[stage] = self.spans.get(stage, 0.0) + seconds
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def finish(self) -> dict:
+        self.spans[TOTAL] = time.perf_counter() - self._started
+        return self.to_dict()
+
+    def to_dict(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "kind": self.kind,
+            "timestamp": self.timestamp,
+            "spans": {stage: round(seconds, 6) for stage, seconds in self.spans.items()},
+            "counts": dict(self.counts)
+        }
+
+
+def span(trace: Optional[RequestTrace], stage: str):
+    """trace가 없으면 아무것도 하지 않는 span"""
+    return trace.span(stage) if trace else nullcontext()
+
+
+def timed_iter(trace: Optional[RequestTrace], stage: str, iterable: Iterable):
+    """다음 항목을 기다린 시간만 stage에 합산 (생성기 소비 쪽 처리 시간은 제외)"""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            if trace:
+                trace.record(stage, time.perf_counter() - start)
+            return
+        if trace:
+            trace.record(stage, time.perf_counter() - start)
+        yield item
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+
+class MetricsRegistry:
+    """끝난 요청들을 집계 (스레드 안전)"""
+
+    def __init__(self, log_path: str = None, window: int = None):
+        self.log_path = config.METRICS_LOG_PATH if log_path is None else log_path
+        self.window = window or config.METRICS_WINDOW
+        self._lock = threading.Lock()
+        self._histograms = {}  # (kind, stage) → [구간별 개수..., 합계, 개수]
+        self._counters = {}    # (kind, name) → 누적 값
+        self._requests = {}    # kind → 요청 수
+        self._recent = {}      # (kind, stage) → 최근 소요 시간들
+
+    def observe(self, trace: RequestTrace) -> dict:
+        """요청을 마감하고 집계 + JSONL 기록"""
+        record = trace.finish()
+        kind = record["kind"]
+        with self._lock:
+            self._requests[kind] = self._requests.get(kind, 0) + 1
+            for stage, seconds in record["spans"].items():
+                histogram = self._histograms.setdefault((kind, stage), [0] * (len(BUCKETS) + 2))
+                for i, bound in enumerate(BUCKETS):
+                    if seconds <= bound:
+                        histogram[i] += 1
+                histogram[-2] += seconds
+                histogram[-1] += 1
+                self._recent.setdefault((kind, stage), deque(maxlen=self.window)).append(seconds)
+            for name, value in record["counts"].items():
+                self._counters[(kind, name)] = self._counters.get((kind, name), 0) + value
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record
+
+    def counter(self, kind: str, name: str) -> int:
+        with self._lock:
+            return self._counters.get((kind, name), 0)
+
+    def summary(self, kind: str) -> List[dict]:
+        """최근 요청 기준 단계별 p50/p95 (사이드바 표시용)"""
+        with self._lock:
+            recent = {stage: sorted(values) for (k, stage), values in self._recent.items() if k == kind}
+        return [
+            {
+                "stage": stage,
+                "count": len(values),
+                "p50": _percentile(values, 0.5),
+                "p95": _percentile(values, 0.95)
+            }
+            for stage, values in sorted(
+                recent.items(), key=lambda item: STAGES.index(item[0]) if item[0] in STAGES else len(STAGES)
+            )
+        ]
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식"""
+        lines = [
+            "# HELP rag_requests_total Finished requests.",
+            "# TYPE rag_requests_total counter"
+        ]
+        with self._lock:
+            for kind, value in sorted(self._requests.items()):
+                lines.append(f"rag_requests_total{{{_labels(kind=kind)}}} {value}")
+
+            lines += [
+                "# HELP rag_stage_seconds Time spent in each request stage.",
+                "# TYPE rag_stage_seconds histogram"
+            ]
+            for (kind, stage), histogram in sorted(self._histograms.items()):
+                for bound, value in zip(BUCKETS, histogram):
+                    lines.append(f"rag_stage_seconds_bucket{{{_labels(kind=kind, stage=stage, le=bound)}}} {value}")
+                labels = _labels(kind=kind, stage=stage)
+                lines.append(f'rag_stage_seconds_bucket{{{labels},le="+Inf"}} {histogram[-1]}')
+                lines.append(f"rag_stage_seconds_sum{{{labels}}} {histogram[-2]:.6f}")
+                lines.append(f"rag_stage_seconds_count{{{labels}}} {histogram[-1]}")
+
+            lines += [
+                "# HELP rag_tokens_total Tokens sent to and received from models.",
+                "# TYPE rag_tokens_total counter"
+            ]
+            events = []
+            for (kind, name), value in sorted(self._counters.items()):
+                if name.endswith("_tokens"):
+                    lines.append(f"rag_tokens_total{{{_labels(kind=kind, type=name)}}} {value}")
+                else:
+                    events.append(f"rag_events_total{{{_labels(kind=kind, event=name)}}} {value}")
+
+        lines += [
+            "# HELP rag_events_total Cache hits/misses, retrieved documents and errors.",
+            "# TYPE rag_events_total counter"
+        ] + events
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 전체가 공유하는 집계
+REGISTRY = MetricsRegistry()
+
+
+def start_metrics_server(port: int, registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """/metrics만 응답하는 HTTP 서버를 데몬 스레드로 시작 (Streamlit 앱처럼 라우트를 추가할 수 없는 경우)"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,69 @@
+"""프로세스 전체가 공유하는 OpenAI 클라이언트 (keep-alive 연결 풀)
+
+ChatOpenAI/OpenAIEmbeddings는 따로 만들 때마다 자기 HTTP 클라이언트를 가지므로,
+세션이나 업로드마다 새로 만들면 TCP/TLS 연결도 매번 새로 맺는다.
+여기서 httpx 클라이언트(동기/비동기) 한 쌍을 프로세스당 한 번 만들어 모든 LLM/임베딩 객체에 넘기고,
+LLM 객체도 API 키마다 한 번만 만든다. 세션별 대화 체인은 이 공유 객체를 감싸는 가벼운 래퍼다.
+
+비동기 클라이언트의 연결은 처음 쓴 이벤트 루프에 묶이므로, 비동기 호출은 API 서버처럼
+프로세스에 하나뿐인 이벤트 루프에서만 한다 (Streamlit 앱은 동기 호출만 씀).
+"""
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+import config
+
+_http_clients = None
+_llms: Dict[Optional[str], Tuple[ChatOpenAI, ChatOpenAI]] = {}
+_lock = threading.Lock()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=config.OPENAI_MAX_KEEPALIVE,
+        keepalive_expiry=config.OPENAI_KEEPALIVE_SECONDS
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(config.OPENAI_TIMEOUT, connect=config.OPENAI_CONNECT_TIMEOUT)
+
+
+def http_clients() -> Dict[str, httpx.Client]:
+    """ChatOpenAI/OpenAIEmbeddings에 그대로 넘길 공유 클라이언트 {"http_client", "http_async_client"}"""
+    global _http_clients
+    with _lock:
+        if _http_clients is None:
+            _http_clients = {
+                "http_client": httpx.Client(limits=_limits(), timeout=_timeout()),
+                "http_async_client": httpx.AsyncClient(limits=_limits(), timeout=_timeout())
+            }
+        return dict(_http_clients)
+
+
+def get_llms(openai_api_key: Optional[str] = None) -> Tuple[ChatOpenAI, ChatOpenAI]:
+    """(답변 LLM, 질문 재작성 LLM) - 상태가 없으므로 API 키마다 한 번 만들어 모든 대화 체인이 공유"""
+    clients = http_clients()
+    with _lock:
+        if openai_api_key not in _llms:
+            # 답변 LLM은 토큰을 스트리밍하고, 질문 재작성 LLM은 스트리밍하지 않음
+            llm = ChatOpenAI(
+                model=config.LLM_MODEL,
+                temperature=0.7,
+                openai_api_key=openai_api_key,
+                streaming=config.STREAM_ANSWERS,
+                **clients
+            )
+            condense_llm = ChatOpenAI(
+                model=config.LLM_MODEL,
+                temperature=0.7,
+                openai_api_key=openai_api_key,
+                streaming=False,
+                **clients
+            )
+            _llms[openai_api_key] = (llm, condense_llm)
+        return _llms[openai_api_key]
@@ -0,0 +1,325 @@
+"""RAG 파이프라인 (문서 로드 → 분할 → 임베딩 → 벡터 스토어 → 대화 체인)
+
+Streamlit 앱(app.py)과 FastAPI 서비스(../main.py)가 함께 쓰므로 UI에 의존하지 않는다.
+업로드 파일은 (파일명, bytes) 목록으로 받고, 화면에 띄울 메시지는 message_callback으로 넘긴다.
+"""
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain.chains import ConversationalRetrievalChain
+from langchain_community.vectorstores import FAISS
+
+import config
+import shared_index
+from ann_index import ann_settings, copy_vectorstore, delete_documents, maybe_rebuild
+from chat_memory import create_memory
+from chunking import ChunkStats, chunk_documents
+from doc_loader import Message, iter_documents
+from embedding_provider import create_document_embeddings, get_embeddings
+from index_store import IndexStore, corpus_fingerprint, index_settings, shard_key
+from metrics import EMBED, LOAD, SPLIT, RequestTrace, span, timed_iter
+from openai_clients import get_llms
+from retrieval import BM25Index, create_retriever
+
+UploadedFile = Tuple[str, bytes]  # (파일명, 내용)
+MessageCallback = Optional[Callable[[List[Message]], None]]
+# (파일명, 단계, 청크 수): 파일마다 parsed → chunked → embedded → indexed 순서로 호출
+StageCallback = Optional[Callable[[str, str, int], None]]
+
+# 파일별 처리 단계
+PARSED, CHUNKED, EMBEDDED, INDEXED, SKIPPED = "parsed", "chunked", "embedded", "indexed", "skipped"
+
+
+def file_keys(files: List[UploadedFile]) -> Dict[str, str]:
+    """파일명 → 캐시 키"""
+    settings = index_settings()
+    return {name: shard_key(data, settings) for name, data in files}
+
+
+def shared_corpus_id(keys: Dict[str, str]) -> str:
+    """공유 인덱스 식별값 (같은 내용이라도 파일명이 다르면 출처 표시가 달라지므로 파일명 포함)
+
+    분할/임베딩 설정은 파일 캐시 키에 이미 들어 있고, 인덱스 종류/파라미터를 더해서
+    설정이 바뀌면 예전에 게시한 인덱스를 그대로 쓰지 않고 새로 만든다.
+    """
+    settings = "ann:" + json.dumps(ann_settings(), sort_keys=True)
+    return corpus_fingerprint([f"{name}:{key}" for name, key in keys.items()] + [settings])
+
+
+# 1. 데이터 로드
+def load_documents(files: List[UploadedFile], message_callback: MessageCallback = None):
+    """업로드된 파일들을 문서로 변환 (파일/PDF 페이지 구간을 프로세스 풀에서 병렬 파싱)"""
+    documents = []
+    
+    for _, docs, messages in iter_documents(files):
+        if message_callback:
+            message_callback(messages)
+        documents.extend(docs)
+    
+    return documents
+
+
+# 2. 텍스트 분할 (제목/문단 기준 토큰 단위 분할 + 중복 청크 제거)
+def split_documents(documents, stats: Optional[ChunkStats] = None):
+    return chunk_documents(documents, stats)
+
+
+# 2 to 4. 데이터 분할 + 임베딩 + 벡터DB 저장
+def create_vectorstore(documents, embeddings=None, chunks=None):
+    """문서들로부터 벡터 스토어 생성 (이미 분할한 chunks를 넘기면 분할 생략)"""
+    if not documents and not chunks:
+        return None
+    
+    # 2. 텍스트 분할
+    if chunks is None:
+        chunks = split_documents(documents)
+    if not chunks:
+        return None
+    
+    # 3. 임베딩 생성
+    if embeddings is None:
+        embeddings = get_embeddings()
+    
+    # 4. FAISS 벡터 스토어 생성 후 저장
+    vectorstore = FAISS.from_documents(chunks, embeddings)
+    
+    return vectorstore
+
+
+def add_shard(vectorstore, shard, source, keyword_index=None):
+    """파일 인덱스의 벡터를 그대로 라이브 벡터 스토어에 추가 (재임베딩 없음)
+
+    라이브 벡터 스토어는 질문 임베딩에만 쓰이므로 문서 수집용 BatchedEmbeddings(SDK 재시도를 끄고
+    작업의 진행 콜백을 들고 있음)가 아니라 공유 임베딩 객체를 붙인다.
+    """
+    count = shard.index.ntotal
+    vectors = shard.index.reconstruct_n(0, count)
+    texts, metadatas, ids = [], [], []
+    for i in range(count):
+        doc = shard.docstore.search(shard.index_to_docstore_id[i])
+        texts.append(doc.page_content)
+        # 같은 내용이 다른 파일명으로 올라올 수 있으므로 출처를 현재 파일명으로 맞춤
+        metadatas.append({**doc.metadata, 'source': source})
+        ids.append(f"{source}::{i}")
+    
+    text_embeddings = list(zip(texts, vectors.tolist()))
+    if vectorstore is None:
+        vectorstore = FAISS.from_embeddings(text_embeddings, get_embeddings(), metadatas=metadatas, ids=ids)
+    else:
+        vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+    if keyword_index is not None:
+        keyword_index.add(ids, texts)
+    return vectorstore, ids
+
+
+def copy_corpus(vectorstore, keyword_index, indexed_files):
+    """지금 쓰는 인덱스의 수정용 복사본 (바뀐 파일만 반영한 뒤 작업이 끝나면 통째로 교체)
+
+    검색 중인 원본과 다른 세션이 같이 쓰는 말뭉치는 건드리지 않는다.
+    공유 인덱스를 열 때는 파일별 청크 ID를 모으지 않으므로 복사한 ID 목록에서 다시 모은다.
+    """
+    copy = copy_vectorstore(vectorstore)
+    keyword_index = keyword_index.copy() if keyword_index is not None else BM25Index.from_vectorstore(copy)
+    ids_by_source: Dict[str, List[str]] = {}
+    for doc_id in copy.index_to_docstore_id.values():
+        # 청크 ID는 add_shard가 만든 "파일명::번호"
+        ids_by_source.setdefault(doc_id.rsplit("::", 1)[0], []).append(doc_id)
+    indexed_files = {
+        name: {"key": info["key"], "ids": ids_by_source.get(name, [])} for name, info in indexed_files.items()
+    }
+    return copy, keyword_index, indexed_files
+
+
+def update_vectorstore(
+    vectorstore,
+    files: List[UploadedFile],
+    indexed_files,
+    progress_callback=None,
+    keyword_index=None,
+    message_callback: MessageCallback = None,
+    stage_callback: StageCallback = None,
+    trace: Optional[RequestTrace] = None
+):
+    """바뀐 파일만 반영: 새 파일은 추가하고, 빠지거나 내용이 바뀐 파일의 청크는 삭제"""
+    def report(name, stage, count=0):
+        if stage_callback:
+            stage_callback(name, stage, count)
+    
+    # 청크를 배치로 나눠 임베딩 (API는 토큰 예산 단위로 동시에 요청, 속도 제한 시 백오프 후 재시도)
+    embeddings = create_document_embeddings(progress_callback=progress_callback)
+    store = IndexStore()
+    indexed_files = dict(indexed_files)
+    stats = {"added": 0, "removed": 0, "cached": 0}
+    chunk_stats = ChunkStats()
+    
+    current_keys = file_keys(files)
+    
+    # 빠졌거나 내용이 바뀐 파일의 청크 삭제
+    for source in list(indexed_files):
+        if current_keys.get(source) != indexed_files[source]["key"]:
+            if vectorstore is not None and indexed_files[source]["ids"]:
+                vectorstore = delete_documents(vectorstore, indexed_files[source]["ids"])
+            if keyword_index is not None:
+                keyword_index.remove(indexed_files[source]["ids"])
+            del indexed_files[source]
+            stats["removed"] += 1
+    
+    # 새 파일만 추가: 캐시에 있으면 저장된 인덱스를 바로 사용
+    pending = {}
+    for name, data in files:
+        if name in indexed_files:
+            continue
+        key = current_keys[name]
+        shard = store.load(key, embeddings)
+        if shard is None:
+            pending[name] = data
+            continue
+        vectorstore, ids = add_shard(vectorstore, shard, name, keyword_index)
+        indexed_files[name] = {"key": key, "ids": ids}
+        stats["added"] += 1
+        stats["cached"] += 1
+        report(name, INDEXED, len(ids))
+    
+    # 캐시에 없는 파일은 병렬로 파싱하고, 파싱이 끝난 파일부터 분할/임베딩
+    for name, documents, messages in timed_iter(trace, LOAD, iter_documents(pending.items())):
+        if message_callback:
+            message_callback(messages)
+        report(name, PARSED)
+        with span(trace, SPLIT):
+            chunks = split_documents(documents, chunk_stats)
+        report(name, CHUNKED, len(chunks))
+        with span(trace, EMBED):
+            shard = create_vectorstore(documents, embeddings, chunks=chunks)
+        if shard is None:
+            report(name, SKIPPED)
+            continue
+        report(name, EMBEDDED, len(chunks))
+        key = current_keys[name]
+        store.save(key, shard)
+        vectorstore, ids = add_shard(vectorstore, shard, name, keyword_index)
+        indexed_files[name] = {"key": key, "ids": ids}
+        stats["added"] += 1
+        report(name, INDEXED, len(ids))
+    
+    # 중복 청크/반복 머리글·바닥글 제거로 임베딩하지 않은 양
+    stats["chunks_saved"] = chunk_stats.saved_chunks
+    stats["tokens_saved"] = chunk_stats.saved_tokens
+    
+    if trace:
+        trace.count("files", len(files))
+        trace.count("cached_files", stats["cached"])
+        trace.count("embedding_tokens", embeddings.tokens_embedded)
+        trace.count("chunks_saved", chunk_stats.saved_chunks)
+        trace.count("tokens_saved", chunk_stats.saved_tokens)
+    
+    if not indexed_files:
+        vectorstore = None
+    
+    # 말뭉치 크기에 맞는 인덱스 종류(Flat/HNSW/IVF)로 필요할 때만 다시 만듦
+    vectorstore = maybe_rebuild(vectorstore)
+    
+    return vectorstore, indexed_files, stats
+
+
+def build_shared_corpus(
+    files: List[UploadedFile],
+    progress_callback=None,
+    message_callback: MessageCallback = None,
+    stage_callback: StageCallback = None,
+    trace: Optional[RequestTrace] = None,
+    base=None
+):
+    """공유 인덱스로 게시된 말뭉치 ID를 돌려줌 (없으면 캐시된 파일 인덱스로 만들어 게시, 실패 시 None)
+
+    base로 지금 쓰는 (벡터 스토어, BM25 인덱스, 파일 정보)를 넘기면 그 복사본에 바뀐 파일만 반영해서 게시
+    """
+    corpus = shared_corpus_id(file_keys(files))
+    stats = {"added": len(files), "removed": 0, "cached": len(files)}
+    if shared_index.exists(corpus):
+        if stage_callback:
+            for name, _ in files:
+                stage_callback(name, INDEXED, 0)
+        return corpus, stats
+    # BM25 인덱스도 함께 게시해서 다시 열 때 청크를 토큰화하지 않게 함
+    vectorstore, keyword_index, indexed_files = copy_corpus(*base) if base else (None, BM25Index(), {})
+    vectorstore, _, stats = update_vectorstore(
+        vectorstore,
+        files,
+        indexed_files,
+        progress_callback,
+        keyword_index=keyword_index,
+        message_callback=message_callback,
+        stage_callback=stage_callback,
+        trace=trace
+    )
+    if vectorstore is None:
+        return None, stats
+    shared_index.publish(vectorstore, corpus, keyword_index=keyword_index)
+    return corpus, stats
+
+
+def open_corpus(corpus_id: str, files: Optional[Dict[str, str]] = None):
+    """세션에 기록된 말뭉치의 (벡터 스토어, BM25 인덱스, 파일 정보)를 디스크에서 다시 만듦 (재임베딩 없음)
+
+    게시된 공유 인덱스가 있으면 mmap으로 열고, 없으면 파일별 인덱스 캐시의 샤드(files: 파일명 → 캐시 키)를 합친다.
+    캐시가 지워진 파일이 있으면 None (문서를 다시 올려야 함)
+    """
+    embeddings = get_embeddings()
+    if shared_index.exists(corpus_id):
+        vectorstore = shared_index.open_shared(corpus_id, embeddings)
+        keyword_index = shared_index.open_keyword_index(corpus_id)
+        if keyword_index is None:
+            keyword_index = BM25Index.from_vectorstore(vectorstore)
+            shared_index.save_keyword_index(keyword_index, corpus_id)
+        indexed_files = {name: {"key": key, "ids": []} for name, key in (files or {}).items()}
+        return vectorstore, keyword_index, indexed_files
+    if not files:
+        return None
+
+    store = IndexStore()
+    vectorstore, keyword_index, indexed_files = None, BM25Index(), {}
+    for name, key in files.items():
+        shard = store.load(key, embeddings)
+        if shard is None:
+            return None
+        vectorstore, ids = add_shard(vectorstore, shard, name, keyword_index)
+        indexed_files[name] = {"key": key, "ids": ids}
+    return maybe_rebuild(vectorstore), keyword_index, indexed_files
+
+
+# 5. LangChain 생성
+def create_conversation_chain(vectorstore, openai_api_key, llm=None, condense_llm=None, keyword_index=None):
+    """대화형 검색 체인 생성 (llm/condense_llm을 넘기면 가짜 모델로도 구성 가능)
+
+    LLM은 프로세스가 공유하는 클라이언트를 쓰므로, 체인마다 새로 드는 것은 프롬프트와 메모리뿐이다.
+    """
+    if not vectorstore:
+        return None
+    
+    if llm is None or condense_llm is None:
+        default_llm, default_condense_llm = get_llms(openai_api_key)
+        llm = llm or default_llm
+        condense_llm = condense_llm or default_condense_llm
+    
+    # 메모리 설정 (최근 N턴 + 이전 대화 요약, 토큰 예산 고정)
+    memory = create_memory(condense_llm)
+    
+    # 대화형 검색 체인 생성
+    conversation_chain = ConversationalRetrievalChain.from_llm(
+        llm=llm,
+        condense_question_llm=condense_llm,
+        retriever=create_retriever(vectorstore, keyword_index),
+        memory=memory,
+        return_source_documents=True,
+        verbose=config.CHAIN_VERBOSE
+    )
+    
+    return conversation_chain
+
+
+def format_source(doc):
+    """출처 문서를 '파일명 (페이지 N)' 형태로 표시"""
+    source_name = doc.metadata.get('source', '알 수 없음')
+    page = doc.metadata.get('page', '')
+    page_info = f" (페이지 {page + 1})" if page != '' else ""
+    return f"{source_name}{page_info}"
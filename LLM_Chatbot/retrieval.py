@@ -0,0 +1,221 @@
+"""BM25 키워드 검색 + FAISS 벡터 검색을 합친 하이브리드 검색기
+
+벡터 검색만으로는 제품명, 코드, 숫자처럼 정확히 일치해야 하는 단어를 놓치기 쉬우므로
+로컬 역색인(BM25) 결과와 가중 RRF(Reciprocal Rank Fusion)로 합친다.
+RERANKER_MODEL이 설정되어 있으면 합친 후보를 CPU cross-encoder로 다시 정렬한다.
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+import config
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*|[가-힣]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """영문/숫자 코드는 통째로 + 구성 요소로, 한글은 어절 + 글자 바이그램으로 분해
+
+    한국어는 조사/어미가 붙어 어절이 정확히 일치하지 않는 경우가 많아 바이그램을 함께 쓴다.
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        if '가' <= token[0] <= '힣':
+            tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        elif re.search(r"[-_.]", token):
+            tokens.extend(re.split(r"[-_.]", token))
+    return tokens
+
+
+class BM25Index:
+    """문서 추가/삭제를 지원하는 메모리 역색인"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)  # 단어 → {문서 ID: 빈도}
+        self.doc_lengths: Dict[str, int] = {}
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def __getstate__(self):
+        # 잠금은 저장하지 않음 (공유 인덱스와 함께 pickle로 저장)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def posting_count(self) -> int:
+        """(단어, 문서) 항목 수 (메모리 사용량 추정용)"""
+        return sum(len(posting) for posting in self.postings.values())
+
+    def copy(self) -> "BM25Index":
+        """추가/삭제를 반영할 복사본 (검색 중인 원본은 그대로 둠)"""
+        clone = BM25Index(self.k1, self.b)
+        with self._lock:
+            clone.postings = defaultdict(dict, {term: dict(posting) for term, posting in self.postings.items()})
+            clone.doc_lengths = dict(self.doc_lengths)
+            # 단어 목록은 문서를 추가/삭제할 때 통째로 바뀌고 제자리에서 수정되지 않으므로 공유
+            clone.doc_terms = dict(self.doc_terms)
+            clone.total_length = self.total_length
+        return clone
+
+    def add(self, ids: Iterable[str], texts: Iterable[str]):
+        with self._lock:
+            for doc_id, text in zip(ids, texts):
+                if doc_id in self.doc_lengths:
+                    self._remove(doc_id)
+                counts = Counter(tokenize(text))
+                for term, tf in counts.items():
+                    self.postings[term][doc_id] = tf
+                length = sum(counts.values())
+                self.doc_lengths[doc_id] = length
+                self.doc_terms[doc_id] = list(counts)
+                self.total_length += length
+
+    def remove(self, ids: Iterable[str]):
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        if doc_id not in self.doc_lengths:
+            return
+        for term in self.doc_terms.pop(doc_id):
+            posting = self.postings[term]
+            posting.pop(doc_id, None)
+            if not posting:
+                del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id)
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        with self._lock:
+            doc_count = len(self.doc_lengths)
+            if not doc_count:
+                return []
+            avg_length = self.total_length / doc_count
+            scores: Dict[str, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore) -> "BM25Index":
+        """FAISS 벡터 스토어의 docstore에 있는 청크로 역색인 생성"""
+        index = cls()
+        ids = list(vectorstore.index_to_docstore_id.values())
+        index.add(ids, (vectorstore.docstore.search(doc_id).page_content for doc_id in ids))
+        return index
+
+
+class CrossEncoderReranker:
+    """sentence-transformers CrossEncoder로 (질문, 문서) 쌍의 관련도를 CPU에서 계산"""
+
+    _models: Dict[str, Any] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def _model(self):
+        with self._lock:
+            if self.model_name not in self._models:
+                from sentence_transformers import CrossEncoder
+                self._models[self.model_name] = CrossEncoder(self.model_name, device="cpu")
+            return self._models[self.model_name]
+
+    def rerank(self, query: str, documents: List[Document]) -> List[Document]:
+        if not documents:
+            return documents
+        scores = self._model().predict([(query, doc.page_content) for doc in documents])
+        ranked = sorted(zip(documents, scores), key=lambda item: float(item[1]), reverse=True)
+        return [doc for doc, _ in ranked]
+
+
+def reciprocal_rank_fusion(rankings: List[Tuple[List[str], float]], rrf_k: int = 60) -> List[str]:
+    """[(문서 ID 순위 목록, 가중치)]를 가중 RRF 점수로 합침"""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranked_ids, weight in rankings:
+        for rank, doc_id in enumerate(ranked_ids, 1):
+            scores[doc_id] += weight / (rrf_k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class HybridRetriever(BaseRetriever):
+    """FAISS 결과와 BM25 결과를 합쳐 상위 k개를 돌려주는 검색기"""
+
+    vectorstore: Any
+    keyword_index: BM25Index
+    k: int = 3
+    fetch_k: int = 20
+    dense_weight: float = 1.0
+    sparse_weight: float = 1.0
+    rrf_k: int = 60
+    reranker: Optional[Any] = None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        documents: Dict[str, Document] = {}
+
+        dense_ids = []
+        if self.dense_weight > 0:
+            for doc in self.vectorstore.similarity_search(query, k=self.fetch_k):
+                documents[doc.id] = doc
+                dense_ids.append(doc.id)
+
+        sparse_ids = []
+        if self.sparse_weight > 0:
+            for doc_id, _ in self.keyword_index.search(query, self.fetch_k):
+                if doc_id not in documents:
+                    doc = self.vectorstore.docstore.search(doc_id)
+                    if not isinstance(doc, Document):
+                        continue
+                    documents[doc_id] = Document(id=doc_id, page_content=doc.page_content, metadata=doc.metadata)
+                sparse_ids.append(doc_id)
+
+        fused = reciprocal_rank_fusion(
+            [(dense_ids, self.dense_weight), (sparse_ids, self.sparse_weight)],
+            self.rrf_k
+        )
+        candidates = [documents[doc_id] for doc_id in fused]
+        if self.reranker is not None:
+            candidates = self.reranker.rerank(query, candidates[:self.fetch_k])
+        return candidates[:self.k]
+
+
+def create_retriever(vectorstore, keyword_index: Optional[BM25Index] = None) -> BaseRetriever:
+    """설정에 따라 하이브리드 검색기 또는 기존 벡터 검색기 생성"""
+    if not config.HYBRID_SEARCH or keyword_index is None:
+        return vectorstore.as_retriever(search_kwargs={"k": config.RETRIEVER_K})
+    reranker = CrossEncoderReranker(config.RERANKER_MODEL) if config.RERANKER_MODEL else None
+    return HybridRetriever(
+        vectorstore=vectorstore,
+        keyword_index=keyword_index,
+        k=config.RETRIEVER_K,
+        fetch_k=config.RETRIEVER_FETCH_K,
+        dense_weight=config.HYBRID_DENSE_WEIGHT,
+        sparse_weight=config.HYBRID_SPARSE_WEIGHT,
+        reranker=reranker
+    )
@@ -0,0 +1,295 @@
+"""채팅 세션 저장소 (SQLite)
+
+메시지 하나를 추가할 때 전체 파일을 다시 쓰지 않고 한 행만 INSERT 한다.
+세션 목록은 메타데이터만 읽고, 메시지는 세션을 선택했을 때 불러온다.
+WAL 모드 + busy_timeout으로 여러 Streamlit 프로세스가 동시에 써도 안전하다.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    summary TEXT NOT NULL DEFAULT '',
+    summary_upto INTEGER NOT NULL DEFAULT 0,
+    corpus_id TEXT NOT NULL DEFAULT '',
+    corpus_files TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL REFERENCES sessions(session_id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    sources TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id, id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SessionStore:
+    """스레드마다 별도 연결을 쓰는 SQLite 세션 저장소"""
+
+    def __init__(self, path: str = None):
+        self.path = path or config.SESSION_DB_PATH
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # 요약 컬럼이 없던 예전 DB 파일 보완
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(sessions)")}
+            if "summary" not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN summary TEXT NOT NULL DEFAULT ''")
+                conn.execute("ALTER TABLE sessions ADD COLUMN summary_upto INTEGER NOT NULL DEFAULT 0")
+            # 세션별 말뭉치 컬럼이 없던 예전 DB 파일 보완
+            if "corpus_id" not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN corpus_id TEXT NOT NULL DEFAULT ''")
+                conn.execute("ALTER TABLE sessions ADD COLUMN corpus_files TEXT NOT NULL DEFAULT '{}'")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def list_sessions(self) -> List[dict]:
+        """세션 메타데이터만 생성 순서대로 반환 (메시지는 읽지 않음)"""
+        rows = self._connect().execute(
+            "SELECT session_id, name, created_at, updated_at, message_count, corpus_id FROM sessions ORDER BY created_at"
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_sessions(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def get_session(self, session_id: str) -> Optional[dict]:
+        row = self._connect().execute(
+            "SELECT session_id, name, created_at, updated_at, message_count, corpus_id FROM sessions WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def create_session(self, session_id: str, name: str, created_at: str, updated_at: str = None):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, name, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (session_id, name, created_at, updated_at or created_at)
+            )
+
+    def delete_session(self, session_id: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def load_messages(self, session_id: str) -> List[dict]:
+        rows = self._connect().execute(
+            "SELECT role, content, timestamp, sources FROM messages WHERE session_id = ? ORDER BY id",
+            (session_id,)
+        ).fetchall()
+        return [
+            {
+                "role": row["role"],
+                "content": row["content"],
+                "timestamp": row["timestamp"],
+                "sources": json.loads(row["sources"])
+            }
+            for row in rows
+        ]
+
+    def append_message(self, session_id: str, message: dict):
+        """메시지 한 개를 추가 (기존 메시지 수와 무관하게 O(1))"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO messages (session_id, role, content, timestamp, sources) VALUES (?, ?, ?, ?, ?)",
+                (
+                    session_id,
+                    message["role"],
+                    message["content"],
+                    message["timestamp"],
+                    json.dumps(message.get("sources", []), ensure_ascii=False)
+                )
+            )
+            conn.execute(
+                "UPDATE sessions SET updated_at = ?, message_count = message_count + 1 WHERE session_id = ?",
+                (message["timestamp"], session_id)
+            )
+
+    def load_summary(self, session_id: str) -> Tuple[str, int]:
+        """(대화 요약, 요약에 포함된 앞쪽 메시지 수)"""
+        row = self._connect().execute(
+            "SELECT summary, summary_upto FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return "", 0
+        return row["summary"], row["summary_upto"]
+
+    def save_summary(self, session_id: str, summary: str, summary_upto: int):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE sessions SET summary = ?, summary_upto = ? WHERE session_id = ?",
+                (summary, summary_upto, session_id)
+            )
+
+    def load_corpus(self, session_id: str) -> Tuple[str, Dict[str, str]]:
+        """(세션이 만든 말뭉치 ID, 파일명 → 인덱스 캐시 키) - 말뭉치가 없으면 ("", {})"""
+        row = self._connect().execute(
+            "SELECT corpus_id, corpus_files FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return "", {}
+        return row["corpus_id"], json.loads(row["corpus_files"])
+
+    def save_corpus(self, session_id: str, corpus_id: str, files: Dict[str, str]):
+        """세션을 말뭉치에 묶음 (corpus_id가 빈 문자열이면 묶음 해제)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE sessions SET corpus_id = ?, corpus_files = ? WHERE session_id = ?",
+                (corpus_id, json.dumps(files, ensure_ascii=False), session_id)
+            )
+
+    def import_json(self, path: str) -> int:
+        """예전 chat_sessions.json을 한 번만 가져옴 (가져온 세션 수 반환)
+
+        가져왔다는 기록을 meta 테이블에 같은 트랜잭션으로 남기므로, 사용자가 세션을 모두 지워
+        저장소가 비어도 예전 세션이 되살아나지 않는다. 이미 세션이 있는 DB는 가져온 것으로 기록만 한다.
+        """
+        if not os.path.exists(path):
+            return 0
+        # 이미 가져왔으면 파일을 읽거나 쓰기 트랜잭션을 열지 않음
+        if self._connect().execute("SELECT 1 FROM meta WHERE key = 'legacy_json_imported'").fetchone():
+            return 0
+        with open(path, 'r', encoding='utf-8') as f:
+            sessions_data = json.load(f)
+
+        with self._connect() as conn:
+            # 먼저 기록을 남겨 쓰기 잠금을 잡음 (여러 프로세스가 동시에 시작해도 한 곳만 가져옴)
+            marked = conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('legacy_json_imported', ?)",
+                (datetime.now().isoformat(),)
+            ).rowcount
+            if not marked or conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone():
+                return 0
+            for session_data in sessions_data:
+                conn.execute(
+                    "INSERT OR IGNORE INTO sessions (session_id, name, created_at, updated_at, message_count) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        session_data['session_id'],
+                        session_data['name'],
+                        session_data['created_at'],
+                        session_data['updated_at'],
+                        len(session_data['messages'])
+                    )
+                )
+                conn.executemany(
+                    "INSERT INTO messages (session_id, role, content, timestamp, sources) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            session_data['session_id'],
+                            msg['role'],
+                            msg['content'],
+                            msg.get('timestamp', session_data['updated_at']),
+                            json.dumps(msg.get('sources', []), ensure_ascii=False)
+                        )
+                        for msg in session_data['messages']
+                    ]
+                )
+        return len(sessions_data)
+
+
+class ChatSession:
+    def __init__(self, session_id: str, name: str, store: Optional[SessionStore] = None, message_count: int = 0):
+        self.session_id = session_id
+        self.name = name
+        self.store = store
+        # 저장소가 있으면 메시지는 처음 접근할 때 불러옴
+        self._messages = None if store else []
+        self._message_count = message_count
+        # 이 세션에서 만든 말뭉치 ID (세션을 바꿀 때 그 말뭉치의 인덱스를 다시 엶, 없으면 "")
+        self.corpus_id = ""
+        self.created_at = datetime.now()
+        self.updated_at = datetime.now()
+    
+    @property
+    def messages(self) -> List[dict]:
+        if self._messages is None:
+            self._messages = self.store.load_messages(self.session_id)
+        return self._messages
+    
+    @messages.setter
+    def messages(self, messages: List[dict]):
+        self._messages = messages
+    
+    @property
+    def message_count(self) -> int:
+        """메시지를 불러오지 않고도 알 수 있는 메시지 수"""
+        if self._messages is not None:
+            return len(self._messages)
+        return self._message_count
+    
+    def add_message(self, role: str, content: str, sources: List[str] = None):
+        message = {
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now().isoformat(),
+            "sources": sources or []
+        }
+        self.messages.append(message)
+        self.updated_at = datetime.now()
+        if self.store:
+            self.store.append_message(self.session_id, message)
+    
+    def to_dict(self):
+        return {
+            "session_id": self.session_id,
+            "name": self.name,
+            "messages": self.messages,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat()
+        }
+
+
+def load_sessions(store: SessionStore) -> Dict[str, ChatSession]:
+    """저장소의 세션 목록을 ChatSession으로 변환 (메시지는 지연 로드, 예전 JSON 가져오기는 저장소를 만들 때 한 번)"""
+    sessions = {}
+    for row in store.list_sessions():
+        session = _session_from_row(store, row)
+        sessions[session.session_id] = session
+    return sessions
+
+
+def load_session(store: SessionStore, session_id: str) -> Optional[ChatSession]:
+    """세션 하나만 불러옴 (없으면 None)"""
+    row = store.get_session(session_id)
+    return _session_from_row(store, row) if row else None
+
+
+def _session_from_row(store: SessionStore, row: dict) -> ChatSession:
+    session = ChatSession(row['session_id'], row['name'], store, row['message_count'])
+    session.created_at = datetime.fromisoformat(row['created_at'])
+    session.updated_at = datetime.fromisoformat(row['updated_at'])
+    session.corpus_id = row.get('corpus_id', "")
+    return session
+
+
+def create_session(store: SessionStore, session_id: str, name: str) -> ChatSession:
+    session = ChatSession(session_id, name, store)
+    store.create_session(session_id, name, session.created_at.isoformat())
+    return session
@@ -0,0 +1,234 @@
+"""여러 세션/프로세스가 함께 쓰는 읽기 전용 mmap 벡터 인덱스
+
+세션마다 FAISS 인덱스와 청크 텍스트를 메모리에 따로 들고 있으면 같은 문서를 보는 사용자 수만큼
+복사본이 생긴다. 여기서는 말뭉치 하나를 디렉터리 하나로 게시(publish)하고,
+- 벡터: faiss.read_index(..., IO_FLAG_MMAP*)로 파일을 그대로 매핑
+- 청크 텍스트/메타데이터/ID: 하나의 바이트 파일 + numpy 오프셋 배열(np.load(mmap_mode='r'))
+로 열어서 OS 페이지 캐시를 모든 프로세스가 공유하게 한다.
+
+디렉터리 구성:
+    index.faiss                     faiss 인덱스
+    texts.bin / texts.npy           청크 본문 (UTF-8) 과 시작 오프셋
+    metas.bin / metas.npy           메타데이터 JSON
+    ids.bin / ids.npy               청크 ID (인덱스 위치 순서)
+    id_order.npy                    ID 정렬 순서 (이진 탐색용)
+    bm25.pkl                        BM25 역색인 (다시 열 때 청크를 토큰화하지 않도록 저장, 없으면 새로 만듦)
+    info.json                       인덱스 종류, 청크 수, 임베딩 모델 식별값
+"""
+import bisect
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from collections.abc import Mapping
+from typing import Iterator, List, Optional
+
+import faiss
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+import config
+from ann_index import index_type_of, set_search_params
+from embedding_provider import check_model, embedding_model_id
+
+
+class MmapStringArray:
+    """바이트 파일 + 오프셋 배열로 저장한 문자열 목록 (필요한 항목만 디코딩)"""
+
+    def __init__(self, directory: str, name: str):
+        self.offsets = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        path = os.path.join(directory, f"{name}.bin")
+        if os.path.getsize(path):
+            self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            self.data = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.data[int(self.offsets[i]):int(self.offsets[i + 1])].tobytes().decode("utf-8")
+
+    @staticmethod
+    def write(directory: str, name: str, values: List[str]):
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        with open(os.path.join(directory, f"{name}.bin"), "wb") as f:
+            for i, value in enumerate(values):
+                encoded = value.encode("utf-8")
+                f.write(encoded)
+                offsets[i + 1] = offsets[i] + len(encoded)
+        np.save(os.path.join(directory, f"{name}.npy"), offsets)
+
+
+class MmapIdMap(Mapping):
+    """인덱스 위치 → 청크 ID (LangChain FAISS의 index_to_docstore_id 자리에 사용)"""
+
+    def __init__(self, ids: MmapStringArray):
+        self.ids = ids
+
+    def __getitem__(self, position: int) -> str:
+        if not 0 <= position < len(self.ids):
+            raise KeyError(position)
+        return self.ids[position]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self.ids)))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class MmapDocstore(Docstore):
+    """읽기 전용 docstore: 청크 ID를 정렬 순서 배열에서 이진 탐색해 위치를 찾음"""
+
+    def __init__(self, directory: str):
+        self.texts = MmapStringArray(directory, "texts")
+        self.metas = MmapStringArray(directory, "metas")
+        self.ids = MmapStringArray(directory, "ids")
+        self.id_order = np.load(os.path.join(directory, "id_order.npy"), mmap_mode="r")
+
+    def _position(self, doc_id: str) -> Optional[int]:
+        sorted_ids = _SortedView(self.ids, self.id_order)
+        i = bisect.bisect_left(sorted_ids, doc_id)
+        if i < len(sorted_ids) and sorted_ids[i] == doc_id:
+            return int(self.id_order[i])
+        return None
+
+    def document(self, position: int) -> Document:
+        return Document(
+            id=self.ids[position],
+            page_content=self.texts[position],
+            metadata=json.loads(self.metas[position])
+        )
+
+    def search(self, search: str):
+        position = self._position(search)
+        if position is None:
+            return f"ID {search} not found."
+        return self.document(position)
+
+    def add(self, texts):
+        raise NotImplementedError("공유 인덱스는 읽기 전용입니다.")
+
+    def delete(self, ids):
+        raise NotImplementedError("공유 인덱스는 읽기 전용입니다.")
+
+
+class _SortedView:
+    """id_order 순서로 본 ID 목록 (bisect용)"""
+
+    def __init__(self, ids: MmapStringArray, order):
+        self.ids = ids
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, i):
+        return self.ids[int(self.order[i])]
+
+
+def _path(corpus: str, root: str = None) -> str:
+    return os.path.join(root or config.SHARED_INDEX_DIR, corpus)
+
+
+def exists(corpus: str, root: str = None) -> bool:
+    return os.path.exists(os.path.join(_path(corpus, root), "index.faiss"))
+
+
+def publish(vectorstore: FAISS, corpus: str, root: str = None, keyword_index=None):
+    """메모리의 벡터 스토어(와 BM25 인덱스)를 공유 디렉터리로 저장 (이미 있으면 그대로 둠)"""
+    if exists(corpus, root):
+        return
+    root = root or config.SHARED_INDEX_DIR
+    os.makedirs(root, exist_ok=True)
+
+    count = vectorstore.index.ntotal
+    ids = [vectorstore.index_to_docstore_id[i] for i in range(count)]
+    docs = [vectorstore.docstore.search(doc_id) for doc_id in ids]
+
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=root)
+    try:
+        faiss.write_index(vectorstore.index, os.path.join(tmp_dir, "index.faiss"))
+        MmapStringArray.write(tmp_dir, "texts", [doc.page_content for doc in docs])
+        MmapStringArray.write(tmp_dir, "metas", [json.dumps(doc.metadata, ensure_ascii=False) for doc in docs])
+        MmapStringArray.write(tmp_dir, "ids", ids)
+        np.save(os.path.join(tmp_dir, "id_order.npy"), np.array(sorted(range(count), key=ids.__getitem__), dtype=np.int64))
+        if keyword_index is not None:
+            with open(os.path.join(tmp_dir, "bm25.pkl"), "wb") as f:
+                pickle.dump(keyword_index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(os.path.join(tmp_dir, "info.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "index_type": index_type_of(vectorstore.index),
+                    "count": count,
+                    "embedding_model": embedding_model_id()
+                },
+                f
+            )
+        # 다 쓴 뒤 이름을 바꿔서 읽는 쪽이 반쯤 쓴 디렉터리를 보지 않게 함
+        os.replace(tmp_dir, _path(corpus, root))
+    except OSError:
+        # 다른 프로세스가 먼저 게시한 경우
+        pass
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def mmap_flags(index_type: str) -> int:
+    """게시된 인덱스를 읽기 전용으로 열 때의 faiss 플래그"""
+    # IVF는 역리스트를, Flat/HNSW는 벡터 코드를 파일에서 바로 매핑
+    if index_type.startswith("ivf") or not hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+        return faiss.IO_FLAG_READ_ONLY | faiss.IO_FLAG_MMAP
+    return faiss.IO_FLAG_READ_ONLY | faiss.IO_FLAG_MMAP_IFC
+
+
+def open_shared(corpus: str, embeddings, root: str = None) -> FAISS:
+    """게시된 말뭉치를 읽기 전용 mmap으로 열어 LangChain FAISS로 감쌈
+
+    임베딩 모델이 지금 설정과 다르면 EmbeddingModelMismatch
+    """
+    directory = _path(corpus, root)
+    index_file = os.path.join(directory, "index.faiss")
+    with open(os.path.join(directory, "info.json"), encoding="utf-8") as f:
+        info = json.load(f)
+    # 다른 모델로 만든 벡터에 지금 모델의 질문 벡터로 검색하지 않도록 막음
+    check_model(info.get("embedding_model"))
+    index = faiss.read_index(index_file, mmap_flags(info["index_type"]))
+    set_search_params(index)
+
+    docstore = MmapDocstore(directory)
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=MmapIdMap(docstore.ids),
+    )
+
+
+def open_keyword_index(corpus: str, root: str = None):
+    """게시할 때 함께 저장한 BM25 인덱스 (없거나 읽을 수 없으면 None)"""
+    try:
+        # 이 프로세스들이 직접 게시한 파일만 읽으므로 pickle 역직렬화를 허용
+        with open(os.path.join(_path(corpus, root), "bm25.pkl"), "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+
+def save_keyword_index(keyword_index, corpus: str, root: str = None):
+    """BM25 인덱스 없이 게시된 예전 말뭉치에 나중에 만든 인덱스를 추가"""
+    directory = _path(corpus, root)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".pkl", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(keyword_index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, os.path.join(directory, "bm25.pkl"))
+    except OSError:
+        pass
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,133 @@
+"""체인 콜백 핸들러 (UI와 무관하게 콜백 함수만 호출)
+
+- StreamingAnswerHandler: 답변 토큰 스트리밍
+- MetricsCallbackHandler: 단계별 시간과 토큰 수를 RequestTrace에 기록
+"""
+import time
+from typing import Callable, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.documents import Document
+
+from embedding_pipeline import count_tokens
+from metrics import CONDENSE, LLM_FIRST_TOKEN, LLM_TOTAL, RETRIEVE, RequestTrace
+
+
+class StreamingAnswerHandler(BaseCallbackHandler):
+    """LLM 토큰이 올 때마다 on_token(지금까지의 답변)을, 검색이 끝나면 on_sources(문서들)를 호출
+
+    질문 재작성(condense) 단계의 LLM은 스트리밍하지 않으므로, 여기로 오는 토큰은 최종 답변 토큰뿐이다.
+    """
+
+    def __init__(
+        self,
+        on_token: Callable[[str], None],
+        on_sources: Optional[Callable[[List[Document]], None]] = None,
+    ):
+        self.on_token = on_token
+        self.on_sources = on_sources
+        self.text = ""
+        self.started_at = time.perf_counter()
+        self.first_token_at = None
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.text += token
+        self.on_token(self.text)
+
+    def on_retriever_end(self, documents, **kwargs):
+        if self.on_sources:
+            self.on_sources(list(documents))
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """체인 콜백으로 단계별 시간과 토큰 수를 trace에 기록
+
+    검색 전에 시작한 LLM 호출은 질문 재작성(condense), 검색 후의 호출은 답변 생성으로 본다.
+    토큰 수는 응답의 usage 정보를 쓰고, 스트리밍처럼 usage가 없으면 tiktoken으로 센다.
+    """
+
+    def __init__(self, trace: RequestTrace):
+        self.trace = trace
+        self._llm_runs = {}
+        self._retriever_started = None
+        self._retrieved = False
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        prompt_tokens = sum(
+            count_tokens(message.content)
+            for batch in messages
+            for message in batch
+            if isinstance(message.content, str)
+        )
+        self._start_llm(run_id, prompt_tokens)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start_llm(run_id, sum(count_tokens(prompt) for prompt in prompts))
+
+    def _start_llm(self, run_id, prompt_tokens: int):
+        self._llm_runs[run_id] = {
+            "stage": LLM_TOTAL if self._retrieved else CONDENSE,
+            "started": time.perf_counter(),
+            "first_token": None,
+            "prompt_tokens": prompt_tokens
+        }
+
+    def on_llm_new_token(self, token: str, *, run_id, **kwargs):
+        run = self._llm_runs.get(run_id)
+        if run and run["first_token"] is None:
+            run["first_token"] = time.perf_counter()
+            if run["stage"] == LLM_TOTAL:
+                self.trace.record(LLM_FIRST_TOKEN, run["first_token"] - run["started"])
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        run = self._llm_runs.pop(run_id, None)
+        if run is None:
+            return
+        elapsed = time.perf_counter() - run["started"]
+        self.trace.record(run["stage"], elapsed)
+        if run["stage"] == LLM_TOTAL and run["first_token"] is None:
+            # 스트리밍하지 않으면 전체 응답이 곧 첫 토큰
+            self.trace.record(LLM_FIRST_TOKEN, elapsed)
+
+        prompt_tokens, completion_tokens = _usage(response)
+        if prompt_tokens is None:
+            prompt_tokens = run["prompt_tokens"]
+            completion_tokens = sum(
+                count_tokens(generation.text) for generations in response.generations for generation in generations
+            )
+        self.trace.count("prompt_tokens", prompt_tokens)
+        self.trace.count("completion_tokens", completion_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._llm_runs.pop(run_id, None)
+        self.trace.count("llm_errors")
+
+    def on_retriever_start(self, serialized, query, **kwargs):
+        self._retriever_started = time.perf_counter()
+
+    def on_retriever_end(self, documents, **kwargs):
+        if self._retriever_started is not None:
+            self.trace.record(RETRIEVE, time.perf_counter() - self._retriever_started)
+        self._retrieved = True
+        self.trace.count("retrieved_documents", len(documents))
+
+
+def _usage(response):
+    """LLM 응답의 (입력 토큰, 출력 토큰), 없으면 (None, None)"""
+    token_usage = (response.llm_output or {}).get("token_usage")
+    if token_usage:
+        return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    return None, None
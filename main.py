@@ -1,11 +1,342 @@
-from fastapi import FastAPI
+"""RAG 문서 챗봇 API 서버
+
+LLM_Chatbot의 로드/분할/벡터 스토어/대화 체인 로직을 그대로 쓰는 FastAPI 서비스.
+- POST /documents: 업로드 후 작업 ID를 바로 반환하고 인덱싱은 백그라운드에서 진행
+- GET /jobs/{job_id}: 인덱싱 작업 상태와 파일별 진행 단계 (완료되면 corpus_id)
+- POST /query: 답변을 Server-Sent Events로 토큰 단위 스트리밍 (세션을 주면 corpus_id를 세션에 기록하고,
+  이후 corpus_id 없이 물으면 세션에 기록된 말뭉치를 씀)
+- /sessions: 대화 세션 목록/생성/메시지 조회
+- GET /metrics: 단계별 지연 시간/토큰 수 (Prometheus 텍스트 형식, 워커 프로세스별 집계)
+- /quiz/sessions: EnglishWord 영어 단어 퀴즈 (학습자별 세션, 문제 조회/답 제출)
+
+인덱스는 공유 mmap 인덱스로 게시되므로 여러 워커 프로세스가 같은 파일을 읽기 전용으로 공유한다.
+퀴즈 단어장도 mmap 캐시 하나를 모든 학습자가 공유하고, 학습자별로는 작은 진행 상태만 메모리에 둔다
+(워커가 여럿이면 어느 워커로 요청이 가도 이어지도록 진행 상태를 SQLite에 둠).
+실행: python main.py (API_HOST, API_PORT, API_WORKERS 환경 변수로 설정)
+"""
+import asyncio
+import json
+import os
+import sys
+import uuid
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
 import uvicorn
+from dotenv import load_dotenv
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BASE_DIR, "LLM_Chatbot"))
+sys.path.insert(0, os.path.join(BASE_DIR, "EnglishWord"))
+
+import config
+import shared_index
+from chat_memory import restore_memory
+from corpus_cache import CorpusCache
+from embedding_provider import EmbeddingModelMismatch
+from ingest_jobs import DONE, IngestQueue
+from metrics import REGISTRY, RequestTrace
+from quiz_engine import MEANING_QUIZ, QUIZ_MODES, QuizSession, QuizSessionStore, SharedQuizSessionStore, WordBankView
+from rag_pipeline import create_conversation_chain, file_keys, format_source, shared_corpus_id
+from session_store import SessionStore, create_session, load_session
+from streaming import MetricsCallbackHandler, StreamingAnswerHandler
+
+load_dotenv()
+
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+
+# 퀴즈: 단어장/오답 보기 색인은 프로세스에 하나, 학습자 세션은 오래 안 쓴 것부터 정리
+# 워커가 하나면 메모리에, 여럿이면 모든 워커가 같이 쓰는 SQLite에 진행 상태를 둠
+QUIZ_SHARED = API_WORKERS > 1
+quiz_session_options = dict(
+    max_sessions=int(os.getenv("QUIZ_MAX_SESSIONS", "100000")),
+    ttl_seconds=int(os.getenv("QUIZ_SESSION_TTL", "3600"))
+)
+
+# 저장소/작업 큐/캐시는 서버 프로세스가 뜰 때(lifespan) 만든다.
+# 모듈 최상위에서 만들면 doc_loader가 spawn으로 띄운 문서 파싱 프로세스가 main.py를 다시 import하면서
+# 프로세스마다 하나씩 더 만들어짐 (IngestQueue는 만들 때 실행 중인 작업을 실패로 표시함)
+session_store: SessionStore = None
+ingest_queue: IngestQueue = None
+corpus_cache: CorpusCache = None
+word_bank: WordBankView = None
+quiz_sessions = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global session_store, ingest_queue, corpus_cache, word_bank, quiz_sessions
+    session_store = SessionStore()
+    session_store.import_json(config.LEGACY_SESSIONS_FILE)
+    ingest_queue = IngestQueue()
+    # 워커 프로세스마다 최근에 쓴 말뭉치 몇 개만 열어 둠 (벡터/청크는 mmap이라 페이지 캐시를 공유)
+    corpus_cache = CorpusCache(
+        max_entries=int(os.getenv("API_MAX_OPEN_CORPORA", str(config.CORPUS_CACHE_ENTRIES)))
+    )
+    word_bank = WordBankView()
+    if QUIZ_SHARED:
+        quiz_sessions = SharedQuizSessionStore(word_bank, os.getenv("QUIZ_SESSION_DB_PATH"), **quiz_session_options)
+    else:
+        quiz_sessions = QuizSessionStore(**quiz_session_options)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+class QueryRequest(BaseModel):
+    corpus_id: Optional[str] = None  # 없으면 세션에 기록된 말뭉치
+    question: str
+    session_id: Optional[str] = None
+
+
+class SessionRequest(BaseModel):
+    name: Optional[str] = None
+
+
+class QuizStartRequest(BaseModel):
+    difficulty: str = "A1_to_B1"
+    mode: str = "meaning"  # word(뜻 → 단어) | meaning(단어 → 뜻, 10지선다)
+
+
+class QuizAnswerRequest(BaseModel):
+    answer: str = ""
+
+
+def get_corpus(corpus_id: str):
+    """공유 인덱스의 LoadedCorpus (메모리에 없으면 디스크에서 열고, 게시된 인덱스가 없으면 None)"""
+    if not shared_index.exists(corpus_id):
+        return None
+    try:
+        return corpus_cache.get(corpus_id)
+    except EmbeddingModelMismatch as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
-app = FastAPI()
 
 @app.get("/")
 def root():
     return {"message": "Welcome to FastAPI Server"}
 
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return REGISTRY.render()
+
+
+@app.post("/documents", status_code=202)
+async def upload_documents(files: List[UploadFile] = File(...)):
+    """문서를 올리면 작업 ID를 바로 반환 (이미 인덱싱된 묶음이면 바로 완료 상태)"""
+    uploaded = [(file.filename, await file.read()) for file in files]
+    keys = await run_in_threadpool(file_keys, uploaded)
+    corpus = shared_corpus_id(keys)
+    # 작업 기록은 SQLite 쓰기이므로 이벤트 루프 밖에서 실행
+    if shared_index.exists(corpus):
+        job_id = await run_in_threadpool(
+            ingest_queue.store.create, [name for name, _ in uploaded], status=DONE, corpus_id=corpus, keys=keys
+        )
+    else:
+        job_id = await run_in_threadpool(ingest_queue.submit, uploaded)
+    return {"job_id": job_id}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = ingest_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
+
+
+@app.get("/sessions")
+def list_sessions():
+    return session_store.list_sessions()
+
+
+@app.post("/sessions", status_code=201)
+def new_session(request: SessionRequest):
+    session_id = str(uuid.uuid4())
+    name = request.name or f"대화 {session_store.count_sessions() + 1}"
+    session = create_session(session_store, session_id, name)
+    return {"session_id": session.session_id, "name": session.name}
+
+
+@app.get("/sessions/{session_id}/messages")
+def get_messages(session_id: str):
+    if session_store.get_session(session_id) is None:
+        raise HTTPException(status_code=404, detail="session not found")
+    return session_store.load_messages(session_id)
+
+
+@app.post("/query")
+async def query(request: QueryRequest):
+    """답변을 SSE로 스트리밍: sources → token... → done (실패 시 error)"""
+    chat_session = None
+    if request.session_id:
+        chat_session = await run_in_threadpool(load_session, session_store, request.session_id)
+        if chat_session is None:
+            raise HTTPException(status_code=404, detail="session not found")
+    corpus_id = request.corpus_id or (chat_session.corpus_id if chat_session else "")
+    if not corpus_id:
+        raise HTTPException(status_code=400, detail="corpus_id is required")
+    corpus = await run_in_threadpool(get_corpus, corpus_id)
+    if corpus is None:
+        raise HTTPException(status_code=404, detail="corpus not found")
+    if chat_session and chat_session.corpus_id != corpus_id:
+        await run_in_threadpool(session_store.save_corpus, chat_session.session_id, corpus_id, {})
+
+    # 체인은 요청마다 만드는 가벼운 객체 (인덱스와 LLM 클라이언트, 연결 풀은 워커 안에서 공유)
+    chain = create_conversation_chain(
+        corpus.vectorstore, os.getenv("OPENAI_API_KEY"), keyword_index=corpus.keyword_index
+    )
+    if chat_session:
+        summary, summary_upto = await run_in_threadpool(session_store.load_summary, chat_session.session_id)
+        await run_in_threadpool(restore_memory, chain.memory, chat_session.messages, summary, summary_upto)
+
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    sent = 0
+
+    def emit(event, data):
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    def on_token(text):
+        nonlocal sent
+        emit("token", {"text": text[sent:]})
+        sent = len(text)
+
+    def on_sources(docs):
+        emit("sources", {"sources": [format_source(doc) for doc in docs]})
+
+    handler = StreamingAnswerHandler(on_token=on_token, on_sources=on_sources)
+    trace = RequestTrace("query")
+
+    async def answer():
+        try:
+            response = await chain.ainvoke(
+                {"question": request.question},
+                config={"callbacks": [handler, MetricsCallbackHandler(trace)]}
+            )
+            sources = [format_source(doc) for doc in response.get("source_documents", [])]
+            if chat_session:
+                await run_in_threadpool(save_turn, chain, chat_session, request.question, response["answer"], sources)
+            emit("done", {"answer": response["answer"], "sources": sources})
+        except Exception as e:
+            trace.count("errors")
+            emit("error", {"message": str(e)})
+        finally:
+            REGISTRY.observe(trace)
+            emit(None, None)
+
+    async def stream():
+        task = asyncio.create_task(answer())
+        try:
+            while True:
+                event, data = await events.get()
+                if event is None:
+                    break
+                yield sse(event, data)
+        finally:
+            # 클라이언트가 먼저 끊으면 LLM 호출도 중단
+            task.cancel()
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+def save_turn(chain, chat_session, question, answer, sources):
+    """질문/답변을 세션에 추가하고 메모리 요약을 캐시"""
+    chat_session.add_message("user", question)
+    chat_session.add_message("assistant", answer, sources)
+    memory = chain.memory
+    summary_upto = max(0, chat_session.message_count - memory.buffered_count)
+    session_store.save_summary(chat_session.session_id, memory.moving_summary_buffer, summary_upto)
+
+
+# 퀴즈 요청은 메모리 안에서 끝나는 짧은 작업이라 스레드 풀 없이 이벤트 루프에서 바로 처리
+# (SQLite에 진행 상태를 두는 여러 워커 모드에서는 스레드 풀에서 처리)
+async def run_quiz(func, *args):
+    if QUIZ_SHARED:
+        return await run_in_threadpool(func, *args)
+    return func(*args)
+
+
+def get_quiz_session(session_id: str) -> QuizSession:
+    session = quiz_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="퀴즈 세션을 찾을 수 없습니다.")
+    return session
+
+
+def _start_quiz(request: QuizStartRequest):
+    if request.mode not in QUIZ_MODES:
+        raise HTTPException(status_code=400, detail=f"mode는 {', '.join(QUIZ_MODES)} 중 하나입니다.")
+    words = word_bank.words(request.difficulty)
+    if words is None:
+        raise HTTPException(status_code=404, detail="해당 난이도의 단어장이 없습니다.")
+    distractors = word_bank.distractors(request.difficulty) if request.mode == MEANING_QUIZ else None
+    session = QuizSession(words, request.mode, request.difficulty, distractors=distractors)
+    # 첫 문제의 보기까지 정한 뒤 저장
+    question = session.question()
+    session_id = quiz_sessions.add(session)
+    return {"session_id": session_id, "question": question, "summary": session.summary()}
+
+
+def _get_quiz(session_id: str):
+    session = get_quiz_session(session_id)
+    question = session.question()
+    quiz_sessions.save(session_id, session)
+    return {"question": question, "summary": session.summary()}
+
+
+def _answer_quiz(session_id: str, request: QuizAnswerRequest):
+    session = get_quiz_session(session_id)
+    try:
+        result = session.answer(request.answer)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    question = session.question()
+    quiz_sessions.save(session_id, session)
+    return {"result": result, "question": question, "summary": session.summary()}
+
+
+def _end_quiz(session_id: str):
+    session = quiz_sessions.remove(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="퀴즈 세션을 찾을 수 없습니다.")
+    return {"summary": session.summary()}
+
+
+@app.post("/quiz/sessions", status_code=201)
+async def start_quiz(request: QuizStartRequest):
+    return await run_quiz(_start_quiz, request)
+
+
+@app.get("/quiz/sessions/{session_id}")
+async def get_quiz(session_id: str):
+    return await run_quiz(_get_quiz, session_id)
+
+
+@app.post("/quiz/sessions/{session_id}/answer")
+async def answer_quiz(session_id: str, request: QuizAnswerRequest):
+    return await run_quiz(_answer_quiz, session_id, request)
+
+
+@app.delete("/quiz/sessions/{session_id}")
+async def end_quiz(session_id: str):
+    return await run_quiz(_end_quiz, session_id)
+
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("API_HOST", "127.0.0.1"),
+        port=int(os.getenv("API_PORT", "8000")),
+        workers=API_WORKERS
+    )